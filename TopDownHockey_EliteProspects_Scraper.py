@@ -14,6 +14,11 @@ warnings.filterwarnings("ignore")
 from requests import ConnectionError, ReadTimeout, ConnectTimeout, HTTPError, Timeout
 from typing import List
 
+try:
+	from . import TopDownHockey_HTTP as tdhhttp
+except ImportError:
+	import TopDownHockey_HTTP as tdhhttp
+
 
 def __log_prerun(data_type: str = '', leagues: str = '', seasons: str = ''):
 	"""This is an abstracted logging method used before each data_type is being scraped for a league/season combo"""
@@ -40,12 +45,19 @@ def __403_rest(
 		print("Just got a 403 Error before entering the page. This means EliteProspects has temporarily blocked your IP address.")
 		print(f"We're going to sleep for {sleep} seconds, then try again.")
 		time.sleep(sleep)
-		response_page = requests.get(url + str(pageno) + url_append, timeout=timeout)
+		response_page = tdhhttp.get(url + str(pageno) + url_append, timeout=timeout)
 		response_string = str(response_page)
 		print("Changed the string within the page. Let's try again")
 	return response_page, response_string
 
 
+def __concat_frames(frames):
+	"""Concatenates the frames collected by a scrape in one go, skipping scrapes that came back empty"""
+	frames = [frame for frame in frames if frame is not None]
+	if len(frames) == 0: return pd.DataFrame()
+	return pd.concat(frames)
+
+
 def get_concat_liststr(seasons):
 	"""Converts season(s) into string like '2021-22' or '2021-22 and 2022-23' or '2021-22, 2022-23 and 2023-24'"""
 	if type(seasons) == str or type(seasons) == int: return str(seasons)
@@ -79,13 +91,13 @@ def getskaters(league, year):
 	url = f'https://www.eliteprospects.com/league/{league}/stats/{year}?page='  # Collects data from https://www.eliteprospects.com/league/{league}/stats/{year}
 	print("Beginning scrape of " + league + " skater data from " + year + ".")
 	players = []  # Return list with all players for season in link
-	page = requests.get(url + str(1), timeout=500)
+	page = tdhhttp.get(url + str(1))
 	first_page_string = str(page)
 	page, first_page_string = __403_rest(response_string=first_page_string, url=url)
 	if first_page_string == '<Response [404]>': print(f"ERROR: {first_page_string} on league: {league} in year: {year}. Data doesn't exist for this league and season.")
 	else:
 		for i in range(1, 99):
-			page = requests.get(url + str(i), timeout=500)
+			page = tdhhttp.get(url + str(i))
 			page_string = str(page)
 			page, page_string = __403_rest(response_string=page_string, url=url, pageno=i)
 			soup = BeautifulSoup(page.content, "html.parser")
@@ -94,7 +106,7 @@ def getskaters(league, year):
 			try:
 				df_players = tableDataText(player_table)
 			except AttributeError:
-				print("BREAK: TABLE NONE ERROR: " + str(requests.get(url + str(i), timeout=500)) + " On League: " + league + " In Year: " + year)
+				print("BREAK: TABLE NONE ERROR: " + str(tdhhttp.get(url + str(i))) + " On League: " + league + " In Year: " + year)
 				break
 
 			if len(df_players) > 0:
@@ -133,7 +145,7 @@ def getskaters(league, year):
 			df_players = df_players.drop(columns=['fw_def'], axis=1)
 			print("Successfully scraped all " + league + " skater data from " + year + ".")
 			return df_players
-		else: print("LENGTH 0 ERROR: " + str(requests.get(url + str(1), timeout=500)) + " On League: " + league + " In Year: " + year)
+		else: print("LENGTH 0 ERROR: " + str(tdhhttp.get(url + str(1))) + " On League: " + league + " In Year: " + year)
 
 
 def getgoalies(league, year):
@@ -141,13 +153,13 @@ def getgoalies(league, year):
 	url = f'https://www.eliteprospects.com/league/{league}/stats/{year}?page-goalie='  # Collects data from https://www.eliteprospects.com/league/{league}/stats/{year}
 	print("Beginning scrape of " + league + " goalie data from " + year + ".")
 	players = []  # Return list with all goalies for season in link
-	page = requests.get(url + str(1) + "#goalies", timeout=500)
+	page = tdhhttp.get(url + str(1) + "#goalies")
 	first_page_string = str(page)
 	page, first_page_string = __403_rest(response_string=first_page_string, url=url, url_append='#goalies')
 	if first_page_string == '<Response [404]>': print(f"ERROR: {first_page_string} on league: {league} in year: {year}. Data doesn't exist for this league and season.")
 	else:
 		for i in range(1, 99):
-			page = requests.get(url + str(i), timeout=500)
+			page = tdhhttp.get(url + str(i))
 			page_string = str(page)
 			page, page_string = __403_rest(response_string=page_string, pageno=i, url=url)
 			soup = BeautifulSoup(page.content, "html.parser")
@@ -156,7 +168,7 @@ def getgoalies(league, year):
 			try:
 				df_players = tableDataText(player_table)
 			except AttributeError:
-				print("BREAK: TABLE NONE ERROR: " + str(requests.get(url + str(i), timeout=500)) + " On League: " + league + " In Year: " + year)
+				print("BREAK: TABLE NONE ERROR: " + str(tdhhttp.get(url + str(i))) + " On League: " + league + " In Year: " + year)
 				break
 
 			if len(df_players) > 0:
@@ -183,18 +195,18 @@ def getgoalies(league, year):
 			print("Successfully scraped all " + league + " goalie data from " + year + ".")
 			df_players = df_players.loc[((df_players.gp != 0) & (~pd.isna(df_players.gp)) & (df_players.gp != "0") & (df_players.gaa != "-"))]
 			return df_players
-		else: print("LENGTH 0 ERROR: " + str(requests.get(url + str(1), timeout=500)) + " On League: " + league + " In Year: " + year)
+		else: print("LENGTH 0 ERROR: " + str(tdhhttp.get(url + str(1))) + " On League: " + league + " In Year: " + year)
 
 
 def get_info(link):
 	"""A function that is built strictly for the back end and should not be run by the user."""  # TODO if it shouldnt be run by user it should be given private permissions (__)
-	page = requests.get(link, timeout=500)
+	page = tdhhttp.get(link)
 	soup = BeautifulSoup(page.content, "html.parser")
 	page_string = str(page)
 	# TODO this is different than __403_rest due to "evil" -- can still do it
 	while page_string == '<Response [403]>' or "evil" in str(soup.p):
 		print("403 Error. re-obtaining string and re-trying.")
-		page = requests.get(link, timeout=500)
+		page = tdhhttp.get(link)
 		page_string = str(page)
 		soup = BeautifulSoup(page.content, "html.parser")
 		time.sleep(60)
@@ -299,21 +311,21 @@ def get_league_skater_boxcars(league, seasons):
 	global error
 	error = 0
 
-	output = pd.DataFrame()
+	frames = []
 	if type(seasons) == str:
 		single = getskaters(league, seasons)
-		output = output.append(single)
+		frames.append(single)
 		print("Scraping " + league + " data is complete. You scraped skater data from " + seasons + ".")
-		return output
+		return __concat_frames(frames)
 
 	elif type(seasons) == tuple or type(seasons) == list:
 		for i in range(0, len(seasons)):
 			try:
 				single = getskaters(league, seasons[i])
-				output = output.append(single)
+				frames.append(single)
 			except KeyboardInterrupt as e:
 				hidden_patrick, error = 4, e
-				return output
+				return __concat_frames(frames)
 			except (
 					ConnectionError,
 					HTTPError,
@@ -321,9 +333,9 @@ def get_league_skater_boxcars(league, seasons):
 					ConnectTimeout
 			) as e:
 				hidden_patrick, error = 5, e
-				return output
+				return __concat_frames(frames)
 		print("Scraping " + league + " data is complete. You scraped skater data from " + scraped_season_list + ".")
-		return output
+		return __concat_frames(frames)
 
 
 def get_league_goalie_boxcars(league, seasons):
@@ -334,21 +346,21 @@ def get_league_goalie_boxcars(league, seasons):
 	hidden_patrick = 0
 	error = 0
 
-	output = pd.DataFrame()
+	frames = []
 	if type(seasons) == str:
 		single = getgoalies(league, seasons)
-		output = output.append(single)
+		frames.append(single)
 		print("Scraping " + league + " data is complete. You scraped goalie data from " + seasons + ".")
-		return output
+		return __concat_frames(frames)
 
 	elif type(seasons) == tuple or type(seasons) == list:
 		for i in range(0, len(seasons)):
 			try:
 				single = getgoalies(league, seasons[i])
-				output = output.append(single)
+				frames.append(single)
 			except KeyboardInterrupt as e:
 				hidden_patrick, error = 4, e
-				return output
+				return __concat_frames(frames)
 			except (
 					ConnectionError,
 					HTTPError,
@@ -356,9 +368,9 @@ def get_league_goalie_boxcars(league, seasons):
 					ConnectTimeout
 			) as e:
 				hidden_patrick, error = 5, e
-				return output
+				return __concat_frames(frames)
 		print("Scraping " + league + " data is complete. You scraped goalie data from " + scraped_season_list + ".")
-		return output
+		return __concat_frames(frames)
 
 
 def get_goalies(leagues, seasons):
@@ -418,10 +430,11 @@ def get_goalies(leagues, seasons):
 
 	elif type(seasons) == str and (type(leagues) == tuple or type(leagues) == list):
 		__log_prerun(data_type='goalie', leagues=league_string, seasons=season_string)
+		league_frames = []
 		for i in range(0, len(leagues)):
 			try:
 				targetleague = get_league_goalie_boxcars(leagues[i], seasons)
-				leaguesall = leaguesall.append(targetleague)
+				league_frames.append(targetleague)
 				if hidden_patrick == 4: raise KeyboardInterrupt
 				if hidden_patrick == 5: raise ConnectionError
 			except KeyboardInterrupt:
@@ -432,6 +445,7 @@ def get_goalies(leagues, seasons):
 				print(error)
 				time.sleep(100)
 				continue
+		leaguesall = __concat_frames(league_frames)
 		# TODO abstract get_league_list()
 		if len(set(leaguesall.league)) == 1: scraped_league_list = leaguesall.league
 		elif len(set(leaguesall.league)) > 2:
@@ -444,10 +458,11 @@ def get_goalies(leagues, seasons):
 		return leaguesall.reset_index().drop(columns='index')
 	elif (type(seasons) == tuple or type(seasons) == list) and (type(leagues) == tuple or type(leagues) == list):
 		__log_prerun(data_type='goalie', leagues=league_string, seasons=season_string)
+		league_frames = []
 		for i in range(0, len(leagues)):
 			try:
 				targetleague = get_league_goalie_boxcars(leagues[i], seasons)
-				leaguesall = leaguesall.append(targetleague)
+				league_frames.append(targetleague)
 				if hidden_patrick == 4: raise KeyboardInterrupt
 				if hidden_patrick == 5: raise ConnectionError
 			except KeyboardInterrupt:
@@ -459,6 +474,7 @@ def get_goalies(leagues, seasons):
 				time.sleep(100)
 				continue
 
+		leaguesall = __concat_frames(league_frames)
 		# TODO abstract get_league_list()
 		if len(set(leaguesall.league)) == 1: scraped_league_list = leaguesall.league
 		elif len(set(leaguesall.league)) > 2:
@@ -526,10 +542,11 @@ def get_skaters(leagues, seasons):
 		return leaguesall.reset_index().drop(columns='index')
 	elif type(seasons) == str and (type(leagues) == tuple or type(leagues) == list):
 		__log_prerun(data_type='skater', leagues=league_string, seasons=season_string)
+		league_frames = []
 		for i in range(0, len(leagues)):
 			try:
 				targetleague = get_league_skater_boxcars(leagues[i], seasons)
-				leaguesall = leaguesall.append(targetleague)
+				league_frames.append(targetleague)
 				if hidden_patrick == 4: raise KeyboardInterrupt
 				if hidden_patrick == 5: raise ConnectionError
 			except KeyboardInterrupt:
@@ -541,6 +558,7 @@ def get_skaters(leagues, seasons):
 				time.sleep(100)
 				continue
 
+		leaguesall = __concat_frames(league_frames)
 		if len(set(leaguesall.league)) == 1: scraped_league_list = leaguesall.league
 		elif len(set(leaguesall.league)) > 2:
 			scraped_league_list = str(((str(list(set(leaguesall.league))).replace("'", "").replace("(", "").replace(")", "").replace("[", "").replace("]", ""))).split(", ")[:-1]).replace("'", "").replace("[", "").replace("]", "") + ", and " + str(
@@ -553,10 +571,11 @@ def get_skaters(leagues, seasons):
 
 	elif (type(seasons) == tuple or type(seasons) == list) and (type(leagues) == tuple or type(leagues) == list):
 		__log_prerun(data_type='skater', leagues=league_string, seasons=season_string)
+		league_frames = []
 		for i in range(0, len(leagues)):
 			try:
 				targetleague = get_league_skater_boxcars(leagues[i], seasons)
-				leaguesall = leaguesall.append(targetleague)
+				league_frames.append(targetleague)
 				if hidden_patrick == 4: raise KeyboardInterrupt
 				if hidden_patrick == 5: raise ConnectionError
 			except KeyboardInterrupt:
@@ -568,6 +587,7 @@ def get_skaters(leagues, seasons):
 				time.sleep(100)
 				continue
 
+		leaguesall = __concat_frames(league_frames)
 		if len(set(leaguesall.league)) == 1: scraped_league_list = leaguesall.league
 		elif len(set(leaguesall.league)) > 2:
 			scraped_league_list = str(((str(list(set(leaguesall.league))).replace("'", "").replace("(", "").replace(")", "").replace("[", "").replace("]", ""))).split(", ")[:-1]).replace("'", "").replace("[", "").replace("]", "") + ", and " + str(
@@ -601,7 +621,7 @@ def _get_league_standings(league, year):  # TODO complete this
 	url = f'https://www.eliteprospects.com/league/{league}/{year}'  # ex: https://www.eliteprospects.com/league/nhl/2021-2022
 	print("Beginning scrape of " + league + " league standings data from " + year + ".")
 	teams = []  # Return list with all teams for league-season in link
-	page = requests.get(url + "#standings", timeout=500)
+	page = tdhhttp.get(url + "#standings")
 	first_page_string = str(page)
 	page, first_page_string = __403_rest(response_string=first_page_string, url=url, url_append='#standings')
 	if first_page_string == '<Response [404]>': print(f"ERROR: {first_page_string} on league: {league} in year: {year}. Data doesn't exist for this league and season.")
@@ -634,20 +654,19 @@ def __get_league_standings_boxcars(league, seasons):
 	global hidden_patrick
 	global error
 	hidden_patrick, error = 0, 0
-	output = pd.DataFrame()
+	frames = []
 	if type(seasons) == str:
 		# TODO this should be __get_standings
-		output = output.append(_get_league_standings(league, seasons))
+		frames.extend(_get_league_standings(league, seasons))
 		print("Scraping " + league + " data is complete. You scraped league standing data from " + seasons + ".")
-		return output
+		return __concat_frames(frames)
 	elif type(seasons) == tuple or type(seasons) == list:
 		for i in range(0, len(seasons)):
 			try:
-				# TODO check if df.append() is still valid
-				output = output.append(_get_league_standings(league, seasons[i]))
+				frames.extend(_get_league_standings(league, seasons[i]))
 			except KeyboardInterrupt as e:
 				hidden_patrick, error = 4, e
-				return output
+				return __concat_frames(frames)
 			except (
 					ConnectionError,
 					HTTPError,
@@ -655,9 +674,9 @@ def __get_league_standings_boxcars(league, seasons):
 					ConnectTimeout
 			) as e:
 				hidden_patrick, error = 5, e
-				return output
+				return __concat_frames(frames)
 		print("Scraping " + league + " data is complete. You scraped goalie data from " + scraped_season_list + ".")
-		return output
+		return __concat_frames(frames)
 
 
 def get_league_standings(leagues: List[str], seasons: List[int]) -> pd.DataFrame:
@@ -711,10 +730,11 @@ def get_league_standings(leagues: List[str], seasons: List[int]) -> pd.DataFrame
 		return leaguesall.reset_index().drop(columns='index')
 	elif type(seasons) == str and (type(leagues) == tuple or type(leagues) == list):
 		# __log_prerun(data_type='league standings', leagues=league_string, seasons=season_string)
+		league_frames = []
 		for i in range(0, len(leagues)):
 			try:
 				targetleague = __get_league_standings_boxcars(leagues[i], seasons)
-				leaguesall = leaguesall.append(targetleague)
+				league_frames.append(targetleague)
 				if hidden_patrick == 4: raise KeyboardInterrupt
 				if hidden_patrick == 5: raise ConnectionError
 			except KeyboardInterrupt:
@@ -725,6 +745,7 @@ def get_league_standings(leagues: List[str], seasons: List[int]) -> pd.DataFrame
 				print(error)
 				time.sleep(100)
 				continue
+		leaguesall = __concat_frames(league_frames)
 		# if len(set(leaguesall.league)) == 1:
 		# 	scraped_league_list = leaguesall.league
 		# elif len(set(leaguesall.league)) > 2:
@@ -739,10 +760,11 @@ def get_league_standings(leagues: List[str], seasons: List[int]) -> pd.DataFrame
 		return leaguesall.reset_index().drop(columns='index')
 	elif (type(seasons) == tuple or type(seasons) == list) and (type(leagues) == tuple or type(leagues) == list):
 		# __log_prerun(data_type='league standings', leagues=league_string, seasons=season_string)
+		league_frames = []
 		for i in range(0, len(leagues)):
 			try:
 				targetleague = __get_league_standings_boxcars(leagues[i], seasons)
-				leaguesall = leaguesall.append(targetleague)
+				league_frames.append(targetleague)
 				if hidden_patrick == 4: raise KeyboardInterrupt
 				if hidden_patrick == 5: raise ConnectionError
 			except KeyboardInterrupt:
@@ -754,6 +776,7 @@ def get_league_standings(leagues: List[str], seasons: List[int]) -> pd.DataFrame
 				time.sleep(100)
 				continue
 
+		leaguesall = __concat_frames(league_frames)
 		# if len(set(leaguesall.league)) == 1:
 		# 	scraped_league_list = leaguesall.league
 		# elif len(set(leaguesall.league)) > 2:
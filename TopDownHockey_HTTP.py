@@ -0,0 +1,204 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP client used by both the NHL and EliteProspects scrapers.
+# Every request goes through one pooled session per process, so repeated hits to the same host reuse an open connection
+# instead of paying for a new TCP/TLS handshake each time.
+# Responses for finished games never change, so they can optionally be kept in an on-disk cache and re-parsed without the network.
+
+settings = {
+    'timeout': 500,
+    'max_per_host': 8,
+    'pool_maxsize': 16,
+    'headers': {
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    },
+    'cache_dir': None,
+    'offline': False,
+}
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_host_limits = {}
+_prefetch_pool = None
+_prefetched = OrderedDict()
+
+def configure(timeout = None, max_per_host = None, pool_maxsize = None, headers = None, cache_dir = None, offline = None):
+    """
+    Change the settings of the shared HTTP client. The session is rebuilt the next time it is used.
+
+    timeout: Default timeout in seconds for every request.
+    max_per_host: Maximum number of requests in flight to a single host at once, across all threads.
+    pool_maxsize: Number of keep-alive connections held open per host.
+    headers: Extra headers sent with every request.
+    cache_dir: Folder where cacheable responses are stored. Caching is off until this is set.
+    offline: If True, cacheable requests are answered from the cache only and never hit the network.
+    """
+    global _session, _session_pid
+
+    with _lock:
+        if timeout is not None:
+            settings['timeout'] = timeout
+        if max_per_host is not None:
+            settings['max_per_host'] = max_per_host
+            _host_limits.clear()
+        if pool_maxsize is not None:
+            settings['pool_maxsize'] = pool_maxsize
+        if headers is not None:
+            settings['headers'].update(headers)
+        if cache_dir is not None:
+            settings['cache_dir'] = cache_dir
+        if offline is not None:
+            settings['offline'] = offline
+        _session = None
+        _session_pid = None
+
+def get_session():
+    """
+    Return the pooled session for this process, building it if needed. Worker processes each get their own.
+    """
+    global _session, _session_pid, _prefetch_pool
+
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            if _session_pid != os.getpid():
+                # Anything prefetched belongs to the parent process.
+                _prefetch_pool = None
+                _prefetched.clear()
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections = settings['pool_maxsize'], pool_maxsize = settings['pool_maxsize'])
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(settings['headers'])
+            _session = session
+            _session_pid = os.getpid()
+            _host_limits.clear()
+        return _session
+
+def _host_limit(url):
+    host = urlparse(url).netloc
+    with _lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(settings['max_per_host'])
+        return _host_limits[host]
+
+def _cache_paths(url):
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return os.path.join(settings['cache_dir'], 'urls', key[:2], key + '.json')
+
+def _object_path(digest):
+    return os.path.join(settings['cache_dir'], 'objects', digest[:2], digest + '.gz')
+
+def _write_atomic(path, data):
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok = True)
+    handle, temp_path = tempfile.mkstemp(dir = folder)
+    with os.fdopen(handle, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def _read_cache(url):
+    index_path = _cache_paths(url)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r') as f:
+        entry = json.load(f)
+    with open(_object_path(entry['object']), 'rb') as f:
+        content = gzip.decompress(f.read())
+    response = requests.models.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = entry['encoding']
+    response._content = content
+    return response
+
+def _write_cache(url, response):
+    # Bodies are stored under the hash of their contents, so identical reports behind different urls are only kept once.
+    digest = hashlib.sha256(response.content).hexdigest()
+    object_path = _object_path(digest)
+    if not os.path.exists(object_path):
+        _write_atomic(object_path, gzip.compress(response.content))
+    _write_atomic(_cache_paths(url), json.dumps({'url': url, 'object': digest, 'encoding': response.encoding}).encode('utf-8'))
+
+def _missing(url):
+    response = requests.models.Response()
+    response.status_code = 404
+    response.reason = 'Not in cache'
+    response.url = url
+    response._content = b''
+    return response
+
+def _fetch(url, timeout = None, cache = False, offline = False, **kwargs):
+    if (cache or offline) and settings['cache_dir'] is not None:
+        cached = _read_cache(url)
+        if cached is not None:
+            return cached
+    if offline:
+        return _missing(url)
+    session = get_session()
+    if timeout is None:
+        timeout = settings['timeout']
+    with _host_limit(url):
+        response = session.get(url, timeout = timeout, **kwargs)
+    if cache and settings['cache_dir'] is not None and response.status_code == 200:
+        _write_cache(url, response)
+    return response
+
+def get(url, timeout = None, cache = False, offline = False, **kwargs):
+    """
+    GET a url through the shared session, waiting for a free slot if the host is already at its limit.
+
+    cache: Mark the response as safe to keep. It is read from and written to cache_dir when one is configured.
+    offline: Only look in the cache. A url that was never cached comes back as a 404.
+    """
+    offline = offline or (cache and settings['offline'])
+    if not offline:
+        with _lock:
+            future = _prefetched.pop(url, None)
+        # A prefetched download was made with the default timeout and no extra arguments, so it only stands in for a plain get().
+        if future is not None and timeout is None and len(kwargs) == 0:
+            return future.result()
+    return _fetch(url, timeout = timeout, cache = cache, offline = offline, **kwargs)
+
+def prefetch(urls, cache = True):
+    """
+    Start downloading a list of urls in the background. A later get() for one of them waits on that download instead of starting a new one.
+    """
+    global _prefetch_pool
+
+    if cache and settings['offline']:
+        # Reading from the cache is already fast, nothing to get ahead of.
+        return
+
+    get_session()
+    with _lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(max_workers = settings['pool_maxsize'])
+        for url in urls:
+            if url not in _prefetched:
+                _prefetched[url] = _prefetch_pool.submit(_fetch, url, cache = cache)
+        # Downloads nobody asked for (say, the game failed before its shifts were parsed) shouldn't pile up forever.
+        while len(_prefetched) > 20 * settings['pool_maxsize']:
+            _prefetched.popitem(last = False)
+
+def discard(urls):
+    """
+    Drop the background downloads of urls that are no longer going to be asked for, cancelling those that haven't started yet.
+    """
+    with _lock:
+        for url in urls:
+            future = _prefetched.pop(url, None)
+            if future is not None:
+                future.cancel()
@@ -3,6 +3,8 @@ import pandas as pd
 from bs4  import BeautifulSoup
 import requests
 import time
+import os
+import io
 from datetime import datetime 
 import warnings
 warnings.filterwarnings("ignore")
@@ -10,117 +12,420 @@ import sys
 import json
 from json import loads, dumps
 import lxml
+import lxml.html
 from requests import ConnectionError, ReadTimeout, ConnectTimeout, HTTPError, Timeout
 import xml
 import re
-from natsort import natsorted
+from natsort import natsorted, index_natsorted
 import xml.etree.ElementTree as ET
 import xmltodict
 from xml.parsers.expat import ExpatError
 from requests.exceptions import ChunkedEncodingError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# pyarrow is only needed to write and read Parquet datasets.
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+    ds = None
+
+# orjson decodes the API's live feeds several times faster than json, but isn't required.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    from . import TopDownHockey_HTTP as tdhhttp
+except ImportError:
+    import TopDownHockey_HTTP as tdhhttp
 
 # ewc stands for "Events we care about."
 
 ewc = ['SHOT', 'HIT', 'BLOCK', 'MISS', 'GIVE', 'TAKE', 'GOAL']
 
-def scrape_standings(season):
-    """
-    Takes an integer in "20202021" form and scrapes standings for that season.
-    """
-    url = 'https://statsapi.web.nhl.com/api/v1/standings?season=' + str(season)
-    page = requests.get(url, timeout = 500)
-    loaddict = json.loads(page.content)
-    record_df = pd.DataFrame(loaddict['records'])
-    team = []
-    wins = []
-    losses = []
-    otl = []
-    rw = []
-    ga = []
-    gf = []
-    row = []
-    gp = []
-    pts = []
-    divisions = []
-    conferences = []
-
-    for i in range(0, len(record_df['teamRecords'])):
-        div = (record_df['division'].iloc[i]['name'])
-        conf = (record_df['conference'].iloc[i]['name'])
-        for x in range(0, len((record_df['teamRecords'].iloc[i]))):
-            divisions.append(div)
-            conferences.append(conf)
-            team.append(record_df['teamRecords'].iloc[i][x]['team']['name'])
-            wins.append(record_df['teamRecords'].iloc[i][x]['leagueRecord']['wins'])
-            losses.append(record_df['teamRecords'].iloc[i][x]['leagueRecord']['losses'])
-            otl.append(record_df['teamRecords'].iloc[i][x]['leagueRecord']['ot'])
-            gf.append(record_df['teamRecords'].iloc[i][x]['goalsScored'])
-            ga.append(record_df['teamRecords'].iloc[i][x]['goalsAgainst'])
-            if season>20092010:
-                row.append(record_df['teamRecords'].iloc[i][x]['row'])
-            gp.append(record_df['teamRecords'].iloc[i][x]['gamesPlayed'])
-            pts.append(record_df['teamRecords'].iloc[i][x]['points'])
-            if season>20192020:
-                rw.append(record_df['teamRecords'].iloc[i][x]['regulationWins'])
-                
-    if season < 20092010:
-        stand = pd.DataFrame().assign(Team = team, Division = divisions, Conference = conferences,
-                                      GP = gp, W = wins, L = losses, OTL = otl, PTS = pts,  GF = gf, GA = ga)
-        stand = stand.assign(GD = stand.GF - stand.GA).sort_values(by = ['PTS', 'GD'], ascending = False)
-        return stand.assign(Season = season).loc[:, ['Season', 'Team', 'Division', 'Conference', 'GP', 'W', 'L', 'OTL', 'PTS', 'GF','GA', 'GD']].reset_index(drop = True)
-            
-    if ((season<20202021) & (season>20092010)):
-        stand = pd.DataFrame().assign(Team = team, Division = divisions, Conference = conferences,
-                                      GP = gp, W = wins, L = losses, OTL = otl, PTS = pts,  GF = gf, GA = ga, ROW = row)
-        stand = stand.assign(GD = stand.GF - stand.GA).sort_values(by = ['PTS', 'ROW', 'GD'], ascending = False)
-        return stand.assign(Season = season).loc[:, ['Season', 'Team', 'Division', 'Conference', 'GP', 'W', 'L', 'OTL', 'PTS', 'GF','GA', 'ROW', 'GD']].reset_index(drop = True)
+# Player name fixes, used by normalize_names. Lists of names and fixes from Evolving Hockey Scraper.
+# First, common first names are shortened anywhere they appear.
+
+name_prefix_fixes = [('ALEXANDRE ', 'ALEX '), ('ALEXANDER ', 'ALEX '), ('CHRISTOPHER ', 'CHRIS ')]
+
+# Then, exact spellings are fixed, keyed by the spelling found in each source. HTML roster and shift reports:
+html_name_fixes = {
+    "ANDREI KASTSITSYN": "ANDREI KOSTITSYN",
+    "AJ GREER": "A.J. GREER",
+    "ANDREW GREENE": "ANDY GREENE",
+    "ANDREW WOZNIEWSKI": "ANDY WOZNIEWSKI",
+    "ANTHONY DEANGELO": "TONY DEANGELO",
+    "BATES (JON) BATTAGLIA": "BATES BATTAGLIA",
+    "BJ CROMBEEN": "B.J. CROMBEEN",
+    "B.J CROMBEEN": "B.J. CROMBEEN",
+    "BRANDON CROMBEEN": "B.J. CROMBEEN",
+    "B J CROMBEEN": "B.J. CROMBEEN",
+    "BRADLEY MILLS": "BRAD MILLS",
+    "CAMERON BARKER": "CAM BARKER",
+    "COLIN (JOHN) WHITE": "COLIN WHITE",
+    "CRISTOVAL NIEVES": "BOO NIEVES",
+    "CHRIS VANDE VELDE": "CHRIS VANDEVELDE",
+    "DANNY BRIERE": "DANIEL BRIERE",
+    "DAN CLEARY": "DANIEL CLEARY",
+    "DANNY CLEARY": "DANIEL CLEARY",
+    "DANIEL GIRARDI": "DAN GIRARDI",
+    "DANNY O'REGAN": "DANIEL O'REGAN",
+    "DANIEL CARCILLO": "DAN CARCILLO",
+    "DAVID JOHNNY ODUYA": "JOHNNY ODUYA",
+    "DAVID BOLLAND": "DAVE BOLLAND",
+    "DENIS JR. GAUTHIER": "DENIS GAUTHIER",
+    "DWAYNE KING": "DJ KING",
+    "EDWARD PURCELL": "TEDDY PURCELL",
+    "EMMANUEL FERNANDEZ": "MANNY FERNANDEZ",
+    "EMMANUEL LEGACE": "MANNY LEGACE",
+    "EVGENII DADONOV": "EVGENY DADONOV",
+    "FREDDY MODIN": "FREDRIK MODIN",
+    "FREDERICK MEYER IV": "FREDDY MEYER",
+    "HARRISON ZOLNIERCZYK": "HARRY ZOLNIERCZYK",
+    "ILJA BRYZGALOV": "ILYA BRYZGALOV",
+    "JACOB DOWELL": "JAKE DOWELL",
+    "JAMES HOWARD": "JIMMY HOWARD",
+    "JAMES VANDERMEER": "JIM VANDERMEER",
+    "JAMES WYMAN": "JT WYMAN",
+    "JOHN HILLEN III": "JACK HILLEN",
+    "JOHN ODUYA": "JOHNNY ODUYA",
+    "JOHN PEVERLEY": "RICH PEVERLEY",
+    "JONATHAN SIM": "JON SIM",
+    "JONATHON KALINSKI": "JON KALINSKI",
+    "JONATHAN AUDY-MARCHESSAULT": "JONATHAN MARCHESSAULT",
+    "JOSEPH CRABB": "JOEY CRABB",
+    "JOSEPH CORVO": "JOE CORVO",
+    "JOSHUA BAILEY": "JOSH BAILEY",
+    "JOSHUA HENNESSY": "JOSH HENNESSY",
+    "JOSHUA MORRISSEY": "JOSH MORRISSEY",
+    "JEAN-FRANCOIS JACQUES": "J-F JACQUES",
+    "J P DUMONT": "J-P DUMONT",
+    "JEAN-PIERRE DUMONT": "J-P DUMONT",
+    "JT COMPHER": "J.T. COMPHER",
+    "KRISTOPHER LETANG": "KRIS LETANG",
+    "KRYSTOFER BARCH": "KRYS BARCH",
+    "KRYSTOFER KOLANOS": "KRYS KOLANOS",
+    "MARC POULIOT": "MARC-ANTOINE POULIOT",
+    "MARTIN ST LOUIS": "MARTIN ST. LOUIS",
+    "MARTIN ST PIERRE": "MARTIN ST. PIERRE",
+    "MARTY HAVLAT": "MARTIN HAVLAT",
+    "MATTHEW CARLE": "MATT CARLE",
+    "MATHEW DUMBA": "MATT DUMBA",
+    "MATTHEW BENNING": "MATT BENNING",
+    "MATTHEW IRWIN": "MATT IRWIN",
+    "MATTHEW NIETO": "MATT NIETO",
+    "MATTHEW STAJAN": "MATT STAJAN",
+    "MAXIM MAYOROV": "MAKSIM MAYOROV",
+    "MAXIME TALBOT": "MAX TALBOT",
+    "MAXWELL REINHART": "MAX REINHART",
+    "MICHAEL BLUNDEN": "MIKE BLUNDEN",
+    "MICHAËL BOURNIVAL": "MICHAEL BOURNIVAL",
+    "MICHAÃL BOURNIVAL": "MICHAEL BOURNIVAL",
+    "MICHAEL CAMMALLERI": "MIKE CAMMALLERI",
+    "MICHAEL FERLAND": "MICHEAL FERLAND",
+    "MICHAEL GRIER": "MIKE GRIER",
+    "MICHAEL KNUBLE": "MIKE KNUBLE",
+    "MICHAEL KOMISAREK": "MIKE KOMISAREK",
+    "MICHAEL MATHESON": "MIKE MATHESON",
+    "MICHAEL MODANO": "MIKE MODANO",
+    "MICHAEL RUPP": "MIKE RUPP",
+    "MICHAEL SANTORELLI": "MIKE SANTORELLI",
+    "MICHAEL SILLINGER": "MIKE SILLINGER",
+    "MITCHELL MARNER": "MITCH MARNER",
+    "NATHAN GUENIN": "NATE GUENIN",
+    "NICHOLAS BOYNTON": "NICK BOYNTON",
+    "NICHOLAS DRAZENOVIC": "NICK DRAZENOVIC",
+    "NICKLAS BERGFORS": "NICLAS BERGFORS",
+    "NICKLAS GROSSMAN": "NICKLAS GROSSMANN",
+    "NICOLAS PETAN": "NIC PETAN",
+    "NIKLAS KRONVALL": "NIKLAS KRONWALL",
+    "NIKOLAI ANTROPOV": "NIK ANTROPOV",
+    "NIKOLAI KULEMIN": "NIKOLAY KULEMIN",
+    "NIKOLAI ZHERDEV": "NIKOLAY ZHERDEV",
+    "OLIVIER MAGNAN-GRENIER": "OLIVIER MAGNAN",
+    "PAT MAROON": "PATRICK MAROON",
+    "P. J. AXELSSON": "P.J. AXELSSON",
+    "PER JOHAN AXELSSON": "P.J. AXELSSON",
+    "PK SUBBAN": "P.K. SUBBAN",
+    "P.K SUBBAN": "P.K. SUBBAN",
+    "PIERRE PARENTEAU": "P.A. PARENTEAU",
+    "PIERRE-ALEX PARENTEAU": "P.A. PARENTEAU",
+    "PIERRE-ALEXANDRE PARENTEAU": "P.A. PARENTEAU",
+    "PA PARENTEAU": "P.A. PARENTEAU",
+    "P.A PARENTEAU": "P.A. PARENTEAU",
+    "P-A PARENTEAU": "P.A. PARENTEAU",
+    "PHILIP VARONE": "PHIL VARONE",
+    "QUINTIN HUGHES": "QUINN HUGHES",
+    "RAYMOND MACIAS": "RAY MACIAS",
+    "RJ UMBERGER": "R.J. UMBERGER",
+    "ROBERT BLAKE": "ROB BLAKE",
+    "ROBERT EARL": "ROBBIE EARL",
+    "ROBERT HOLIK": "BOBBY HOLIK",
+    "ROBERT SCUDERI": "ROB SCUDERI",
+    "RODNEY PELLEY": "ROD PELLEY",
+    "SIARHEI KASTSITSYN": "SERGEI KOSTITSYN",
+    "SIMEON VARLAMOV": "SEMYON VARLAMOV",
+    "STAFFAN KRONVALL": "STAFFAN KRONWALL",
+    "STEVEN REINPRECHT": "STEVE REINPRECHT",
+    "TJ GALIARDI": "T.J. GALIARDI",
+    "TJ HENSICK": "T.J. HENSICK",
+    "TJ OSHIE": "T.J. OSHIE",
+    "T.J OSHIE": "T.J. OSHIE",
+    "TOBY ENSTROM": "TOBIAS ENSTROM",
+    "TOMMY SESTITO": "TOM SESTITO",
+    "VACLAV PROSPAL": "VINNY PROSPAL",
+    "VINCENT HINOSTROZA": "VINNIE HINOSTROZA",
+    "WILLIAM THOMAS": "BILL THOMAS",
+    "ZACHARY ASTON-REESE": "ZACH ASTON-REESE",
+    "ZACHARY SANFORD": "ZACH SANFORD",
+    "ZACHERY STORTINI": "ZACK STORTINI",
+    "MATTHEW MURRAY": "MATT MURRAY",
+    "J-SEBASTIEN AUBIN": "JEAN-SEBASTIEN AUBIN",
+    "J.F. BERUBE": "J-F BERUBE",
+    "JEAN-FRANCOIS BERUBE": "J-F BERUBE",
+    "JEFF DROUIN-DESLAURIERS": "JEFF DESLAURIERS",
+    "NICHOLAS BAPTISTE": "NICK BAPTISTE",
+    "OLAF KOLZIG": "OLIE KOLZIG",
+    "STEPHEN VALIQUETTE": "STEVE VALIQUETTE",
+    "THOMAS MCCOLLUM": "TOM MCCOLLUM",
+    "TIMOTHY JR. THOMAS": "TIM THOMAS",
+    "TIM GETTINGER": "TIMOTHY GETTINGER",
+    "NICHOLAS SHORE": "NICK SHORE",
+    "T.J. TYNAN": "TJ TYNAN",
+    "ALEXIS LAFRENI?RE": "ALEXIS LAFRENIÈRE",
+    "ALEXIS LAFRENIERE": "ALEXIS LAFRENIÈRE",
+    "ALEXIS LAFRENIÃRE": "ALEXIS LAFRENIÈRE",
+    "TIM STUTZLE": "TIM STÜTZLE",
+    "TIM ST?TZLE": "TIM STÜTZLE",
+    "TIM STÃTZLE": "TIM STÜTZLE",
+    "EGOR SHARANGOVICH": "YEGOR SHARANGOVICH",
+    "CALLAN FOOTE": "CAL FOOTE",
+    "MATTIAS JANMARK-NYLEN": "MATTIAS JANMARK",
+    "JOSH DUNNE": "JOSHUA DUNNE",
+}
+
+# NHL API feed:
+api_name_fixes = {
+    "ALEX PECHURSKIY": "ALEX PECHURSKI",
+    "BEN ONDRUS": "BENJAMIN ONDRUS",
+    "CAL PETERSEN": "CALVIN PETERSEN",
+    "DANIEL CARCILLO": "DAN CARCILLO",
+    "DANNY O'REGAN": "DANIEL O'REGAN",
+    "EVGENII DADONOV": "EVGENY DADONOV",
+    "FREDDY MODIN": "FREDRIK MODIN",
+    "ILYA ZUBOV": "ILJA ZUBOV",
+    "JEAN-FRANCOIS JACQUES": "J-F JACQUES",
+    "JIM DOWD": "JAMES DOWD",
+    "JEFF HAMILTON": "JEFFREY HAMILTON",
+    "JEFF PENNER": "JEFFREY PENNER",
+    "MARTIN ST LOUIS": "MARTIN ST. LOUIS",
+    "MARTIN ST PIERRE": "MARTIN ST. PIERRE",
+    "MICHAEL CAMMALLERI": "MIKE CAMMALLERI",
+    "MIKE VERNACE": "MICHAEL VERNACE",
+    "MIKE YORK": "MICHAEL YORK",
+    "MITCHELL MARNER": "MITCH MARNER",
+    "PAT MAROON": "PATRICK MAROON",
+    "PA PARENTEAU": "P.A. PARENTEAU",
+    "TJ GALIARDI": "T.J. GALIARDI",
+    "TOBY ENSTROM": "TOBIAS ENSTROM",
+    "ZACK FITZGERALD": "ZACH FITZGERALD",
+    "TIM GETTINGER": "TIMOTHY GETTINGER",
+    "NICHOLAS SHORE": "NICK SHORE",
+    "T.J. TYNAN": "TJ TYNAN",
+    "ALEXIS LAFRENI?RE": "ALEXIS LAFRENIÈRE",
+    "ALEXIS LAFRENIERE": "ALEXIS LAFRENIÈRE",
+    "TIM STUTZLE": "TIM STÜTZLE",
+    "TIM ST?TZLE": "TIM STÜTZLE",
+    "EGOR SHARANGOVICH": "YEGOR SHARANGOVICH",
+    "CALLAN FOOTE": "CAL FOOTE",
+    "JOSH DUNNE": "JOSHUA DUNNE",
+}
+
+# ESPN feed:
+espn_name_fixes = {
+    "PATRICK MAROON": "PAT MAROON",
+    "J T COMPHER": "J.T. COMPHER",
+    "J T MILLER": "J.T. MILLER",
+    "T J OSHIE": "T.J. OSHIE",
+    "ALEXIS LAFRENIERE": "ALEXIS LAFRENIÈRE",
+    "ALEXIS LAFRENI RE": "ALEXIS LAFRENIÈRE",
+    "TIM STUTZLE": "TIM STÜTZLE",
+    "TIM ST TZLE": "TIM STÜTZLE",
+    "T.J. BRODIE": "TJ BRODIE",
+    "MATTHEW IRWIN": "MATT IRWIN",
+    "STEVE KAMPFER": "STEVEN KAMPFER",
+    "JEFFREY TRUCHON-VIEL": "JEFFREY VIEL",
+    "ZACHARY JONES": "ZAC JONES",
+    "MITCH MARNER": "MITCHELL MARNER",
+    "MATHEW DUMBA": "MATT DUMBA",
+    "JOSHUA MORRISSEY": "JOSH MORRISSEY",
+    "P K SUBBAN": "P.K. SUBBAN",
+    "EGOR SHARANGOVICH": "YEGOR SHARANGOVICH",
+    "MAXIME COMTOIS": "MAX COMTOIS",
+    "NICHOLAS CAAMANO": "NICK CAAMANO",
+    "DANIEL CARCILLO": "DAN CARCILLO",
+    "ALEXANDER OVECHKIN": "ALEX OVECHKIN",
+    "MICHAEL CAMMALLERI": "MIKE CAMMALLERI",
+    "DAVE STECKEL": "DAVID STECKEL",
+    "JIM DOWD": "JAMES DOWD",
+    "MAXIME TALBOT": "MAX TALBOT",
+    "MIKE ZIGOMANIS": "MICHAEL ZIGOMANIS",
+    "VINNY PROSPAL": "VACLAV PROSPAL",
+    "MIKE YORK": "MICHAEL YORK",
+    "JACOB DOWELL": "JAKE DOWELL",
+    "MICHAEL RUPP": "MIKE RUPP",
+    "ALEXEI KOVALEV": "ALEX KOVALEV",
+    "SLAVA KOZLOV": "VYACHESLAV KOZLOV",
+    "JEFF HAMILTON": "JEFFREY HAMILTON",
+    "JOHNNY POHL": "JOHN POHL",
+    "DANIEL GIRARDI": "DAN GIRARDI",
+    "NIKOLAI ZHERDEV": "NIKOLAY ZHERDEV",
+    "J.P. DUMONT": "J-P DUMONT",
+    "DWAYNE KING": "DJ KING",
+    "JOHN ODUYA": "JOHNNY ODUYA",
+    "ROBERT SCUDERI": "ROB SCUDERI",
+    "DOUG MURRAY": "DOUGLAS MURRAY",
+    "VACLAV PROSPAL": "VINNY PROSPAL",
+    "RICH PEVERLY": "RICH PEVERLEY",
+}
+
+# Different players who went by the same name, told apart by position or season. The roster is the only report that lists positions.
+
+shared_name_fixes = [
+    ('SEBASTIAN AHO', 'SEBASTIAN AHO SWE', lambda position, season: position == 'D'),
+    ('COLIN WHITE', 'COLIN WHITE CAN', lambda position, season: position == 'D'),
+    ('SEAN COLLINS', 'SEAN COLLINS CAN', lambda position, season: position == 'D'),
+    ('ALEX PICARD', 'ALEX PICARD F', lambda position, season: position != 'D'),
+    ('ERIK GUSTAFSSON', 'ERIK GUSTAFSSON 88', lambda position, season: season < 20132014),
+    ('MIKKO LEHTONEN', 'MIKKO LEHTONEN F', lambda position, season: season < 20202021),
+    ('COLIN', 'COLIN WHITE CAN', lambda position, season: True),
+]
+
+def normalize_names(names, fixes, season = None, positions = None, shared = None):
+    """
+    Takes a column of player names and returns an array of the same names with the spelling fixes applied.
     
-    else:
-        stand = pd.DataFrame().assign(Team = team, Division = divisions, Conference = conferences, 
-                                      GP = gp, W = wins, L = losses, OTL = otl, PTS = pts,  GF = gf, GA = ga, RW = rw, ROW = row)
-        stand = stand.assign(GD = stand.GF - stand.GA).sort_values(by = ['PTS', 'RW', 'ROW', 'GD'], ascending = False)
-        return stand.assign(Season = season).loc[:, ['Season', 'Team', 'Division', 'Conference', 'GP', 'W', 'L', 'OTL', 'PTS', 'GF','GA', 'RW', 'ROW', 'GD']].reset_index(drop = True)
+    Every distinct name is only fixed once and the results are spread back over the column, so this costs the same whether 
+    a player shows up once or in every row.
+    
+    fixes: One of the dictionaries above, mapping a misspelled name to the fixed one.
+    season, positions, shared: Used together to tell apart players in shared_name_fixes. Season is an integer in 20202021 form.
+    """
+    codes, uniques = pd.factorize(pd.Series(names), sort = False)
+    
+    fixed = pd.Series(uniques, dtype = object)
+    for old, new in name_prefix_fixes:
+        fixed = fixed.str.replace(old, new, regex = False)
+    fixed = fixed.map(fixes).fillna(fixed)
+    
+    # Missing names come back from factorize as -1, which picks up the NaN on the end.
+    result = np.append(np.asarray(fixed, dtype = object), np.nan)[codes]
+    
+    if shared is not None:
+        positions = np.asarray(positions, dtype = object)
+        for name, new_name, applies in shared:
+            rows = (result == name) & applies(positions, season)
+            result[rows] = new_name
+    
+    return result
+
+standings_columns = ['Season', 'Team', 'Division', 'Conference', 'GP', 'W', 'L', 'OTL', 'PTS', 'GF', 'GA', 'RW', 'ROW', 'GD']
+
+def _standings_url(season):
+    return 'https://statsapi.web.nhl.com/api/v1/standings?season=' + str(season)
+
+def _standings_rows(season, loaddict):
+    """
+    One row per team in a season's standings, in standings_columns order (less GD). RW and ROW are None before they were counted.
+    """
+    return [(season, record['team']['name'], division['division']['name'], division['conference']['name'], record['gamesPlayed'], 
+             record['leagueRecord']['wins'], record['leagueRecord']['losses'], record['leagueRecord']['ot'], record['points'], 
+             record['goalsScored'], record['goalsAgainst'], 
+             record['regulationWins'] if season>20192020 else None, 
+             record['row'] if season>20092010 else None)
+            for division in loaddict['records'] for record in division['teamRecords']]
+
+def scrape_standings(season = None, seasons = None):
+    """
+    Takes an integer in "20202021" form and scrapes standings for that season, or a list of them in seasons and scrapes them all at once.
+    
+    All seasons come back in one frame, ordered by season and then by the tiebreakers of each season's era. RW is null before 20202021 and ROW 
+    before 20102011; either is left out if none of the seasons have it.
+    """
+    if seasons is None:
+        seasons = [season]
+    seasons = [int(season) for season in seasons]
+    # Standings of seasons that are over won't change anymore.
+    finished = [season for season in seasons if season % 10000 < datetime.now().year]
+    tdhhttp.prefetch([_standings_url(season) for season in finished])
+    tdhhttp.prefetch([_standings_url(season) for season in seasons if season not in finished], cache = False)
+    rows = [row for season in seasons for row in _standings_rows(season, _json_loads(tdhhttp.get(_standings_url(season), cache = season in finished).content))]
+    
+    stand = pd.DataFrame(rows, columns = standings_columns[:-1]).astype({'RW': 'Int64', 'ROW': 'Int64'})
+    stand = stand.assign(GD = stand.GF - stand.GA).sort_values(by = ['Season', 'PTS', 'RW', 'ROW', 'GD'], ascending = [True, False, False, False, False])
+    columns = [column for column in standings_columns if column not in ['RW', 'ROW'] or stand[column].notna().any()]
+    return stand.loc[:, columns].reset_index(drop = True)
+
+schedule_columns = ['ID', 'link', 'type', 'season', 'date', 'homeid', 'homename', 'homescore', 'awayid', 'awayname', 'awayscore', 'state', 'venue']
+
+def _schedule_url(start_date, end_date):
+    return 'https://statsapi.web.nhl.com/api/v1/schedule?startDate=' + start_date + '&endDate=' + end_date
+
+def _schedule_chunks(start_date, end_date):
+    """
+    Split a date range into calendar months, as (start, end, finished). Months that are over are always requested whole, so each one has 
+    the same url whatever range it was part of and can be kept in the cache. The current month and later ones are cut to the range.
+    """
+    today = pd.Timestamp.now().normalize()
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    chunks = []
+    for month in pd.period_range(start, end, freq = 'M'):
+        first = month.start_time
+        last = month.end_time.normalize()
+        finished = last < today
+        if not finished:
+            first = max(first, start)
+            last = min(last, end)
+        chunks.append((str(first.date()), str(last.date()), finished))
+    return chunks
+
+def _schedule_rows(loaddict, start_date, end_date):
+    """
+    One row per game in a schedule response, in schedule_columns order, keeping only the dates between start_date and end_date.
+    """
+    return [(game['gamePk'], game['link'], game['gameType'], game['season'], game['gameDate'], 
+             game['teams']['home']['team']['id'], game['teams']['home']['team']['name'], game['teams']['home'].get('score'), 
+             game['teams']['away']['team']['id'], game['teams']['away']['team']['name'], game['teams']['away'].get('score'), 
+             game['status']['detailedState'], (game.get('venue') or {}).get('name'))
+            for day in loaddict['dates'] if start_date <= day['date'] <= end_date for game in day['games']]
 
 def scrape_schedule(start_date, end_date):
     
     """
     Scrape the NHL's API and get a schedule back.
+    
+    The range is requested one month at a time, all months at once. Months that are over are kept in the HTTP cache if one is configured, 
+    so only the current month and later ones go back to the NHL on every call.
     """
     
-    url = 'https://statsapi.web.nhl.com/api/v1/schedule?startDate=' + start_date + '&endDate=' + end_date
-    page = requests.get(url, timeout = 500)
-    loaddict = json.loads(page.content)
-    date_list = (loaddict['dates'])
-    date_df = pd.DataFrame(date_list)
-    
-    gamedf = pd.DataFrame()
-
-    for i in range (0, len(date_df)):
-        datedf = pd.DataFrame(date_df.games.iloc[i])
-        gamedf = gamedf.append(datedf)
-    global team_df
-    team_df = pd.DataFrame(gamedf['teams'].values.tolist(), index = gamedf.index)
-    away_df = pd.DataFrame(team_df['away'].values.tolist(), index = team_df.index)
-    home_df = pd.DataFrame(team_df['home'].values.tolist(), index = team_df.index)
-    away_team_df = pd.DataFrame(away_df['team'].values.tolist(), index = away_df.index)
-    home_team_df = pd.DataFrame(home_df['team'].values.tolist(), index = home_df.index)
-
-    gamedf = gamedf.assign(
-        state = pd.DataFrame(gamedf['status'].values.tolist(), index = gamedf.index)['detailedState'],
-        homename = home_team_df['name'],
-        homeid = home_team_df['id'],
-        homescore = home_df['score'],
-        awayname = away_team_df['name'],
-        awayid = away_team_df['id'],
-        awayscore = away_df['score'],
-        venue = pd.DataFrame(gamedf['venue'].values.tolist(), index = gamedf.index)['name'],
-        gameDate = pd.to_datetime(gamedf['gameDate']).dt.tz_convert('EST')
-    )
-
-    gamedf = gamedf.loc[:, ['gamePk', 'link', 'gameType', 'season', 'gameDate','homeid', 'homename',  'homescore','awayid', 'awayname',  'awayscore', 'state', 'venue']].rename(
-        columns = {'gamePk':'ID', 'gameType':'type', 'gameDate':'date'})
+    start_date = str(pd.Timestamp(start_date).date())
+    end_date = str(pd.Timestamp(end_date).date())
+    chunks = _schedule_chunks(start_date, end_date)
+    tdhhttp.prefetch([_schedule_url(first, last) for first, last, finished in chunks if finished])
+    tdhhttp.prefetch([_schedule_url(first, last) for first, last, finished in chunks if not finished], cache = False)
     
-    gamedf['type']
+    rows = []
+    for first, last, finished in chunks:
+        page = tdhhttp.get(_schedule_url(first, last), cache = finished)
+        rows.extend(_schedule_rows(_json_loads(page.content), start_date, end_date))
+    
+    gamedf = pd.DataFrame(rows, columns = schedule_columns)
+    gamedf['date'] = pd.to_datetime(gamedf['date'], utc = True).dt.tz_convert('EST')
 
     return(gamedf)
 
@@ -173,78 +478,76 @@ def group_if_not_none(result):
         result = result.group()
     return(result)
 
-def scrape_html_roster(season, game_id):
-    url = 'http://www.nhl.com/scores/htmlreports/' + season + '/RO0' + game_id + '.HTM'
-    page = requests.get(url)
-    soup = BeautifulSoup(page.content.decode('ISO-8859-1'), 'lxml', multi_valued_attributes = None)
-    
-    teamsoup = soup.find_all('td', {'align':'center', 'class':['teamHeading + border', 'teamHeading + border '], 'width':'50%'})
-    away_team = teamsoup[0].get_text()
-    home_team = teamsoup[1].get_text()
-    
-    home_player_soup = (soup.find_all('table', {'align':'center', 'border':'0', 'cellpadding':'0', 
-                        'cellspacing':'0', 'width':'100%', 'xmlns:ext':''}))[1].find_all('td')
-
-    length = int(len(home_player_soup)/3)
-
-    home_player_df = pd.DataFrame(np.array(home_player_soup).reshape(length, 3))
-
-    home_player_df.columns = home_player_df.iloc[0]
-
-    home_player_df = home_player_df.drop(0).assign(team = 'home', team_name = home_team)
-
-    away_player_soup = (soup.find_all('table', {'align':'center', 'border':'0', 'cellpadding':'0', 
-                            'cellspacing':'0', 'width':'100%', 'xmlns:ext':''}))[0].find_all('td')
-
-    length = int(len(away_player_soup)/3)
+def clock_to_seconds(clock):
+    """
+    Takes a column of "M:SS" clock strings and returns the number of seconds each one represents, as integers.
+    """
+    parts = clock.str.split(':', n = 1, expand = True)
+    return parts[0].astype(int) * 60 + parts[1].astype(int)
 
-    away_player_df = pd.DataFrame(np.array(away_player_soup).reshape(length, 3))
+def seconds_to_clock(seconds):
+    """
+    Takes a column of integer seconds and returns "M:SS" clock strings.
+    """
+    seconds = pd.Series(seconds).astype(int)
+    return (seconds // 60).astype(str) + ':' + (seconds % 60).astype(str).str.zfill(2)
 
-    away_player_df.columns = away_player_df.iloc[0]
+def event_versions(events, player = 'event_player_1'):
+    """
+    Number repeated events so they can be matched between the HTML report, the API and ESPN: the first event of a type 
+    by a player at a given second is version 0, the next one is version 1, and so on. Events without a player are always version 0.
+    
+    Duplicates are numbered in the order the frame is already sorted in. A penalty shot is never numbered past 1, as it was when 
+    versions were assigned in separate passes, so it lines up the same way in every source.
+    """
+    version = events.groupby(['event', player, 'game_seconds'], sort = False, dropna = False).cumcount()
+    has_key = (~pd.isna(events.event)) & (~pd.isna(events[player])) & (events[player]!='') & (~pd.isna(events.game_seconds))
+    if 'description' in events.columns:
+        penalty_shot = events.description.astype(str).str.contains('Penalty Shot')
+        version = np.where(penalty_shot, np.minimum(version, 1), version)
+    return np.where(has_key, version, 0)
+
+# Compiled once and shared by every roster report: the two team name cells, and the tables listing away players, home players, 
+# away scratches and home scratches, in that order.
+_roster_team_cells = lxml.etree.XPath("//td[@align='center'][@width='50%'][@class='teamHeading + border' or @class='teamHeading + border ']")
+_roster_tables = lxml.etree.XPath("//table[@align='center'][@border='0'][@cellpadding='0'][@cellspacing='0'][@width='100%'][@*[name()='xmlns:ext']='']")
+_roster_cells = lxml.etree.XPath(".//td")
+
+def _roster_table(cells, team, team_name):
+    """
+    Turn the text of a roster table's cells into a frame, using its first row (#, Pos, Name) as the column names.
+    """
+    rows = np.array(cells, dtype = object).reshape(int(len(cells)/3), 3)
+    return pd.DataFrame(rows[1:], columns = rows[0], index = range(1, len(rows))).assign(team = team, team_name = team_name)
 
-    away_player_df = away_player_df.drop(0).assign(team = 'away', team_name = away_team)
+def parse_html_roster(content, season):
+    """
+    Parse the raw bytes of an HTML roster report into the roster frame returned by scrape_html_roster. Does not touch the network.
     
-    #global home_scratch_soup
+    season: Season of the game in "20202021" form, used to tell apart players who share a name.
+    """
+    if len(content.strip()) == 0:
+        raise IndexError('The roster report is empty.')
     
-    if len(soup.find_all('table', {'align':'center', 'border':'0', 'cellpadding':'0', 
-                            'cellspacing':'0', 'width':'100%', 'xmlns:ext':''}))>3:
-
-        home_scratch_soup = (soup.find_all('table', {'align':'center', 'border':'0', 'cellpadding':'0', 
-                                'cellspacing':'0', 'width':'100%', 'xmlns:ext':''}))[3].find_all('td')
+    tree = lxml.html.fromstring(content, parser = lxml.html.HTMLParser(encoding = 'ISO-8859-1'))
     
-        if len(home_scratch_soup)>1:
-
-            length = int(len(home_scratch_soup)/3)
-
-            home_scratch_df = pd.DataFrame(np.array(home_scratch_soup).reshape(length, 3))
-
-            home_scratch_df.columns = home_scratch_df.iloc[0]
-
-            home_scratch_df = home_scratch_df.drop(0).assign(team = 'home', team_name = home_team)
-
-    if 'home_scratch_df' not in locals():
-        
-        home_scratch_df = pd.DataFrame()
-        
-    if len(soup.find_all('table', {'align':'center', 'border':'0', 'cellpadding':'0', 
-                            'cellspacing':'0', 'width':'100%', 'xmlns:ext':''}))>2:
+    teams = [td.text_content() for td in _roster_team_cells(tree)]
+    away_team = teams[0]
+    home_team = teams[1]
     
-        away_scratch_soup = (soup.find_all('table', {'align':'center', 'border':'0', 'cellpadding':'0', 
-                                'cellspacing':'0', 'width':'100%', 'xmlns:ext':''}))[2].find_all('td')
-        
-        if len(away_scratch_soup)>1:
-
-            length = int(len(away_scratch_soup)/3)
-
-            away_scratch_df = pd.DataFrame(np.array(away_scratch_soup).reshape(length, 3))
-
-            away_scratch_df.columns = away_scratch_df.iloc[0]
-
-            away_scratch_df = away_scratch_df.drop(0).assign(team = 'away', team_name = away_team)
-        
-    if 'away_scratch_df' not in locals():
+    tables = [[td.text_content() for td in _roster_cells(table)] for table in _roster_tables(tree)]
+    
+    home_player_df = _roster_table(tables[1], 'home', home_team)
+    away_player_df = _roster_table(tables[0], 'away', away_team)
+    
+    home_scratch_df = pd.DataFrame()
+    away_scratch_df = pd.DataFrame()
+    
+    if len(tables) > 3 and len(tables[3]) > 1:
+        home_scratch_df = _roster_table(tables[3], 'home', home_team)
         
-        away_scratch_df = pd.DataFrame()
+    if len(tables) > 2 and len(tables[2]) > 1:
+        away_scratch_df = _roster_table(tables[2], 'away', away_team)
 
     player_df = pd.concat([home_player_df, away_player_df]).assign(status = 'player')
     scratch_df = pd.concat([home_scratch_df, away_scratch_df]).assign(status = 'scratch')
@@ -260,178 +563,19 @@ def scrape_html_roster(season, game_id):
     
     # Max Pacioretty doesn't exist in ESPN in 2009-2010, sadly.
     
-    roster_df['Name'] = np.where(roster_df['Name'].str.contains('ALEXANDRE '), 
-                                roster_df.Name.str.replace('ALEXANDRE ', 'ALEX '),
-                                roster_df['Name'])
-    
-    roster_df['Name'] = np.where(roster_df['Name'].str.contains('ALEXANDER '), 
-                                roster_df.Name.str.replace('ALEXANDER ', 'ALEX '),
-                                roster_df['Name'])
-    
-    roster_df['Name'] = np.where(roster_df['Name'].str.contains('CHRISTOPHER '), 
-                                roster_df.Name.str.replace('CHRISTOPHER ', 'CHRIS '),
-                                roster_df['Name'])
-    
-    # List of names and fixed from Evolving Hockey Scraper.
-    
-    roster_df = roster_df.assign(Name = 
-    (np.where(roster_df['Name']== "ANDREI KASTSITSYN" , "ANDREI KOSTITSYN",
-    (np.where(roster_df['Name']== "AJ GREER" , "A.J. GREER",
-    (np.where(roster_df['Name']== "ANDREW GREENE" , "ANDY GREENE",
-    (np.where(roster_df['Name']== "ANDREW WOZNIEWSKI" , "ANDY WOZNIEWSKI", 
-    (np.where(roster_df['Name']== "ANTHONY DEANGELO" , "TONY DEANGELO",
-    (np.where(roster_df['Name']== "BATES (JON) BATTAGLIA" , "BATES BATTAGLIA",
-    (np.where(roster_df['Name'].isin(["BJ CROMBEEN", "B.J CROMBEEN", "BRANDON CROMBEEN", "B J CROMBEEN"]) , "B.J. CROMBEEN", 
-    (np.where(roster_df['Name']== "BRADLEY MILLS" , "BRAD MILLS",
-    (np.where(roster_df['Name']== "CAMERON BARKER" , "CAM BARKER", 
-    (np.where(roster_df['Name']== "COLIN (JOHN) WHITE" , "COLIN WHITE",
-    (np.where(roster_df['Name']== "CRISTOVAL NIEVES" , "BOO NIEVES",
-    (np.where(roster_df['Name']== "CHRIS VANDE VELDE" , "CHRIS VANDEVELDE", 
-    (np.where(roster_df['Name']== "DANNY BRIERE" , "DANIEL BRIERE",
-    (np.where(roster_df['Name'].isin(["DAN CLEARY", "DANNY CLEARY"]) , "DANIEL CLEARY",
-    (np.where(roster_df['Name']== "DANIEL GIRARDI" , "DAN GIRARDI", 
-    (np.where(roster_df['Name']== "DANNY O'REGAN" , "DANIEL O'REGAN",
-    (np.where(roster_df['Name']== "DANIEL CARCILLO" , "DAN CARCILLO", 
-    (np.where(roster_df['Name']== "DAVID JOHNNY ODUYA" , "JOHNNY ODUYA", 
-    (np.where(roster_df['Name']== "DAVID BOLLAND" , "DAVE BOLLAND", 
-    (np.where(roster_df['Name']== "DENIS JR. GAUTHIER" , "DENIS GAUTHIER",
-    (np.where(roster_df['Name']== "DWAYNE KING" , "DJ KING", 
-    (np.where(roster_df['Name']== "EDWARD PURCELL" , "TEDDY PURCELL", 
-    (np.where(roster_df['Name']== "EMMANUEL FERNANDEZ" , "MANNY FERNANDEZ", 
-    (np.where(roster_df['Name']== "EMMANUEL LEGACE" , "MANNY LEGACE", 
-    (np.where(roster_df['Name']== "EVGENII DADONOV" , "EVGENY DADONOV", 
-    (np.where(roster_df['Name']== "FREDDY MODIN" , "FREDRIK MODIN", 
-    (np.where(roster_df['Name']== "FREDERICK MEYER IV" , "FREDDY MEYER",
-    (np.where(roster_df['Name']== "HARRISON ZOLNIERCZYK" , "HARRY ZOLNIERCZYK", 
-    (np.where(roster_df['Name']== "ILJA BRYZGALOV" , "ILYA BRYZGALOV", 
-    (np.where(roster_df['Name']== "JACOB DOWELL" , "JAKE DOWELL",
-    (np.where(roster_df['Name']== "JAMES HOWARD" , "JIMMY HOWARD", 
-    (np.where(roster_df['Name']== "JAMES VANDERMEER" , "JIM VANDERMEER",
-    (np.where(roster_df['Name']== "JAMES WYMAN" , "JT WYMAN",
-    (np.where(roster_df['Name']== "JOHN HILLEN III" , "JACK HILLEN",
-    (np.where(roster_df['Name']== "JOHN ODUYA" , "JOHNNY ODUYA",
-    (np.where(roster_df['Name']== "JOHN PEVERLEY" , "RICH PEVERLEY",
-    (np.where(roster_df['Name']== "JONATHAN SIM" , "JON SIM",
-    (np.where(roster_df['Name']== "JONATHON KALINSKI" , "JON KALINSKI",
-    (np.where(roster_df['Name']== "JONATHAN AUDY-MARCHESSAULT" , "JONATHAN MARCHESSAULT", 
-    (np.where(roster_df['Name']== "JOSEPH CRABB" , "JOEY CRABB",
-    (np.where(roster_df['Name']== "JOSEPH CORVO" , "JOE CORVO", 
-    (np.where(roster_df['Name']== "JOSHUA BAILEY" , "JOSH BAILEY",
-    (np.where(roster_df['Name']== "JOSHUA HENNESSY" , "JOSH HENNESSY", 
-    (np.where(roster_df['Name']== "JOSHUA MORRISSEY" , "JOSH MORRISSEY",
-    (np.where(roster_df['Name']== "JEAN-FRANCOIS JACQUES" , "J-F JACQUES", 
-    (np.where(roster_df['Name'].isin(["J P DUMONT", "JEAN-PIERRE DUMONT"]) , "J-P DUMONT", 
-    (np.where(roster_df['Name']== "JT COMPHER" , "J.T. COMPHER",
-    (np.where(roster_df['Name']== "KRISTOPHER LETANG" , "KRIS LETANG", 
-    (np.where(roster_df['Name']== "KRYSTOFER BARCH" , "KRYS BARCH", 
-    (np.where(roster_df['Name']== "KRYSTOFER KOLANOS" , "KRYS KOLANOS",
-    (np.where(roster_df['Name']== "MARC POULIOT" , "MARC-ANTOINE POULIOT",
-    (np.where(roster_df['Name']== "MARTIN ST LOUIS" , "MARTIN ST. LOUIS", 
-    (np.where(roster_df['Name']== "MARTIN ST PIERRE" , "MARTIN ST. PIERRE",
-    (np.where(roster_df['Name']== "MARTY HAVLAT" , "MARTIN HAVLAT",
-    (np.where(roster_df['Name']== "MATTHEW CARLE" , "MATT CARLE", 
-    (np.where(roster_df['Name']== "MATHEW DUMBA" , "MATT DUMBA",
-    (np.where(roster_df['Name']== "MATTHEW BENNING" , "MATT BENNING", 
-    (np.where(roster_df['Name']== "MATTHEW IRWIN" , "MATT IRWIN",
-    (np.where(roster_df['Name']== "MATTHEW NIETO" , "MATT NIETO",
-    (np.where(roster_df['Name']== "MATTHEW STAJAN" , "MATT STAJAN",
-    (np.where(roster_df['Name']== "MAXIM MAYOROV" , "MAKSIM MAYOROV",
-    (np.where(roster_df['Name']== "MAXIME TALBOT" , "MAX TALBOT", 
-    (np.where(roster_df['Name']== "MAXWELL REINHART" , "MAX REINHART",
-    (np.where(roster_df['Name']== "MICHAEL BLUNDEN" , "MIKE BLUNDEN",
-    (np.where(roster_df['Name'].isin(["MICHAËL BOURNIVAL", "MICHAÃ\x8bL BOURNIVAL"]), "MICHAEL BOURNIVAL",
-    (np.where(roster_df['Name']== "MICHAEL CAMMALLERI" , "MIKE CAMMALLERI", 
-    (np.where(roster_df['Name']== "MICHAEL FERLAND" , "MICHEAL FERLAND", 
-    (np.where(roster_df['Name']== "MICHAEL GRIER" , "MIKE GRIER",
-    (np.where(roster_df['Name']== "MICHAEL KNUBLE" , "MIKE KNUBLE",
-    (np.where(roster_df['Name']== "MICHAEL KOMISAREK" , "MIKE KOMISAREK",
-    (np.where(roster_df['Name']== "MICHAEL MATHESON" , "MIKE MATHESON",
-    (np.where(roster_df['Name']== "MICHAEL MODANO" , "MIKE MODANO",
-    (np.where(roster_df['Name']== "MICHAEL RUPP" , "MIKE RUPP",
-    (np.where(roster_df['Name']== "MICHAEL SANTORELLI" , "MIKE SANTORELLI", 
-    (np.where(roster_df['Name']== "MICHAEL SILLINGER" , "MIKE SILLINGER",
-    (np.where(roster_df['Name']== "MITCHELL MARNER" , "MITCH MARNER", 
-    (np.where(roster_df['Name']== "NATHAN GUENIN" , "NATE GUENIN",
-    (np.where(roster_df['Name']== "NICHOLAS BOYNTON" , "NICK BOYNTON",
-    (np.where(roster_df['Name']== "NICHOLAS DRAZENOVIC" , "NICK DRAZENOVIC", 
-    (np.where(roster_df['Name']== "NICKLAS BERGFORS" , "NICLAS BERGFORS",
-    (np.where(roster_df['Name']== "NICKLAS GROSSMAN" , "NICKLAS GROSSMANN", 
-    (np.where(roster_df['Name']== "NICOLAS PETAN" , "NIC PETAN", 
-    (np.where(roster_df['Name']== "NIKLAS KRONVALL" , "NIKLAS KRONWALL",
-    (np.where(roster_df['Name']== "NIKOLAI ANTROPOV" , "NIK ANTROPOV",
-    (np.where(roster_df['Name']== "NIKOLAI KULEMIN" , "NIKOLAY KULEMIN", 
-    (np.where(roster_df['Name']== "NIKOLAI ZHERDEV" , "NIKOLAY ZHERDEV",
-    (np.where(roster_df['Name']== "OLIVIER MAGNAN-GRENIER" , "OLIVIER MAGNAN",
-    (np.where(roster_df['Name']== "PAT MAROON" , "PATRICK MAROON", 
-    (np.where(roster_df['Name'].isin(["P. J. AXELSSON", "PER JOHAN AXELSSON"]) , "P.J. AXELSSON",
-    (np.where(roster_df['Name'].isin(["PK SUBBAN", "P.K SUBBAN"]) , "P.K. SUBBAN", 
-    (np.where(roster_df['Name'].isin(["PIERRE PARENTEAU", "PIERRE-ALEX PARENTEAU", "PIERRE-ALEXANDRE PARENTEAU", "PA PARENTEAU", "P.A PARENTEAU", "P-A PARENTEAU"]) , "P.A. PARENTEAU", 
-    (np.where(roster_df['Name']== "PHILIP VARONE" , "PHIL VARONE",
-    (np.where(roster_df['Name']== "QUINTIN HUGHES" , "QUINN HUGHES",
-    (np.where(roster_df['Name']== "RAYMOND MACIAS" , "RAY MACIAS",
-    (np.where(roster_df['Name']== "RJ UMBERGER" , "R.J. UMBERGER",
-    (np.where(roster_df['Name']== "ROBERT BLAKE" , "ROB BLAKE",
-    (np.where(roster_df['Name']== "ROBERT EARL" , "ROBBIE EARL",
-    (np.where(roster_df['Name']== "ROBERT HOLIK" , "BOBBY HOLIK",
-    (np.where(roster_df['Name']== "ROBERT SCUDERI" , "ROB SCUDERI",
-    roster_df['Name']))))))))))))))))))))))))))))))))))))))))))))))))))))))
-    )))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))
-    ))))))))))
-    
-    roster_df['Name'] = (np.where(roster_df['Name']== "RODNEY PELLEY" , "ROD PELLEY",
-    (np.where(roster_df['Name']== "SIARHEI KASTSITSYN" , "SERGEI KOSTITSYN",
-    (np.where(roster_df['Name']== "SIMEON VARLAMOV" , "SEMYON VARLAMOV", 
-    (np.where(roster_df['Name']== "STAFFAN KRONVALL" , "STAFFAN KRONWALL",
-    (np.where(roster_df['Name']== "STEVEN REINPRECHT" , "STEVE REINPRECHT",
-    (np.where(roster_df['Name']== "TJ GALIARDI" , "T.J. GALIARDI",
-    (np.where(roster_df['Name']== "TJ HENSICK" , "T.J. HENSICK",
-    (np.where(roster_df['Name'].isin(["TJ OSHIE", "T.J OSHIE"]) , "T.J. OSHIE", 
-    (np.where(roster_df['Name']== "TOBY ENSTROM" , "TOBIAS ENSTROM", 
-    (np.where(roster_df['Name']== "TOMMY SESTITO" , "TOM SESTITO",
-    (np.where(roster_df['Name']== "VACLAV PROSPAL" , "VINNY PROSPAL",
-    (np.where(roster_df['Name']== "VINCENT HINOSTROZA" , "VINNIE HINOSTROZA",
-    (np.where(roster_df['Name']== "WILLIAM THOMAS" , "BILL THOMAS",
-    (np.where(roster_df['Name']== "ZACHARY ASTON-REESE" , "ZACH ASTON-REESE",
-    (np.where(roster_df['Name']== "ZACHARY SANFORD" , "ZACH SANFORD",
-    (np.where(roster_df['Name']== "ZACHERY STORTINI" , "ZACK STORTINI",
-    (np.where(roster_df['Name']== "MATTHEW MURRAY" , "MATT MURRAY",
-    (np.where(roster_df['Name']== "J-SEBASTIEN AUBIN" , "JEAN-SEBASTIEN AUBIN",
-    (np.where(roster_df['Name'].isin(["J.F. BERUBE", "JEAN-FRANCOIS BERUBE"]) , "J-F BERUBE", 
-    (np.where(roster_df['Name']== "JEFF DROUIN-DESLAURIERS" , "JEFF DESLAURIERS", 
-    (np.where(roster_df['Name']== "NICHOLAS BAPTISTE" , "NICK BAPTISTE",
-    (np.where(roster_df['Name']== "OLAF KOLZIG" , "OLIE KOLZIG",
-    (np.where(roster_df['Name']== "STEPHEN VALIQUETTE" , "STEVE VALIQUETTE",
-    (np.where(roster_df['Name']== "THOMAS MCCOLLUM" , "TOM MCCOLLUM",
-    (np.where(roster_df['Name']== "TIMOTHY JR. THOMAS" , "TIM THOMAS",
-    (np.where(roster_df['Name']== "TIM GETTINGER" , "TIMOTHY GETTINGER",
-    (np.where(roster_df['Name']== "NICHOLAS SHORE" , "NICK SHORE",
-    (np.where(roster_df['Name']== "T.J. TYNAN" , "TJ TYNAN",
-    (np.where(roster_df['Name']== "ALEXIS LAFRENI?RE" , "ALEXIS LAFRENIÈRE",
-    (np.where(roster_df['Name']== "ALEXIS LAFRENIERE" , "ALEXIS LAFRENIÈRE", 
-    (np.where(roster_df['Name']== "ALEXIS LAFRENIÃRE" , "ALEXIS LAFRENIÈRE",
-    (np.where(roster_df['Name']== "TIM STUTZLE" , "TIM STÜTZLE",
-    (np.where(roster_df['Name']== "TIM ST?TZLE" , "TIM STÜTZLE",
-    (np.where(roster_df['Name']== "TIM STÃTZLE" , "TIM STÜTZLE",
-    (np.where(roster_df['Name']== "EGOR SHARANGOVICH" , "YEGOR SHARANGOVICH",
-    (np.where(roster_df['Name']== "CALLAN FOOTE" , "CAL FOOTE",
-    (np.where(roster_df['Name']== "MATTIAS JANMARK-NYLEN" , "MATTIAS JANMARK",
-    (np.where(roster_df['Name']== "JOSH DUNNE" , "JOSHUA DUNNE",roster_df['Name'])))))))))))))))))))))))))))))))))))))))))))
-    )))))))))))))))))))))))))))))))))
-    
-    roster_df['Name'] = np.where((roster_df['Name']=="SEBASTIAN AHO") & (roster_df['Pos']=='D'), 'SEBASTIAN AHO SWE', roster_df['Name'])
-    roster_df['Name'] = np.where((roster_df['Name']=="COLIN WHITE") & (roster_df['Pos']=='D'), 'COLIN WHITE CAN', roster_df['Name'])
-    roster_df['Name'] = np.where((roster_df['Name']=="SEAN COLLINS") & (roster_df['Pos']=='D'), 'SEAN COLLINS CAN', roster_df['Name'])
-    roster_df['Name'] = np.where((roster_df['Name']=="ALEX PICARD") & (roster_df['Pos']!='D'), 'ALEX PICARD F', roster_df['Name'])
-    roster_df['Name'] = np.where((roster_df['Name']=="ERIK GUSTAFSSON") & (int(season)<20132014), 'ERIK GUSTAFSSON 88', roster_df['Name'])
-    roster_df['Name'] = np.where((roster_df['Name']=="MIKKO LEHTONEN") & (int(season)<20202021), 'MIKKO LEHTONEN F', roster_df['Name'])
-    roster_df['Name'] = np.where(roster_df['Name']=='COLIN', 'COLIN WHITE CAN', roster_df['Name'])
+    roster_df['Name'] = normalize_names(roster_df.Name, html_name_fixes, season = int(season), positions = roster_df.Pos, shared = shared_name_fixes)
 
     return roster_df 
 
-def scrape_html_shifts(season, game_id):
+def scrape_html_roster(season, game_id, offline = False, cache = True):
+    url = 'http://www.nhl.com/scores/htmlreports/' + season + '/RO0' + game_id + '.HTM'
+    page = tdhhttp.get(url, cache = cache, offline = offline)
+    return parse_html_roster(page.content, season)
+
+def scrape_html_shifts(season, game_id, context = None, offline = False, cache = True):
     
     url = 'http://www.nhl.com/scores/htmlreports/' + season + '/TH0' + game_id + '.HTM'
-    page = (requests.get(url))
+    page = tdhhttp.get(url, cache = cache, offline = offline)
     soup = BeautifulSoup(page.content.decode('ISO-8859-1'), 'lxml', multi_valued_attributes = None)
     found = soup.find_all('td', {'class':['playerHeading + border', 'lborder + bborder']})
     if len(found)==0:
@@ -844,7 +988,7 @@ def scrape_html_shifts(season, game_id):
         else:
             players[full_name]['shifts'].extend([line])
 
-    alldf = pd.DataFrame()
+    player_shifts = []
 
     for key in players.keys(): 
         length = int(len(np.array((players[key]['shifts'])))/5)
@@ -854,12 +998,14 @@ def scrape_html_shifts(season, game_id):
                       number = players[key]['number'],
                       team = thisteam,
                       venue = "home")
-        alldf = alldf.append(df)
+        player_shifts.append(df)
+
+    alldf = pd.concat(player_shifts) if len(player_shifts) > 0 else pd.DataFrame()
         
     home_shifts = alldf
     
     url = 'http://www.nhl.com/scores/htmlreports/' + season + '/TV0' + game_id + '.HTM'
-    page = (requests.get(url))
+    page = tdhhttp.get(url, cache = cache, offline = offline)
     soup = BeautifulSoup(page.content.decode('ISO-8859-1'), 'lxml', multi_valued_attributes = None)
     found = soup.find_all('td', {'class':['playerHeading + border', 'lborder + bborder']})
     thisteam = soup.find('td', {'align':'center', 'class':'teamHeading + border'}).get_text()
@@ -881,7 +1027,7 @@ def scrape_html_shifts(season, game_id):
         else:
             players[full_name]['shifts'].extend([line])
 
-    alldf = pd.DataFrame()
+    player_shifts = []
 
     for key in players.keys(): 
         length = int(len(np.array((players[key]['shifts'])))/5)
@@ -891,12 +1037,12 @@ def scrape_html_shifts(season, game_id):
                       number = players[key]['number'],
                       team = thisteam,
                       venue = "away")
-        alldf = alldf.append(df)
+        player_shifts.append(df)
+
+    alldf = pd.concat(player_shifts) if len(player_shifts) > 0 else pd.DataFrame()
 
     away_shifts = alldf
     
-    global all_shifts
-    
     all_shifts = pd.concat([home_shifts, away_shifts])
     
     all_shifts = all_shifts.assign(start_time = all_shifts.shift_start.str.split('/').str[0])
@@ -907,204 +1053,44 @@ def scrape_html_shifts(season, game_id):
     
     all_shifts.period = (np.where(all_shifts.period=='OT', 4, all_shifts.period)).astype(int)
     
-    all_shifts = all_shifts.assign(end_time = np.where(~all_shifts.shift_end.str.contains('\xa0'), all_shifts.end_time,
-              (np.where(
-              (((pd.to_datetime(((60 * (all_shifts.start_time.str.split(':').str[0].astype(int))) + 
-              (all_shifts.start_time.str.split(':').str[1].astype(int)) + 
-                (60 * (all_shifts.duration.str.split(':').str[0].astype(int))).astype(int) +
-              (all_shifts.duration.str.split(':').str[1].astype(int))).astype(int), unit = 's'))).dt.time).astype(str).str[3:].str[0]=='0',
-              (((pd.to_datetime(((60 * (all_shifts.start_time.str.split(':').str[0].astype(int))) + 
-              (all_shifts.start_time.str.split(':').str[1].astype(int)) + 
-                (60 * (all_shifts.duration.str.split(':').str[0].astype(int))).astype(int) +
-              (all_shifts.duration.str.split(':').str[1].astype(int))).astype(int), unit = 's'))).dt.time).astype(str).str[4:],
-              (((pd.to_datetime(((60 * (all_shifts.start_time.str.split(':').str[0].astype(int))) + 
-              (all_shifts.start_time.str.split(':').str[1].astype(int)) + 
-                (60 * (all_shifts.duration.str.split(':').str[0].astype(int))).astype(int) +
-              (all_shifts.duration.str.split(':').str[1].astype(int))).astype(int), unit = 's'))).dt.time).astype(str).str[4:]))))
-    
-    all_shifts['name'] = np.where(all_shifts['name'].str.contains('ALEXANDRE '), 
-                                all_shifts.name.str.replace('ALEXANDRE ', 'ALEX '),
-                                all_shifts['name'])
-    
-    all_shifts['name'] = np.where(all_shifts['name'].str.contains('ALEXANDER '), 
-                                all_shifts.name.str.replace('ALEXANDER ', 'ALEX '),
-                                all_shifts['name'])
-    
-    all_shifts['name'] = np.where(all_shifts['name'].str.contains('CHRISTOPHER '), 
-                                all_shifts.name.str.replace('CHRISTOPHER ', 'CHRIS '),
-                                all_shifts['name'])
-    
-    all_shifts = all_shifts.assign(name = 
-    (np.where(all_shifts['name']== "ANDREI KASTSITSYN" , "ANDREI KOSTITSYN",
-    (np.where(all_shifts['name']== "AJ GREER" , "A.J. GREER",
-    (np.where(all_shifts['name']== "ANDREW GREENE" , "ANDY GREENE",
-    (np.where(all_shifts['name']== "ANDREW WOZNIEWSKI" , "ANDY WOZNIEWSKI", 
-    (np.where(all_shifts['name']== "ANTHONY DEANGELO" , "TONY DEANGELO",
-    (np.where(all_shifts['name']== "BATES (JON) BATTAGLIA" , "BATES BATTAGLIA",
-    (np.where(all_shifts['name'].isin(["BJ CROMBEEN", "B.J CROMBEEN", "BRANDON CROMBEEN", "B J CROMBEEN"]) , "B.J. CROMBEEN", 
-    (np.where(all_shifts['name']== "BRADLEY MILLS" , "BRAD MILLS",
-    (np.where(all_shifts['name']== "CAMERON BARKER" , "CAM BARKER", 
-    (np.where(all_shifts['name']== "COLIN (JOHN) WHITE" , "COLIN WHITE",
-    (np.where(all_shifts['name']== "CRISTOVAL NIEVES" , "BOO NIEVES",
-    (np.where(all_shifts['name']== "CHRIS VANDE VELDE" , "CHRIS VANDEVELDE", 
-    (np.where(all_shifts['name']== "DANNY BRIERE" , "DANIEL BRIERE",
-    (np.where(all_shifts['name'].isin(["DAN CLEARY", "DANNY CLEARY"]) , "DANIEL CLEARY",
-    (np.where(all_shifts['name']== "DANIEL GIRARDI" , "DAN GIRARDI", 
-    (np.where(all_shifts['name']== "DANNY O'REGAN" , "DANIEL O'REGAN",
-    (np.where(all_shifts['name']== "DANIEL CARCILLO" , "DAN CARCILLO", 
-    (np.where(all_shifts['name']== "DAVID JOHNNY ODUYA" , "JOHNNY ODUYA", 
-    (np.where(all_shifts['name']== "DAVID BOLLAND" , "DAVE BOLLAND", 
-    (np.where(all_shifts['name']== "DENIS JR. GAUTHIER" , "DENIS GAUTHIER",
-    (np.where(all_shifts['name']== "DWAYNE KING" , "DJ KING", 
-    (np.where(all_shifts['name']== "EDWARD PURCELL" , "TEDDY PURCELL", 
-    (np.where(all_shifts['name']== "EMMANUEL FERNANDEZ" , "MANNY FERNANDEZ", 
-    (np.where(all_shifts['name']== "EMMANUEL LEGACE" , "MANNY LEGACE", 
-    (np.where(all_shifts['name']== "EVGENII DADONOV" , "EVGENY DADONOV", 
-    (np.where(all_shifts['name']== "FREDDY MODIN" , "FREDRIK MODIN", 
-    (np.where(all_shifts['name']== "FREDERICK MEYER IV" , "FREDDY MEYER",
-    (np.where(all_shifts['name']== "HARRISON ZOLNIERCZYK" , "HARRY ZOLNIERCZYK", 
-    (np.where(all_shifts['name']== "ILJA BRYZGALOV" , "ILYA BRYZGALOV", 
-    (np.where(all_shifts['name']== "JACOB DOWELL" , "JAKE DOWELL",
-    (np.where(all_shifts['name']== "JAMES HOWARD" , "JIMMY HOWARD", 
-    (np.where(all_shifts['name']== "JAMES VANDERMEER" , "JIM VANDERMEER",
-    (np.where(all_shifts['name']== "JAMES WYMAN" , "JT WYMAN",
-    (np.where(all_shifts['name']== "JOHN HILLEN III" , "JACK HILLEN",
-    (np.where(all_shifts['name']== "JOHN ODUYA" , "JOHNNY ODUYA",
-    (np.where(all_shifts['name']== "JOHN PEVERLEY" , "RICH PEVERLEY",
-    (np.where(all_shifts['name']== "JONATHAN SIM" , "JON SIM",
-    (np.where(all_shifts['name']== "JONATHON KALINSKI" , "JON KALINSKI",
-    (np.where(all_shifts['name']== "JONATHAN AUDY-MARCHESSAULT" , "JONATHAN MARCHESSAULT", 
-    (np.where(all_shifts['name']== "JOSEPH CRABB" , "JOEY CRABB",
-    (np.where(all_shifts['name']== "JOSEPH CORVO" , "JOE CORVO", 
-    (np.where(all_shifts['name']== "JOSHUA BAILEY" , "JOSH BAILEY",
-    (np.where(all_shifts['name']== "JOSHUA HENNESSY" , "JOSH HENNESSY", 
-    (np.where(all_shifts['name']== "JOSHUA MORRISSEY" , "JOSH MORRISSEY",
-    (np.where(all_shifts['name']== "JEAN-FRANCOIS JACQUES" , "J-F JACQUES", 
-    (np.where(all_shifts['name'].isin(["J P DUMONT", "JEAN-PIERRE DUMONT"]) , "J-P DUMONT", 
-    (np.where(all_shifts['name']== "JT COMPHER" , "J.T. COMPHER",
-    (np.where(all_shifts['name']== "KRISTOPHER LETANG" , "KRIS LETANG", 
-    (np.where(all_shifts['name']== "KRYSTOFER BARCH" , "KRYS BARCH", 
-    (np.where(all_shifts['name']== "KRYSTOFER KOLANOS" , "KRYS KOLANOS",
-    (np.where(all_shifts['name']== "MARC POULIOT" , "MARC-ANTOINE POULIOT",
-    (np.where(all_shifts['name']== "MARTIN ST LOUIS" , "MARTIN ST. LOUIS", 
-    (np.where(all_shifts['name']== "MARTIN ST PIERRE" , "MARTIN ST. PIERRE",
-    (np.where(all_shifts['name']== "MARTY HAVLAT" , "MARTIN HAVLAT",
-    (np.where(all_shifts['name']== "MATTHEW CARLE" , "MATT CARLE", 
-    (np.where(all_shifts['name']== "MATHEW DUMBA" , "MATT DUMBA",
-    (np.where(all_shifts['name']== "MATTHEW BENNING" , "MATT BENNING", 
-    (np.where(all_shifts['name']== "MATTHEW IRWIN" , "MATT IRWIN",
-    (np.where(all_shifts['name']== "MATTHEW NIETO" , "MATT NIETO",
-    (np.where(all_shifts['name']== "MATTHEW STAJAN" , "MATT STAJAN",
-    (np.where(all_shifts['name']== "MAXIM MAYOROV" , "MAKSIM MAYOROV",
-    (np.where(all_shifts['name']== "MAXIME TALBOT" , "MAX TALBOT", 
-    (np.where(all_shifts['name']== "MAXWELL REINHART" , "MAX REINHART",
-    (np.where(all_shifts['name']== "MICHAEL BLUNDEN" , "MIKE BLUNDEN",
-    (np.where(all_shifts['name'].isin(["MICHAËL BOURNIVAL", "MICHAÃ\x8bL BOURNIVAL"]), "MICHAEL BOURNIVAL",
-    (np.where(all_shifts['name']== "MICHAEL CAMMALLERI" , "MIKE CAMMALLERI", 
-    (np.where(all_shifts['name']== "MICHAEL FERLAND" , "MICHEAL FERLAND", 
-    (np.where(all_shifts['name']== "MICHAEL GRIER" , "MIKE GRIER",
-    (np.where(all_shifts['name']== "MICHAEL KNUBLE" , "MIKE KNUBLE",
-    (np.where(all_shifts['name']== "MICHAEL KOMISAREK" , "MIKE KOMISAREK",
-    (np.where(all_shifts['name']== "MICHAEL MATHESON" , "MIKE MATHESON",
-    (np.where(all_shifts['name']== "MICHAEL MODANO" , "MIKE MODANO",
-    (np.where(all_shifts['name']== "MICHAEL RUPP" , "MIKE RUPP",
-    (np.where(all_shifts['name']== "MICHAEL SANTORELLI" , "MIKE SANTORELLI", 
-    (np.where(all_shifts['name']== "MICHAEL SILLINGER" , "MIKE SILLINGER",
-    (np.where(all_shifts['name']== "MITCHELL MARNER" , "MITCH MARNER", 
-    (np.where(all_shifts['name']== "NATHAN GUENIN" , "NATE GUENIN",
-    (np.where(all_shifts['name']== "NICHOLAS BOYNTON" , "NICK BOYNTON",
-    (np.where(all_shifts['name']== "NICHOLAS DRAZENOVIC" , "NICK DRAZENOVIC", 
-    (np.where(all_shifts['name']== "NICKLAS BERGFORS" , "NICLAS BERGFORS",
-    (np.where(all_shifts['name']== "NICKLAS GROSSMAN" , "NICKLAS GROSSMANN", 
-    (np.where(all_shifts['name']== "NICOLAS PETAN" , "NIC PETAN", 
-    (np.where(all_shifts['name']== "NIKLAS KRONVALL" , "NIKLAS KRONWALL",
-    (np.where(all_shifts['name']== "NIKOLAI ANTROPOV" , "NIK ANTROPOV",
-    (np.where(all_shifts['name']== "NIKOLAI KULEMIN" , "NIKOLAY KULEMIN", 
-    (np.where(all_shifts['name']== "NIKOLAI ZHERDEV" , "NIKOLAY ZHERDEV",
-    (np.where(all_shifts['name']== "OLIVIER MAGNAN-GRENIER" , "OLIVIER MAGNAN",
-    (np.where(all_shifts['name']== "PAT MAROON" , "PATRICK MAROON", 
-    (np.where(all_shifts['name'].isin(["P. J. AXELSSON", "PER JOHAN AXELSSON"]) , "P.J. AXELSSON",
-    (np.where(all_shifts['name'].isin(["PK SUBBAN", "P.K SUBBAN"]) , "P.K. SUBBAN", 
-    (np.where(all_shifts['name'].isin(["PIERRE PARENTEAU", "PIERRE-ALEX PARENTEAU", "PIERRE-ALEXANDRE PARENTEAU", "PA PARENTEAU", "P.A PARENTEAU", "P-A PARENTEAU"]) , "P.A. PARENTEAU", 
-    (np.where(all_shifts['name']== "PHILIP VARONE" , "PHIL VARONE",
-    (np.where(all_shifts['name']== "QUINTIN HUGHES" , "QUINN HUGHES",
-    (np.where(all_shifts['name']== "RAYMOND MACIAS" , "RAY MACIAS",
-    (np.where(all_shifts['name']== "RJ UMBERGER" , "R.J. UMBERGER",
-    (np.where(all_shifts['name']== "ROBERT BLAKE" , "ROB BLAKE",
-    (np.where(all_shifts['name']== "ROBERT EARL" , "ROBBIE EARL",
-    (np.where(all_shifts['name']== "ROBERT HOLIK" , "BOBBY HOLIK",
-    (np.where(all_shifts['name']== "ROBERT SCUDERI" , "ROB SCUDERI",
-    all_shifts['name']))))))))))))))))))))))))))))))))))))))))))))))))))))))
-    )))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))
-    ))))))))))
-    
-    all_shifts['name'] = (np.where(all_shifts['name']== "RODNEY PELLEY" , "ROD PELLEY",
-    (np.where(all_shifts['name']== "SIARHEI KASTSITSYN" , "SERGEI KOSTITSYN",
-    (np.where(all_shifts['name']== "SIMEON VARLAMOV" , "SEMYON VARLAMOV", 
-    (np.where(all_shifts['name']== "STAFFAN KRONVALL" , "STAFFAN KRONWALL",
-    (np.where(all_shifts['name']== "STEVEN REINPRECHT" , "STEVE REINPRECHT",
-    (np.where(all_shifts['name']== "TJ GALIARDI" , "T.J. GALIARDI",
-    (np.where(all_shifts['name']== "TJ HENSICK" , "T.J. HENSICK",
-    (np.where(all_shifts['name'].isin(["TJ OSHIE", "T.J OSHIE"]) , "T.J. OSHIE", 
-    (np.where(all_shifts['name']== "TOBY ENSTROM" , "TOBIAS ENSTROM", 
-    (np.where(all_shifts['name']== "TOMMY SESTITO" , "TOM SESTITO",
-    (np.where(all_shifts['name']== "VACLAV PROSPAL" , "VINNY PROSPAL",
-    (np.where(all_shifts['name']== "VINCENT HINOSTROZA" , "VINNIE HINOSTROZA",
-    (np.where(all_shifts['name']== "WILLIAM THOMAS" , "BILL THOMAS",
-    (np.where(all_shifts['name']== "ZACHARY ASTON-REESE" , "ZACH ASTON-REESE",
-    (np.where(all_shifts['name']== "ZACHARY SANFORD" , "ZACH SANFORD",
-    (np.where(all_shifts['name']== "ZACHERY STORTINI" , "ZACK STORTINI",
-    (np.where(all_shifts['name']== "MATTHEW MURRAY" , "MATT MURRAY",
-    (np.where(all_shifts['name']== "J-SEBASTIEN AUBIN" , "JEAN-SEBASTIEN AUBIN",
-    (np.where(all_shifts['name'].isin(["J.F. BERUBE", "JEAN-FRANCOIS BERUBE"]) , "J-F BERUBE", 
-    (np.where(all_shifts['name']== "JEFF DROUIN-DESLAURIERS" , "JEFF DESLAURIERS", 
-    (np.where(all_shifts['name']== "NICHOLAS BAPTISTE" , "NICK BAPTISTE",
-    (np.where(all_shifts['name']== "OLAF KOLZIG" , "OLIE KOLZIG",
-    (np.where(all_shifts['name']== "STEPHEN VALIQUETTE" , "STEVE VALIQUETTE",
-    (np.where(all_shifts['name']== "THOMAS MCCOLLUM" , "TOM MCCOLLUM",
-    (np.where(all_shifts['name']== "TIMOTHY JR. THOMAS" , "TIM THOMAS",
-    (np.where(all_shifts['name']== "TIM GETTINGER" , "TIMOTHY GETTINGER",
-    (np.where(all_shifts['name']== "NICHOLAS SHORE" , "NICK SHORE",
-    (np.where(all_shifts['name']== "T.J. TYNAN" , "TJ TYNAN",
-    (np.where(all_shifts['name']== "ALEXIS LAFRENI?RE" , "ALEXIS LAFRENIÈRE",
-    (np.where(all_shifts['name']== "ALEXIS LAFRENIERE" , "ALEXIS LAFRENIÈRE", 
-    (np.where(all_shifts['name']== "ALEXIS LAFRENIÃRE" , "ALEXIS LAFRENIÈRE",
-    (np.where(all_shifts['name']== "TIM STUTZLE" , "TIM STÜTZLE",
-    (np.where(all_shifts['name']== "TIM ST?TZLE" , "TIM STÜTZLE",
-    (np.where(all_shifts['name']== "TIM STÃTZLE" , "TIM STÜTZLE",
-    (np.where(all_shifts['name']== "EGOR SHARANGOVICH" , "YEGOR SHARANGOVICH",
-    (np.where(all_shifts['name']== "CALLAN FOOTE" , "CAL FOOTE",
-    (np.where(all_shifts['name']== "MATTIAS JANMARK-NYLEN" , "MATTIAS JANMARK",
-    (np.where(all_shifts['name']== "JOSH DUNNE" , "JOSHUA DUNNE",all_shifts['name'])))))))))))))))))))))))))))))))))))))))))))
-    )))))))))))))))))))))))))))))))))
-    
-    
-    all_shifts = all_shifts.assign(end_time = np.where(pd.to_datetime(all_shifts.start_time).dt.time > pd.to_datetime(all_shifts.end_time).dt.time, '20:00', all_shifts.end_time),
+    # Everything below works in seconds elapsed in the period. Shifts with no recorded end get one from their duration, 
+    # and one that would run past the end of the period ends at 20:00.
+    
+    missing_end = all_shifts.shift_end.str.contains('\xa0').values
+    
+    all_shifts = all_shifts.assign(start_seconds = clock_to_seconds(all_shifts.start_time).values,
+                                   end_seconds = np.where(missing_end, 
+                                                          np.minimum(clock_to_seconds(all_shifts.start_time) + clock_to_seconds(all_shifts.duration), 1200),
+                                                          clock_to_seconds(all_shifts.end_time.where(~missing_end, '0:00'))))
+    
+    all_shifts['name'] = normalize_names(all_shifts.name, html_name_fixes)
+    
+    all_shifts = all_shifts.assign(end_seconds = np.where(all_shifts.start_seconds > all_shifts.end_seconds, 1200, all_shifts.end_seconds),
                                   goalie = np.where(all_shifts.name.isin(goalie_names), 1, 0))
     
     all_shifts = all_shifts.merge(all_shifts.groupby(['team', 'period'])['goalie'].sum().reset_index().rename(columns = {'goalie':'period_gs'}))
     
     # Implement fix for goalies: Goalies who showed up late in the period and were the only goalie to play have their start time re-set to 0:00. 
     
-    all_shifts = all_shifts.assign(start_time = np.where((all_shifts.goalie==1) & (all_shifts.start_time!='0:00') & (all_shifts.period_gs==1), '0:00', all_shifts.start_time))
+    all_shifts = all_shifts.assign(start_seconds = np.where((all_shifts.goalie==1) & (all_shifts.period_gs==1), 0, all_shifts.start_seconds))
     
-    all_shifts = all_shifts.assign(end_time = np.where(
-    (pd.to_datetime(all_shifts.start_time).dt.time < datetime(2021, 6, 10, 18, 0, 0).time()) & 
+    all_shifts = all_shifts.assign(end_seconds = np.where(
+    (all_shifts.start_seconds < 18 * 60) & 
     (all_shifts.period!=3) & (all_shifts.period!=4) & 
     (all_shifts.goalie==1) &
     (all_shifts.period_gs==1),
-    '20:00', all_shifts.end_time))
+    1200, all_shifts.end_seconds))
     
-    all_shifts = all_shifts.assign(end_time = np.where(
-    (pd.to_datetime(all_shifts.start_time).dt.time < datetime(2021, 6, 10, 13, 0, 0).time()) & 
+    all_shifts = all_shifts.assign(end_seconds = np.where(
+    (all_shifts.start_seconds < 13 * 60) & 
     (all_shifts.period!=4) &
     (all_shifts.goalie==1) &
     (all_shifts.period_gs==1),
-    '20:00', all_shifts.end_time))
+    1200, all_shifts.end_seconds))
+    
+    all_shifts = all_shifts.assign(start_time = seconds_to_clock(all_shifts.start_seconds).values,
+                                   end_time = seconds_to_clock(all_shifts.end_seconds).values)
     
-    global myshifts
-    global changes_on
-    global changes_off
     myshifts = all_shifts
     
     myshifts.start_time = myshifts.start_time.str.strip()
@@ -1127,99 +1113,81 @@ def scrape_html_shifts(season, game_id):
     changes_off.merge(changes_on, on = ['team', 'period', 'time'], how = 'left', indicator = True)['_merge']!='both']
     full_changes = pd.concat([all_on, off_only]).sort_values(by = ['period', 'time']).drop(columns = ['_merge'])
     
-    full_changes['period_seconds'] = full_changes.time.str.split(':').str[0].astype(int) * 60 + full_changes.time.str.split(':').str[1].astype(int)
+    full_changes['period_seconds'] = clock_to_seconds(full_changes.time)
 
     full_changes['game_seconds'] = (np.where(full_changes.period<5, 
                                    (((full_changes.period - 1) * 1200) + full_changes.period_seconds),
                           3900))
     
     full_changes = full_changes.assign(team = np.where(full_changes.team=='CANADIENS MONTREAL', 'MONTREAL CANADIENS', full_changes.team))
+    
+    if context is not None:
+        context.update(all_shifts = all_shifts, changes_on = changes_on, changes_off = changes_off)
         
     return full_changes.reset_index(drop = True)#.drop(columns = ['time', 'period_seconds']) 
 
-def scrape_api_events(game_id, drop_description = True, shift_to_espn = False):
+def _flatten_api_plays(loaddict):
+    """
+    Walk the live feed's plays once, pulling the fields scrape_api_events needs straight into one list per column.
+    """
+    plays = loaddict['liveData']['plays']['allPlays']
+    columns = {name: [None] * len(plays) for name in ['description', 'event', 'detail', 'coords_x', 'coords_y', 'period', 'time', 
+        'homescore', 'awayscore', 'eventteam', 'eventteamfull', 'eventidx', 'eventNumber', 
+        'player1name', 'player1type', 'player2name', 'player2type', 'player3name', 'player3type', 'player4name', 'player4type']}
+    
+    for i, play in enumerate(plays):
+        result = play['result']
+        about = play['about']
+        coordinates = play.get('coordinates') or {}
+        team = play.get('team') or {}
+        columns['description'][i] = result.get('description')
+        columns['event'][i] = result.get('eventTypeId')
+        columns['detail'][i] = result.get('secondaryType')
+        columns['coords_x'][i] = coordinates.get('x')
+        columns['coords_y'][i] = coordinates.get('y')
+        columns['period'][i] = about.get('period')
+        columns['time'][i] = about.get('periodTime')
+        columns['homescore'][i] = about['goals'].get('home')
+        columns['awayscore'][i] = about['goals'].get('away')
+        columns['eventteam'][i] = team.get('triCode')
+        columns['eventteamfull'][i] = team.get('name')
+        columns['eventidx'][i] = about.get('eventIdx')
+        columns['eventNumber'][i] = about.get('eventId')
+        for number, player in enumerate((play.get('players') or [])[:4], 1):
+            columns['player' + str(number) + 'name'][i] = player['player'].get('fullName')
+            columns['player' + str(number) + 'type'][i] = player.get('playerType')
+    
+    # A feed where no play has coordinates (or a team) is no use; the caller goes to ESPN for those.
+    if all(x is None for x in columns['coords_x']):
+        raise KeyError('x')
+    if all(team is None for team in columns['eventteam']):
+        raise KeyError('triCode')
+    
+    finaldf = pd.DataFrame(columns)
+    return finaldf.assign(
+        coords_x = finaldf.coords_x.astype(float),
+        coords_y = finaldf.coords_y.astype(float),
+        hometeam = loaddict['gameData']['teams']['home']['triCode'],
+        hometeamfull = loaddict['gameData']['teams']['home']['name'],
+        awayteam = loaddict['gameData']['teams']['away']['triCode'],
+        awayteamfull = loaddict['gameData']['teams']['away']['name'],
+        session = loaddict['gameData']['game']['type'])
+
+def scrape_api_events(game_id, drop_description = True, shift_to_espn = False, offline = False, cache = True):
     
     if shift_to_espn == True:
         raise KeyError
     
-    page = requests.get(str('https://statsapi.web.nhl.com/api/v1/game/' + str(game_id) + '/feed/live'))
+    page = tdhhttp.get(str('https://statsapi.web.nhl.com/api/v1/game/' + str(game_id) + '/feed/live'), cache = cache, offline = offline)
     
     if str(page) == '<Response [404]>':
         raise KeyError('You got the 404 error; game data could not be found.')
     
-    loaddict = json.loads(page.content)
+    loaddict = _json_loads(page.content)
     
     if loaddict['liveData']['plays']['allPlays'] != []:
     
-        eventdf = pd.DataFrame(loaddict['liveData']['plays']['allPlays'])
-
-        coordsdf = pd.DataFrame(eventdf['coordinates'].values.tolist(), index = eventdf.index)
-        resultdf = pd.DataFrame(eventdf['result'].values.tolist(), index = eventdf.index)
-        aboutdf = pd.DataFrame(eventdf['about'].values.tolist(), index = eventdf.index)
-        scoredf = pd.DataFrame(aboutdf['goals'].values.tolist(), index = aboutdf.index)
-        playerdf = pd.DataFrame(eventdf['players'])
-        teamdf = eventdf['team'].apply(pd.Series)
-        clean = playerdf[~pd.isna(playerdf.players)].reset_index()
-        clean_index = clean.loc[:, ['index']]
-        player1 = pd.DataFrame((pd.DataFrame(clean.reset_index()['players'].values.tolist())[0].values.tolist()))
-        player1df = pd.concat([clean_index, pd.DataFrame(player1['player'].values.tolist())], axis = 1).assign(playerType = player1['playerType']).rename(
-            columns = {'id':'player1id', 'fullName':'player1name', 'link':'player1link', 'playerType':'player1type'})
-        player2 = pd.concat([clean_index, pd.DataFrame((pd.DataFrame(clean['players'].values.tolist())[1]))], axis = 1)
-        player2 = player2[player2[1].notnull()]
-        player2df = pd.concat([player2.reset_index(drop = True), 
-            (pd.DataFrame(pd.DataFrame(player2[1].values.tolist())['player'].values.tolist()).assign(playerType = (pd.DataFrame(player2[1].values.tolist())).loc[:, ['playerType']]))], axis = 1).drop(
-        columns = 1).rename(
-            columns = {'id':'player2id', 'fullName':'player2name', 'link':'player2link', 'playerType':'player2type'})
-
-        if len((pd.DataFrame(clean['players'].values.tolist())).columns) > 2:
-
-            player3 = pd.concat([clean_index, pd.DataFrame((pd.DataFrame(clean['players'].values.tolist())[2]))], axis = 1)
-            player3 = player3[player3[2].notnull()]
-            player3df = pd.concat([player3.reset_index(drop = True), 
-                (pd.DataFrame(pd.DataFrame(player3[2].values.tolist())['player'].values.tolist()).assign(playerType = (pd.DataFrame(player3[2].values.tolist())).loc[:, ['playerType']]))], axis = 1).drop(
-            columns = 2).rename(
-                columns = {'id':'player3id', 'fullName':'player3name', 'link':'player3link', 'playerType':'player3type'})
-        else: 
-            player3df = pd.DataFrame(columns = ['index', 'player3id', 'player3name', 'player3link', 'player3type'])
-
-        if len((pd.DataFrame(clean['players'].values.tolist())).columns) > 3:  
-
-            player4 = pd.concat([clean_index, pd.DataFrame((pd.DataFrame(clean['players'].values.tolist())[3]))], axis = 1)
-            player4 = player4[player4[3].notnull()]
-            player4df = pd.concat([player4.reset_index(drop = True), 
-                (pd.DataFrame(pd.DataFrame(player4[3].values.tolist())['player'].values.tolist()).assign(playerType = (pd.DataFrame(player4[3].values.tolist())).loc[:, ['playerType']]))], axis = 1).drop(
-            columns = 3).rename(
-                columns = {'id':'player4id', 'fullName':'player4name', 'link':'player4link', 'playerType':'player4type'})
-        else: 
-            player4df = pd.DataFrame(columns = ['index', 'player4id', 'player4name', 'player4link', 'player4type'])
-
-        finaldf = eventdf.assign(
-            hometeam = loaddict['gameData']['teams']['home']['triCode'],
-            hometeamfull = loaddict['gameData']['teams']['home']['name'],
-            awayteam = loaddict['gameData']['teams']['away']['triCode'],
-            awayteamfull = loaddict['gameData']['teams']['away']['name'],
-            description = resultdf['description'],
-            event = resultdf['eventTypeId'],
-            detail = resultdf['secondaryType'],
-            coords_x = coordsdf['x'],
-            coords_y = coordsdf['y'],
-            period = aboutdf['period'],
-            time = aboutdf['periodTime'],
-            homescore = scoredf['home'],
-            awayscore = scoredf['away'],
-            eventteam = teamdf['triCode'],
-            eventteamfull = teamdf['name'],
-            eventidx = aboutdf['eventIdx'],
-            eventNumber = aboutdf['eventId'],
-            session = loaddict['gameData']['game']['type'])
-
-        finaldf = finaldf.drop(columns = ['result', 'about', 'coordinates', 'players', 'team'])
-
-        finaldf = finaldf.reset_index().merge(
-        player1df, on = 'index', how = 'left').merge(
-        player2df, on = 'index', how = 'left').merge(
-        player3df, on = 'index', how = 'left').merge(
-        player4df, on = 'index', how = 'left')
+        finaldf = _flatten_api_plays(loaddict)
         
         finaldf = finaldf.assign(
             awayteamfull = finaldf.awayteamfull.str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8'),
@@ -1253,7 +1221,7 @@ def scrape_api_events(game_id, drop_description = True, shift_to_espn = False):
         api_events['hometeamfull'] = (api_events.hometeamfull.str.upper())
         api_events['eventteamfull'] = (api_events.eventteamfull.str.upper())
 
-        api_events['period_seconds'] = api_events.time.str.split(':').str[0].astype(int) * 60 + api_events.time.str.split(':').str[1].astype(int)
+        api_events['period_seconds'] = clock_to_seconds(api_events.time)
 
         api_events['game_seconds'] = (np.where(api_events.period<5, 
                                        (((api_events.period - 1) * 1200) + api_events.period_seconds),
@@ -1277,102 +1245,11 @@ def scrape_api_events(game_id, drop_description = True, shift_to_espn = False):
     
         api_events = api_events.sort_values(by = ['game_seconds', 'event_team', 'ep1_name'])
     
-        api_events = api_events.assign(version = 
-                               (np.where(
-                               (api_events.event==api_events.event.shift()) & 
-                               (api_events.ep1_name==api_events.ep1_name.shift()) &
-                               (api_events.game_seconds==api_events.game_seconds.shift()),
-                                1, 0)))
-
-        api_events = api_events.assign(version = 
-                               (np.where(
-                               (api_events.event==api_events.event.shift(2)) & 
-                               (api_events.ep1_name==api_events.ep1_name.shift(2)) &
-                               (api_events.game_seconds==api_events.game_seconds.shift(2) )& 
-                               (~api_events.description.str.contains('Penalty Shot')),
-                                2, api_events.version)))
-
-        api_events = api_events.assign(version = 
-                               (np.where(
-                               (api_events.event==api_events.event.shift(3)) & 
-                               (api_events.ep1_name==api_events.ep1_name.shift(3)) &
-                               (api_events.game_seconds==api_events.game_seconds.shift(3)),
-                                3, api_events.version)))#.drop(columns = 'description')
+        api_events = api_events.assign(version = event_versions(api_events, player = 'ep1_name'))
         
         api_events['ep1_name'] = np.where((api_events.description.str.contains('Too many men')) | (api_events.description.str.contains('unsportsmanlike conduct-bench')), 'BENCH', api_events['ep1_name'])
         
-        api_events['ep1_name'] = np.where(api_events['ep1_name'].str.contains('ALEXANDRE '), 
-                                api_events['ep1_name'].str.replace('ALEXANDRE ', 'ALEX '),
-                                api_events['ep1_name'])
-    
-        api_events['ep1_name'] = np.where(api_events['ep1_name'].str.contains('ALEXANDER '), 
-                                    api_events['ep1_name'].str.replace('ALEXANDER ', 'ALEX '),
-                                    api_events['ep1_name'])
-
-        api_events['ep1_name'] = np.where(api_events['ep1_name'].str.contains('CHRISTOPHER '), 
-                                    api_events['ep1_name'].str.replace('CHRISTOPHER ', 'CHRIS '),
-                                    api_events['ep1_name'])
-        
-        api_events = api_events.assign(
-        ep1_name = 
-        (np.where(api_events['ep1_name']=="ALEX PECHURSKIY", "ALEX PECHURSKI", 
-        (np.where(api_events['ep1_name']=="BEN ONDRUS", "BENJAMIN ONDRUS", 
-        (np.where(api_events['ep1_name']=="BRYCE VAN BRABANT", "BRYCE VAN BRABANT", 
-        (np.where(api_events['ep1_name']=="CALVIN DE HAAN", "CALVIN DE HAAN", 
-        (np.where(api_events['ep1_name']=="CHASE DE LEO", "CHASE DE LEO", 
-        (np.where(api_events['ep1_name']=="CAL PETERSEN", "CALVIN PETERSEN",
-        (np.where(api_events['ep1_name']=="DANIEL CARCILLO", "DAN CARCILLO", 
-        (np.where(api_events['ep1_name']=="DANNY O'REGAN", "DANIEL O'REGAN", 
-        (np.where(api_events['ep1_name']=="DAVID VAN DER GULIK", "DAVID VAN DER GULIK", 
-        (np.where(api_events['ep1_name']=="EVGENII DADONOV", "EVGENY DADONOV", 
-        (np.where(api_events['ep1_name']=="FREDDY MODIN", "FREDRIK MODIN", 
-        (np.where(api_events['ep1_name']=="GREG DE VRIES", "GREG DE VRIES", 
-        (np.where(api_events['ep1_name']=="ILYA ZUBOV", "ILJA ZUBOV", 
-        (np.where(api_events['ep1_name']=="JACOB DE LA ROSE", "JACOB DE LA ROSE", 
-        (np.where(api_events['ep1_name']=="JAMES VAN RIEMSDYK", "JAMES VAN RIEMSDYK", 
-        (np.where(api_events['ep1_name']=="JEAN-FRANCOIS JACQUES", "J-F JACQUES", 
-        (np.where(api_events['ep1_name']=="JAKOB FORSBACKA KARLSSON", "JAKOB FORSBACKA KARLSSON", 
-        (np.where(api_events['ep1_name']=="JIM DOWD", "JAMES DOWD", 
-        (np.where(api_events['ep1_name']=="JEFF HAMILTON", "JEFFREY HAMILTON", 
-        (np.where(api_events['ep1_name']=="JEFF PENNER", "JEFFREY PENNER", 
-        (np.where(api_events['ep1_name']=="JOEL ERIKSSON EK", "JOEL ERIKSSON EK", 
-        (np.where(api_events['ep1_name']=="MARK VAN GUILDER", "MARK VAN GUILDER", 
-        (np.where(api_events['ep1_name']=="MARTIN ST LOUIS", "MARTIN ST. LOUIS", 
-        (np.where(api_events['ep1_name']=="MARTIN ST PIERRE", "MARTIN ST. PIERRE", 
-        (np.where(api_events['ep1_name']=="MARTIN ST PIERRE", "MARTIN ST. PIERRE", 
-        (np.where(api_events['ep1_name']=="MICHAEL CAMMALLERI", "MIKE CAMMALLERI", 
-        (np.where(api_events['ep1_name']=="MICHAEL DAL COLLE", "MICHAEL DAL COLLE", 
-        (np.where(api_events['ep1_name']=="MICHAEL DEL ZOTTO", "MICHAEL DEL ZOTTO", 
-        (np.where(api_events['ep1_name']=="MIKE VERNACE", "MICHAEL VERNACE", 
-        (np.where(api_events['ep1_name']=="MIKE YORK", "MICHAEL YORK", 
-        (np.where(api_events['ep1_name']=="MIKE VAN RYN", "MIKE VAN RYN", 
-        (np.where(api_events['ep1_name']=="MITCHELL MARNER", "MITCH MARNER", 
-        (np.where(api_events['ep1_name']=="PAT MAROON", "PATRICK MAROON", 
-        (np.where(api_events['ep1_name']=="PA PARENTEAU", "P.A. PARENTEAU", 
-        (np.where(api_events['ep1_name']=="PHILLIP DI GIUSEPPE", "PHILLIP DI GIUSEPPE", 
-        (np.where(api_events['ep1_name']=="STEFAN DELLA ROVERE", "STEFAN DELLA ROVERE", 
-        (np.where(api_events['ep1_name']=="STEPHANE DA COSTA", "STEPHANE DA COSTA", 
-        (np.where(api_events['ep1_name']=="TJ GALIARDI", "T.J. GALIARDI", 
-        (np.where(api_events['ep1_name']=="TOBY ENSTROM", "TOBIAS ENSTROM",  
-        (np.where(api_events['ep1_name']=="TREVOR VAN RIEMSDYK", "TREVOR VAN RIEMSDYK", 
-        (np.where(api_events['ep1_name']=="ZACK FITZGERALD", "ZACH FITZGERALD", 
-
-        ## NEW CHANGES
-        (np.where(api_events['ep1_name']=="TIM GETTINGER", "TIMOTHY GETTINGER", 
-        (np.where(api_events['ep1_name']=="THOMAS DI PAULI", "THOMAS DI PAULI", 
-        (np.where(api_events['ep1_name']=="NICHOLAS SHORE", "NICK SHORE",
-        (np.where(api_events['ep1_name']=="T.J. TYNAN", "TJ TYNAN",
-
-        ## '20-21 CHANGES (from HTM update function)
-        (np.where(api_events['ep1_name']=="ALEXIS LAFRENI?RE", "ALEXIS LAFRENIÈRE",
-        (np.where(api_events['ep1_name']=="ALEXIS LAFRENIERE", "ALEXIS LAFRENIÈRE",
-        (np.where(api_events['ep1_name']=="TIM STUTZLE", "TIM STÜTZLE",
-        (np.where(api_events['ep1_name']=="TIM ST?TZLE", "TIM STÜTZLE",
-        (np.where(api_events['ep1_name']=="EGOR SHARANGOVICH", "YEGOR SHARANGOVICH",
-        (np.where(api_events['ep1_name']=="CALLAN FOOTE", "CAL FOOTE",
-        (np.where(api_events['ep1_name']=="JOSH DUNNE", "JOSHUA DUNNE", api_events['ep1_name']
-        ))))))))))))))))))))))))))))))))))))))))))))))))))))))))))))
-        )))))))))))))))))))))))))))))))))))))))))))))
+        api_events['ep1_name'] = normalize_names(api_events.ep1_name, api_name_fixes)
 
         if drop_description == True:
         
@@ -1386,35 +1263,85 @@ def scrape_api_events(game_id, drop_description = True, shift_to_espn = False):
         print("This game doesn't exist within the API.")
         raise KeyError
 
-def scrape_html_events(season, game_id):
-    #global game
-    url = 'http://www.nhl.com/scores/htmlreports/' + season + '/PL0' + game_id + '.HTM'
-    page = requests.get(url)
-    #if int(season)<20092010:
-     #   soup = BeautifulSoup(page.content, 'html.parser')
-    #else:
-     #   soup = BeautifulSoup(page.content, 'lxml')
-    soup = BeautifulSoup(page.content.decode('ISO-8859-1'), 'lxml')
+# Jersey numbers in an event description follow either a '#' or a '- '. The first three, in order, are the event players.
+event_player_number = re.compile(r'#(\d\d?)|- (\d\d?)')
+
+# On penalties, the player who drew it is the first number after 'Drawn By'.
+drawn_by_number = re.compile(r'Drawn By[^#]*#([^ #]*)')
+
+def _event_player_numbers(descriptions):
+    """
+    Pull the jersey numbers out of a column of event descriptions in one pass. Returns event_player_str (every number, space separated) 
+    and event_player_1 through event_player_3. Missing players are null, except event_player_1, which is '' when a description has no numbers.
+    """
+    numbers = descriptions.str.extractall(event_player_number)
+    numbers = numbers[0].fillna(numbers[1]).unstack().reindex(index = descriptions.index)
+    players = numbers.reindex(columns = [0, 1, 2])
+    # Numbers are filled from the left, so joining the columns only leaves spaces at the end.
+    numbers = numbers.fillna('')
+    joined = pd.Series('', index = descriptions.index)
+    for column in numbers.columns:
+        joined = joined.str.cat(numbers[column], sep = ' ')
+    return {'event_player_str': joined.str.strip(),
+            'event_player_1': players[0].fillna(''),
+            'event_player_2': players[1],
+            'event_player_3': players[2]}
+
+def _pl_cells_bs4(content):
+    """
+    Parse a play-by-play report with BeautifulSoup. Returns the text of every event cell and of every header cell (teams, date, attendance).
+    """
+    soup = BeautifulSoup(content.decode('ISO-8859-1'), 'lxml')
     tds = soup.find_all("td", {"class": re.compile('.*bborder.*')})
-    #global stripped_html
-    #global eventdf
     stripped_html = hs_strip_html(tds)
+    headers = [td.get_text() for td in soup.find_all('td', {'align':'center', 'style':'font-size: 10px;font-weight:bold'})]
+    return stripped_html, headers
+
+def _pl_cells_lxml(content):
+    """
+    Same as _pl_cells_bs4, but with lxml XPath queries on the parsed tree instead of building a BeautifulSoup object, which is several times faster.
+    """
+    if len(content.strip()) == 0:
+        # lxml refuses to parse an empty document, while BeautifulSoup just finds nothing in it, which the scrape already knows how to handle.
+        return _pl_cells_bs4(content)
+    tree = lxml.html.fromstring(content, parser = lxml.html.HTMLParser(encoding = 'ISO-8859-1'))
+    cells = [td.text_content() for td in tree.xpath("//td[contains(@class, 'bborder')]")]
+    if len(cells) == 0 or cells[0] != '#':
+        # hs_strip_html treats reports that don't open with the header row differently, so leave those to it.
+        return _pl_cells_bs4(content)
+    # hs_strip_html only trims the fourth cell, which is the time column of the header row.
+    index = cells[3].find(':')
+    cells[3] = cells[3][:index + 3]
+    headers = [td.text_content() for td in tree.xpath("//td[@align='center'][@style='font-size: 10px;font-weight:bold']")]
+    return cells, headers
+
+def scrape_html_events(season, game_id, offline = False, roster = None, parser = 'bs4', cache = True):
+    """
+    parser: 'bs4' parses the play-by-play report with BeautifulSoup, 'lxml' parses it with lxml directly. Both return the same events.
+    cache: Whether the report may be kept in the HTTP cache. Leave it on only for games that are over.
+    """
+    url = 'http://www.nhl.com/scores/htmlreports/' + season + '/PL0' + game_id + '.HTM'
+    page = tdhhttp.get(url, cache = cache, offline = offline)
+    if parser == 'lxml':
+        stripped_html, headers = _pl_cells_lxml(page.content)
+    elif parser == 'bs4':
+        stripped_html, headers = _pl_cells_bs4(page.content)
+    else:
+        raise ValueError("parser must be either 'bs4' or 'lxml', not " + str(parser) + ".")
     length = int(len(stripped_html)/8)
     eventdf = pd.DataFrame(np.array(stripped_html).reshape(length, 8)).rename(
     columns = {0:'index', 1:'period', 2:'strength', 3:'time', 4:'event', 5:'description', 6:'away_skaters', 7:'home_skaters'})
     split = eventdf.time.str.split(':')
-    game_date = soup.find_all('td', {'align':'center', 'style':'font-size: 10px;font-weight:bold'})[2].get_text()
-    
-    potentialnames = soup.find_all('td', {'align':'center', 'style':'font-size: 10px;font-weight:bold'})
+    game_date = headers[2]
     
     for i in range(0, 999):
-        away = potentialnames[i].get_text()
+        away = headers[i]
         if ('Away Game') in away or ('tr./Away') in away:
             away = re.split('Match|Game', away)[0]
             break
         
     for i in range(0, 999):
-        home = potentialnames[i].get_text()
+        home = headers[i]
         if ('Home Game') in home or ('Dom./Home') in home:
             home = re.split('Match|Game', home)[0]
             break
@@ -1442,23 +1369,14 @@ def scrape_html_events(season, game_id):
     game = game.assign(other_team = np.where(game.event_team=='', '\xa0',
                                             np.where(game.event_team==game.home_team_abbreviated.iloc[0], game.away_team_abbreviated.iloc[0], game.home_team_abbreviated.iloc[0])))
     
-    game['event_player_str'] = game.description.apply(
-    lambda x: re.findall('(#)(\d\d)|(#)(\d)|(-) (\d\d)|(-) (\d)', x)).astype(str
-                                                        ).str.replace('#', '').str.replace('-', '').str.replace("'", '').str.replace(',', '').str.replace('(', '').str.replace(')', '').astype(str
-                                                        ).str.replace('[', '').str.replace(']', '').apply(lambda x: re.sub(' +', ' ', x)).str.strip()
-
-    game = game.assign(event_player_1 = 
-            game.event_player_str.str.split(' ').str[0],
-            event_player_2 = 
-            game.event_player_str.str.split(' ').str[1],
-            event_player_3 = 
-            game.event_player_str.str.split(' ').str[2])
-    #return game
+    game = game.assign(**_event_player_numbers(game.description))
 
-    if len(game[game.description.str.contains('Drawn By')])>0:
+    drawn_by = game.description.str.contains('Drawn By')
+
+    if drawn_by.any():
     
-        game = game.assign(event_player_2 = np.where(game.description.str.contains('Drawn By'), 
-                                          game.description.str.split('Drawn By').str[1].str.split('#').str[1].str.split(' ').str[0].str.strip(), 
+        game = game.assign(event_player_2 = np.where(drawn_by, 
+                                          game.description.str.extract(drawn_by_number, expand = False).str.strip(), 
                                           game.event_player_2),
                           event_player_3 = np.where(game.description.str.contains('Served By'),
                                                    '\xa0',
@@ -1484,7 +1402,10 @@ def scrape_html_events(season, game_id):
     
     #return game
     
-    roster = scrape_html_roster(season, game_id).rename(columns = {'Nom/Name':'Name'})
+    if roster is None:
+        roster = scrape_html_roster(season, game_id, offline = offline, cache = cache)
+
+    roster = roster.rename(columns = {'Nom/Name':'Name'})
     roster = roster[roster.status=='player']
     roster = roster.assign(team_abbreviated = np.where(roster.team=='home', 
                                                        game.home_team_abbreviated.iloc[0],
@@ -1507,7 +1428,7 @@ def scrape_html_events(season, game_id):
     game['time'] = np.where((game['time'] == '') | (pd.isna(game['time'])), '0:00', game['time'])
     game['period'] = game.period.astype(int)
 
-    game['period_seconds'] = game.time.str.split(':').str[0].str.replace('-', '').astype(int) * 60 + game.time.str.split(':').str[1].str.replace('-', '').astype(int)
+    game['period_seconds'] = clock_to_seconds(game.time.str.replace('-', ''))
 
     game['game_seconds'] = (np.where(game.period<5, 
                                        (((game.period - 1) * 1200) + game.period_seconds),
@@ -1522,30 +1443,7 @@ def scrape_html_events(season, game_id):
                                                                 np.where(game.event=="PEND", 7,
                                                                     np.where(game.event=="GEND", 8,
                                                                         np.where(game.event=="FAC", 9, 0)))))))))).sort_values(by = ['game_seconds', 'period', 'event_player_1', 'event'])
-    game = game.assign(version = 
-                       (np.where(
-                       (game.event==game.event.shift()) & 
-                       (game.event_player_1==game.event_player_1.shift()) &
-                       (game.event_player_1!='') &
-                       (game.game_seconds==game.game_seconds.shift()),
-                        1, 0)))
-    
-    game = game.assign(version = 
-                           (np.where(
-                           (game.event==game.event.shift(2)) & 
-                           (game.event_player_1==game.event_player_1.shift(2)) &
-                           (game.game_seconds==game.game_seconds.shift(2)) & 
-                           (game.event_player_1!='') &
-                           (~game.description.str.contains('Penalty Shot')),
-                            2, game.version)))
-    
-    game = game.assign(version = 
-                           (np.where(
-                           (game.event==game.event.shift(3)) & 
-                           (game.event_player_1==game.event_player_1.shift(3)) &
-                           (game.game_seconds==game.game_seconds.shift(3)) & 
-                           (game.event_player_1!=''),
-                            3, game.version)))
+    game = game.assign(version = event_versions(game))
     
     game = game.assign(date = pd.to_datetime(game.date[~pd.isna(game.date)].iloc[0])
                   ).rename(columns = {'date':'game_date'}).sort_values(by = ['event_index'])
@@ -1575,73 +1473,106 @@ def scrape_html_events(season, game_id):
     
     return game.drop(columns = ['period_seconds', 'time', 'priority', 'home_skater_count_temp', 'away_skater_count_temp'])
 
-def scrape_espn_events(espn_game_id, drop_description = True):
+# Characters XML doesn't allow anywhere, and ampersands that don't start an entity. ESPN's feeds occasionally contain either.
+_xml_bad_bytes = re.compile(rb'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_xml_bare_ampersand = re.compile(rb'&(?!(?:[a-zA-Z]+|#[0-9]+|#x[0-9a-fA-F]+);)')
+
+def _espn_plays(content):
+    """
+    Read the id and text of every Play element in an ESPN masterFeed, without building the rest of the document.
+    """
+    content = _xml_bare_ampersand.sub(b'&amp;', _xml_bad_bytes.sub(b'', content))
+    ids = []
+    texts = []
+    try:
+        for _, play in lxml.etree.iterparse(io.BytesIO(content), events = ('end',), tag = 'Play', encoding = 'ISO-8859-1'):
+            ids.append(play.get('id'))
+            texts.append(play.text or '')
+            play.clear()
+    except lxml.etree.XMLSyntaxError as e:
+        raise ExpatError(str(e))
+    return pd.DataFrame({'id': ids, 'text': texts})
+
+def _decode_espn_plays(text):
+    """
+    Split ESPN play strings (x~y~...~M:SS~period~...~description~...) into coordinates, clock, period and description, all still as text.
+    """
+    plays = pd.concat([
+        text.str.extract(r'^(?P<coords_x>[^~]*)~(?P<coords_y>[^~]*)'),
+        # The period follows the clock. A few plays have a negative clock, which is written differently.
+        text.str.extract(r':\d+~(?P<period>.)').period.fillna(text.str.extract(r'(?:-\d~|-\d:\d-\d~)(.)', expand = False)),
+        text.str.extract(r'^(?:[^:]*~)?(?P<minutes>[^~:]*):(?P<seconds>[^~:-]*)')
+    ], axis = 1)
+    return plays.assign(description = text.str.findall(r"[a-z-'.A-Z]+|\dst|\drd|\d2nd|\d  minutes|\d minutes").str.join(' ')).loc[
+        :, ['coords_x', 'coords_y', 'period', 'minutes', 'seconds', 'description']]
+
+_espn_shot_types = re.compile('Wristshot|Tip-In|Snapshot|Backhand|Slapshot|Deflection|Wraparound')
+_espn_shot_types_saved = re.compile('Wristshot|Tip-In|Snapshot|Backhand|Slapshot|Deflection|Saved|Wraparound')
+_espn_scored_by = re.compile('scored by|Scored by')
+_espn_penalty_minutes = re.compile('0|2|4|5|10')
+_espn_shootout_result = re.compile('saved|MISSES|SAVED')
+
+def _espn_event_player(x):
+    """
+    Pull the event player out of an ESPN play description. Each rule only applies if its marker is in what the rules before it left behind, 
+    and a description no rule changes comes back as it is.
+    """
+    if 'Giveaway by' in x:
+        x = x.split('Giveaway by')[1].split(' in')[0].strip()
+    if 'Takeaway by' in x:
+        x = x.split('Takeaway by')[1].split(' in')[0].strip()
+    if 'credited with hit' in x:
+        x = x.split('credited with hit')[0].split('credited')[0].strip()
+    if 'faceoff' in x:
+        x = x.split('won faceoff')[0].strip()
+    if ('Goal Scored' in x or 'Goal scored' in x or 'Shootout GOAL' in x) and x!='Goal scored':
+        x = _espn_shot_types.split(_espn_scored_by.split(x)[1].split('assisted by')[0].split('unassisted')[0].split('Power')[0].split('Empty')[0].split('Shorthanded')[0])[0].strip()
+    if 'Shot blocked by' in x:
+        x = x.split('Shot blocked by')[1].strip()
+    if 'blocked' in x:
+        x = x.split('shot blocked')[0].strip()
+    if 'block' in x:
+        x = x.split('Shot blocked')[1].strip()
+    if 'missed by' in x:
+        x = x.split('missed by')[1].split('Wide')[0].split('Over')[0].split('Goalpost')[0].split('Hit')[0].strip()
+    if 'Shot on goal' in x and x!='Shot on goal':
+        x = x.split('Shot on goal by')[1].split('saved')[0].split('ft')[0].split('shootout')[0]
+    x = _espn_shot_types_saved.split(x)[0].strip()
+    if 'Penalty to' in x:
+        x = _espn_penalty_minutes.split(x.split('Penalty to')[1].split('minutes')[0])[0].strip()
+    if 'Shootout attempt by' in x:
+        x = _espn_shootout_result.split(x.split('Shootout attempt by')[1])[0].split('saved')[0].strip()
+    if ' on ' in x:
+        x = x.split(' on ')[0].strip()
+    if 'Bench' in x and 'Penalty' in x:
+        x = 'BENCH'
+    if 'shootout attempt against' in x:
+        x = x.split('shootout')[0].strip()
+    return x
+
+def scrape_espn_events(espn_game_id, drop_description = True, context = None, offline = False, cache = True):
     
     ### NEED TO FIX PENALTY SHOTS ##
-    global playdict
     # Hawks ID: 270114004
     # Sharks ID: 401272106
     # Habs game: 401044320
     # Flames game (first goal unasssisted): 401320053
 
     url = 'https://www.espn.com/nhl/gamecast/data/masterFeed?lang=en&isAll=true&rand=0&gameId=' + str(espn_game_id)
-    page = requests.get(url, timeout = 500)
-    try:
-        dictionary = xmltodict.parse(page.content.decode('ISO-8859-1'))
-    except ExpatError as e:
-        problem = int(str(e).split('column')[1].strip())
-        problem_value = page.content.decode('ISO-8859-1')[problem]
-        dictionary = xmltodict.parse(page.content.decode('ISO-8859-1').replace(problem_value, ''))
-    if (dictionary['NHLGamecast']['Plays']) is None:
+    page = tdhhttp.get(url, cache = cache, offline = offline)
+    plays = _espn_plays(page.content)
+    if len(plays)==0:
         raise IndexError('This game has no events.')
-    playdict = (dictionary['NHLGamecast']['Plays']['Play'])
-    
-    if len(playdict)>2:
-    
-        global play_list
-        play_list = []
-        play_id_list = []
-
-        for i in range(0, len(playdict)):
-            play_list.append(playdict[i]['#text'])
-            play_id_list.append(playdict[i]['@id'])
-
-        x_coordinates = []
-        y_coordinates = []
-        game_mins = []
-        game_secs = []
-        game_pd = []
-        event_desc = []
-
-        for i in range (0, len(play_list)):
-            split = play_list[i].split('~')
-            x_coordinates.append(split[0])
-            y_coordinates.append(split[1])
-            game_mins.append(play_list[i].split(':')[0].split('~')[-1])
-            game_secs.append(play_list[i].split(':')[1].split('~')[0].split('-')[0])
-            event_desc.append(" ".join(re.findall("[a-z-'.A-Z]+|\dst|\drd|\d2nd|\d  minutes|\d minutes", play_list[i])))
-            if (len(re.split(r'(:\d+)~', play_list[i])))>1:
-                game_pd.append((re.split(r'(:\d+)~', play_list[i])[2][0]))
-            else:
-                game_pd.append(re.split('-\d~|-\d:\d-\d~', play_list[i])[1][0])
-
-
-        #event_desc.append(" ".join(re.findall("[a-zA-Z]+", play_list[i])))
-        # Below is the code to get information that includes period number and penalty minutes. It is timely and unncessary.
-
-
-        espn_events = pd.DataFrame()
-
-        #for i in range(0, len(game_secs)):
-         #   print((int(game_secs[i])))
-
-        espn_events = espn_events.assign(
-        coords_x = x_coordinates,
-        coords_y = y_coordinates,
-        period = game_pd,
-        minutes = game_mins,
-        seconds = game_secs,
-        description = event_desc)
+    
+    if context is not None:
+        context['plays'] = plays
+    
+    if len(plays)>2:
+    
+        espn_events = _decode_espn_plays(plays.text)
+        
+        if espn_events.isna().any().any():
+            raise IndexError('Some ESPN plays could not be read.')
 
         espn_events = espn_events.assign(
         coords_x = espn_events.coords_x.astype(int),
@@ -1652,71 +1583,7 @@ def scrape_espn_events(espn_game_id, drop_description = True):
         description = espn_events.description.str.strip('-|- -').str.strip()).sort_values(by = ['period', 'minutes', 'seconds'])
         espn_events['minutes'] = np.where(espn_events.minutes<0, 0, espn_events.minutes)
 
-        espn_events['duplicated_description'] = espn_events['description']
-
-        espn_events['duplicated_description'] = espn_events['description']
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: x.split('Giveaway by')[1].split(' in')[0].strip() if 'Giveaway by' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: x.split('Takeaway by')[1].split(' in')[0].strip() if 'Takeaway by' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: x.split('credited with hit')[0].split('credited')[0].strip() if 'credited with hit' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: x.split('won faceoff')[0].strip() if 'faceoff' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('Wristshot|Tip-In|Snapshot|Backhand|Slapshot|Deflection|Wraparound',
-                               re.split('scored by|Scored by', x)[1].split('assisted by')[0].split('unassisted')[0].split('Power')[0].split('Empty')[0].split('Shorthanded')[0])[0].strip() if (
-                'Goal Scored' in x or 'Goal scored' in x or 'Shootout GOAL' in x) and x!='Goal scored' else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('Shot blocked by', x)[1].strip() if 'Shot blocked by' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('shot blocked', x)[0].strip() if 'blocked' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('Shot blocked', x)[1].strip() if 'block' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('missed by', x)[1].split('Wide')[0].split('Over')[0].split('Goalpost')[0].split('Hit')[0].strip() if 'missed by' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('Wristshot|Tip-In|Snapshot|Backhand|Slapshot|Deflection|Saved|Wraparound', re.split('Shot on goal by', x)[1].split('saved')[0].split('ft')[0].split('shootout')[0] if 'Shot on goal' in x and x!='Shot on goal' else x)[0].strip())
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('0|2|4|5|10', re.split('Penalty to', x)[1].split('minutes')[0])[0].strip() if 'Penalty to' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: re.split('saved|MISSES|SAVED', x.split('Shootout attempt by')[1])[0].split('saved')[0].strip() if 'Shootout attempt by' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: x.split(' on ')[0].strip() if ' on ' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: 'BENCH' if 'Bench' in x and 'Penalty' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
-
-        espn_events['event_player_1'] = espn_events['duplicated_description'].apply(
-            lambda x: x.split('shootout')[0].strip() if 'shootout attempt against' in x else x)
-        espn_events['duplicated_description'] = np.where(espn_events['event_player_1']!=espn_events['duplicated_description'], espn_events['event_player_1'], espn_events['duplicated_description'])
+        espn_events['event_player_1'] = espn_events.description.map(_espn_event_player)
 
         espn_events = espn_events.assign(event_type = np.where((espn_events.description.str.contains("Penalty")) | ((espn_events.description.str.contains("Bench penalty"))),
         "PENL",
@@ -1770,90 +1637,10 @@ def scrape_espn_events(espn_game_id, drop_description = True):
         espn_events = espn_events.sort_values(by = ['period', 'game_seconds', 'event_player_1', 'priority']).rename(
         columns = {'event_type':'event'}).loc[:, ['coords_x', 'coords_y', 'event_player_1', 'event', 'game_seconds', 'description', 'period']]
 
-        espn_events['event_player_1'] = np.where(espn_events['event_player_1'].str.contains('ALEXANDRE '), 
-                                    espn_events['event_player_1'].str.replace('ALEXANDRE ', 'ALEX '),
-                                    espn_events['event_player_1'])
-
-        espn_events['event_player_1'] = np.where(espn_events['event_player_1'].str.contains('ALEXANDER '), 
-                                    espn_events['event_player_1'].str.replace('ALEXANDER ', 'ALEX '),
-                                    espn_events['event_player_1'])
-
-        espn_events['event_player_1'] = np.where(espn_events['event_player_1'].str.contains('CHRISTOPHER '), 
-                                    espn_events['event_player_1'].str.replace('CHRISTOPHER ', 'CHRIS '),
-                                    espn_events['event_player_1'])
-
-        espn_events = espn_events.assign(event_player_1 = 
-        np.where(espn_events.event_player_1=='PATRICK MAROON', 'PAT MAROON',
-        (np.where(espn_events.event_player_1=='J T COMPHER', 'J.T. COMPHER', 
-        (np.where(espn_events.event_player_1=='J T MILLER', 'J.T. MILLER', 
-        (np.where(espn_events.event_player_1=='T J OSHIE', 'T.J. OSHIE', 
-        (np.where((espn_events.event_player_1=='ALEXIS LAFRENIERE') | (espn_events.event_player_1=='ALEXIS LAFRENI RE'), 'ALEXIS LAFRENIÈRE', 
-        (np.where((espn_events.event_player_1=='TIM STUTZLE') | (espn_events.event_player_1=='TIM ST TZLE'), 'TIM STÜTZLE',
-        (np.where(espn_events.event_player_1=='T.J. BRODIE', 'TJ BRODIE',
-        (np.where(espn_events.event_player_1=='MATTHEW IRWIN', 'MATT IRWIN',
-        (np.where(espn_events.event_player_1=='STEVE KAMPFER', 'STEVEN KAMPFER',
-        (np.where(espn_events.event_player_1=='STEVE KAMPFER', 'STEVEN KAMPFER',
-        (np.where(espn_events.event_player_1=='JEFFREY TRUCHON-VIEL', 'JEFFREY VIEL',
-        (np.where(espn_events.event_player_1=='ZACHARY JONES', 'ZAC JONES',
-        (np.where(espn_events.event_player_1=='MITCH MARNER', 'MITCHELL MARNER',
-        (np.where(espn_events.event_player_1=='MATHEW DUMBA', 'MATT DUMBA',
-        (np.where(espn_events.event_player_1=='JOSHUA MORRISSEY', 'JOSH MORRISSEY',
-        (np.where(espn_events.event_player_1=='P K SUBBAN', 'P.K. SUBBAN',
-        (np.where(espn_events.event_player_1=='EGOR SHARANGOVICH', 'YEGOR SHARANGOVICH',
-        (np.where(espn_events.event_player_1=='MAXIME COMTOIS', 'MAX COMTOIS',
-        (np.where(espn_events.event_player_1=='NICHOLAS CAAMANO', 'NICK CAAMANO',
-        (np.where(espn_events.event_player_1=='DANIEL CARCILLO', 'DAN CARCILLO',
-        (np.where(espn_events.event_player_1=='ALEXANDER OVECHKIN', 'ALEX OVECHKIN',
-        (np.where(espn_events.event_player_1=='MICHAEL CAMMALLERI', 'MIKE CAMMALLERI',
-        (np.where(espn_events.event_player_1=='DAVE STECKEL', 'DAVID STECKEL',
-        (np.where(espn_events.event_player_1=='JIM DOWD', 'JAMES DOWD', 
-        (np.where(espn_events.event_player_1=='MAXIME TALBOT', 'MAX TALBOT',
-        (np.where(espn_events.event_player_1=='MIKE ZIGOMANIS', 'MICHAEL ZIGOMANIS',
-        (np.where(espn_events.event_player_1=='VINNY PROSPAL', 'VACLAV PROSPAL',
-        (np.where(espn_events.event_player_1=='MIKE YORK', 'MICHAEL YORK',
-        (np.where(espn_events.event_player_1=='JACOB DOWELL', 'JAKE DOWELL',
-        (np.where(espn_events.event_player_1=='MICHAEL RUPP', 'MIKE RUPP',
-        (np.where(espn_events.event_player_1=='ALEXEI KOVALEV', 'ALEX KOVALEV',
-        (np.where(espn_events.event_player_1=='SLAVA KOZLOV', 'VYACHESLAV KOZLOV',
-        (np.where(espn_events.event_player_1=='JEFF HAMILTON', 'JEFFREY HAMILTON',
-        (np.where(espn_events.event_player_1=='JOHNNY POHL', 'JOHN POHL',
-        (np.where(espn_events.event_player_1=='DANIEL GIRARDI', 'DAN GIRARDI',
-        (np.where(espn_events.event_player_1=='NIKOLAI ZHERDEV', 'NIKOLAY ZHERDEV',
-        (np.where(espn_events.event_player_1=='J.P. DUMONT', 'J-P DUMONT',
-        (np.where(espn_events.event_player_1=='DWAYNE KING', 'DJ KING',
-        (np.where(espn_events.event_player_1=='JOHN ODUYA', 'JOHNNY ODUYA',
-        (np.where(espn_events.event_player_1=='ROBERT SCUDERI', 'ROB SCUDERI',
-        (np.where(espn_events.event_player_1=='DOUG MURRAY', 'DOUGLAS MURRAY',
-        (np.where(espn_events.event_player_1=='VACLAV PROSPAL', 'VINNY PROSPAL',
-        (np.where(espn_events.event_player_1=='RICH PEVERLY', 'RICH PEVERLEY',
-        espn_events.event_player_1.str.strip()
-                 ))))))))))))))))))))))))))))))))))))))))))))
-                 ))))))))))))))))))))))))))))))))))))))))))
-
-        espn_events = espn_events.assign(version = 
-                           (np.where(
-                           (espn_events.event==espn_events.event.shift()) & 
-                           (espn_events.event_player_1==espn_events.event_player_1.shift()) &
-                           (espn_events.event_player_1!='') &
-                           (espn_events.game_seconds==espn_events.game_seconds.shift()),
-                            1, 0)))
-
-        espn_events = espn_events.assign(version = 
-                               (np.where(
-                               (espn_events.event==espn_events.event.shift(2)) & 
-                               (espn_events.event_player_1==espn_events.event_player_1.shift(2)) &
-                               (espn_events.game_seconds==espn_events.game_seconds.shift(2)) & 
-                               (espn_events.event_player_1!='') &
-                               (~espn_events.description.str.contains('Penalty Shot')),
-                                2, espn_events.version)))
-
-        espn_events = espn_events.assign(version = 
-                               (np.where(
-                               (espn_events.event==espn_events.event.shift(3)) & 
-                               (espn_events.event_player_1==espn_events.event_player_1.shift(3)) &
-                               (espn_events.game_seconds==espn_events.game_seconds.shift(3)) & 
-                               (espn_events.event_player_1!=''),
-                                3, espn_events.version)))
+        espn_events['event_player_1'] = normalize_names(espn_events.event_player_1, espn_name_fixes)
+        espn_events['event_player_1'] = espn_events.event_player_1.str.strip()
+
+        espn_events = espn_events.assign(version = event_versions(espn_events))
 
         espn_events['espn_id'] = int(espn_game_id)
 
@@ -1862,8 +1649,8 @@ def scrape_espn_events(espn_game_id, drop_description = True):
         #espn_events = espn_events.assign(event_player_1 = np.where(
         #espn_events.event_player_1=='ALEX BURROWS', 'ALEXANDRE BURROWS', espn_events.event_player_1))
 
-        global look
-        look = espn_events
+        if context is not None:
+            context['espn_events'] = espn_events
 
         espn_events['coords_x'] = np.where(espn_events['coords_x']>99, 99, espn_events['coords_x'])
         espn_events['coords_y'] = np.where(espn_events['coords_y']<(-42), (-42), espn_events['coords_y'])
@@ -1877,60 +1664,111 @@ def scrape_espn_events(espn_game_id, drop_description = True):
         print('This game had like 1 ESPN event, not going to bother.')
         raise IndexError
 
+# ESPN keeps every franchise under its current name, and spells St. Louis without the period. Both the NHL's team names and the ones 
+# read off ESPN's scoreboard go through this before they are compared.
+espn_team_names = {
+    'ATLANTA THRASHERS': 'WINNIPEG JETS',
+    'PHOENIX COYOTES': 'ARIZONA COYOTES',
+    'ST LOUIS BLUES': 'ST. LOUIS BLUES'
+}
+
+# Scoreboards already parsed in this session, by date.
+_espn_scoreboards = {}
+
+def _espn_scoreboard_url(game_date):
+    return 'http://www.espn.com/nhl/scoreboard?date=' + game_date.replace('-', '')
+
+def parse_espn_scoreboard(content, game_date):
+    """
+    Read the away team, home team and ESPN id of every game on one of ESPN's daily scoreboard pages.
+    """
+    soup = BeautifulSoup(content, 'lxml')
+    soup_found = soup.find_all('a', {'class':['AnchorLink truncate', 'AnchorLink Button Button--sm Button--anchorLink Button--alt mb4 w-100'], 'href':[re.compile("/nhl/team/_/name/"), re.compile("game/_")]})
+    # Each game is listed as three links: the away team, the home team, then the game itself.
+    hrefs = np.array([link['href'] for link in soup_found[:len(soup_found) - len(soup_found) % 3]], dtype = object).reshape(-1, 3)
+    gamedays = pd.DataFrame(hrefs, columns = ['away_team', 'home_team', 'espn_id'])
+    gamedays = gamedays.assign(
+        away_team = gamedays.away_team.str.rsplit('/', n = 1).str[-1].str.replace('-', ' ').str.upper().replace(espn_team_names),
+        home_team = gamedays.home_team.str.rsplit('/', n = 1).str[-1].str.replace('-', ' ').str.upper().replace(espn_team_names),
+        espn_id = gamedays.espn_id.str.split('gameId/', n = 1).str[1].astype(int),
+        game_date = pd.to_datetime(game_date))
+    return gamedays
+
+def scrape_espn_ids(start_date, end_date):
+    """
+    Build an index of ESPN game ids for every game between two dates, one row per game with its date, home team, away team and espn_id.
+    
+    Each date's scoreboard is only downloaded and parsed once per session; dates that are already over are also kept in the HTTP cache, if one 
+    is configured. Team names are translated with espn_team_names, so NHL team names can be looked up in it directly.
+    """
+    dates = [str(day.date()) for day in pd.date_range(start_date, end_date)]
+    missing = [day for day in dates if day not in _espn_scoreboards]
+    # Scoreboards for days that are over won't change anymore.
+    finished = [day for day in missing if pd.Timestamp(day) < pd.Timestamp.now().normalize()]
+    tdhhttp.prefetch([_espn_scoreboard_url(day) for day in finished])
+    tdhhttp.prefetch([_espn_scoreboard_url(day) for day in missing if day not in finished], cache = False)
+    scoreboards = [_espn_scoreboards.get(day) for day in dates]
+    for i, day in enumerate(dates):
+        if scoreboards[i] is None:
+            page = tdhhttp.get(_espn_scoreboard_url(day), cache = day in finished)
+            scoreboards[i] = parse_espn_scoreboard(page.content, day)
+            # A failed download is tried again next time.
+            if page.status_code == 200:
+                _espn_scoreboards[day] = scoreboards[i]
+    # The empty scoreboard up front keeps the columns when the range has no dates in it.
+    return pd.concat([parse_espn_scoreboard('', start_date)] + scoreboards, ignore_index = True)
+
 def scrape_espn_ids_single_game(game_date, home_team, away_team):
-    gamedays = pd.DataFrame()
+    """
+    Look up the ESPN id of one game, sharing the scoreboard of its date with every other game played that night.
+    """
+    gamedays = scrape_espn_ids(game_date, game_date)
+    return gamedays[(gamedays.home_team==espn_team_names.get(home_team, home_team)) & (gamedays.away_team==espn_team_names.get(away_team, away_team))]
+
+def _on_ice_counts(merged, team_roster):
+    """
+    For every event, how many more times each player in team_roster has jumped on than off, one column per player. A player is on the ice when this is 1.
     
-    if home_team == 'ATLANTA THRASHERS':
-        home_team = 'WINNIPEG JETS'
-    if away_team == 'ATLANTA THRASHERS':
-        away_team = 'WINNIPEG JETS'
-        
-    if home_team == 'PHOENIX COYOTES':
-        home_team = 'ARIZONA COYOTES'
-    if away_team == 'PHOENIX COYOTES':
-        away_team = 'ARIZONA COYOTES'
-    
-    this_date = (game_date)
-    url = 'http://www.espn.com/nhl/scoreboard?date=' + this_date.replace("-", "")
-    page = requests.get(url, timeout = 500)
-    soup = BeautifulSoup(page.content, parser = 'lxml')
-    soup_found = soup.find_all('a', {'class':['AnchorLink truncate', 'AnchorLink Button Button--sm Button--anchorLink Button--alt mb4 w-100'], 'href':[re.compile("/nhl/team/_/name/"), re.compile("game/_")]})
-    at = []
-    ht = []
-    gids = []
-    fax = pd.DataFrame()
-    #print(str(i))
-    for i in range (0, (int(len(soup_found)/3))):
-        away = soup_found[0 + (i * 3)]['href'].rsplit('/')[-1].replace('-', ' ').upper()
-        home = soup_found[1 + (i * 3)]['href'].rsplit('/')[-1].replace('-', ' ').upper()
-        espnid = soup_found[2 + (i * 3)]['href'].split('gameId/', 1)[1]
-        at.append(away)
-        ht.append(home)
-        gids.append(espnid)
-
-    fax = fax.assign(
-    away_team = at,
-    home_team = ht,
-    espn_id = gids,
-    game_date = pd.to_datetime(this_date))
-
-    gamedays = gamedays.append(fax)
+    Players only count as jumping off on CHANGE events.
+    """
+    players = pd.DataFrame({'teamnum':team_roster.teamnum.values, 'column':np.arange(len(team_roster))})
+    is_change = (merged.event=='CHANGE').values
+    
+    counts = np.zeros((len(merged), len(team_roster)), dtype = int)
+    
+    for jumping, sign in [(merged.jumping_on, 1), (merged.jumping_off, -1)]:
+        tokens = pd.Series(np.asarray(jumping)).str.split(', ').explode()
+        pairs = pd.DataFrame({'row':tokens.index, 'teamnum':tokens.values}).drop_duplicates().merge(players, on = 'teamnum')
+        if sign == -1:
+            pairs = pairs[is_change[pairs.row.values]]
+        counts[pairs.row.values, pairs.column.values] += sign
+    
+    counts = pd.DataFrame(np.cumsum(counts, axis = 0))
+    counts.columns = team_roster.Name
+    
+    return counts
 
-    gamedays = gamedays.assign(
-        home_team = np.where(gamedays.home_team=='ST LOUIS BLUES', 'ST. LOUIS BLUES', gamedays.home_team),
-        away_team = np.where(gamedays.away_team=='ST LOUIS BLUES', 'ST. LOUIS BLUES', gamedays.away_team),
-        espn_id = gamedays.espn_id.astype(int))
+def _on_ice_players(counts, side):
+    """
+    Turn the output of _on_ice_counts into side_on_1, side_on_2... columns holding the names of the players on the ice, in natural sort order.
+    """
+    order = index_natsorted(counts.columns)
+    names = np.asarray(counts.columns, dtype = object)[order]
+    on = (counts.values == 1)[:, order]
     
-    #gamedays = gamedays.assign(
-     #   home_team = np.where(gamedays.home_team=='WINNIPEG JETS', 'ATLANTA THRASHERS', gamedays.home_team),
-      #  away_team = np.where(gamedays.away_team=='WINNIPEG JETS', 'ATLANTA THRASHERS', gamedays.away_team),
-       # espn_id = gamedays.espn_id.astype(int))
+    rank = np.cumsum(on, axis = 1)
+    total = rank[:, -1] if on.shape[1] > 0 else np.zeros(len(on), dtype = int)
     
-    gamedays = gamedays[(gamedays.game_date==this_date) & (gamedays.home_team==home_team) & (gamedays.away_team==away_team)]
-        
-    return(gamedays)
+    players = dict()
+    
+    for k in range(max(1, total.max(initial = 0))):
+        slot = np.argmax(on & (rank==k + 1), axis = 1)
+        # An empty first slot is a blank string, the rest are missing. Both are cleaned up to '\xa0' once the frame is finished.
+        players[k] = np.where(total > k, names[slot] if len(names) > 0 else None, '' if k == 0 else None)
+    
+    return pd.DataFrame(players, index = counts.index).rename(columns = {k:side + '_on_' + str(k + 1) for k in range(9)})
 
-def merge_and_prepare(events, shifts):
+def merge_and_prepare(events, shifts, context = None, roster = None):
     
     season = str(int(str(events.game_id.iloc[0])[:4])) + str(int(str(events.game_id.iloc[0])[:4]) + 1)
     small_id = str(events.game_id.iloc[0])[5:]
@@ -2012,9 +1850,10 @@ def merge_and_prepare(events, shifts):
 
     merged = merged.reset_index(drop = True).reset_index().rename(columns = {'index':'event_index', 'event_index':'original_index'})
 
-    global roster
+    if roster is None:
+        roster = scrape_html_roster(season, small_id)
 
-    roster = scrape_html_roster(season, small_id).rename(columns = {'Nom/Name':'Name'})
+    roster = roster.rename(columns = {'Nom/Name':'Name'})
 
     roster = roster.assign(team_abbreviated = np.where(roster.team=='home', 
                                                        merged.home_team_abbreviated.iloc[0],
@@ -2033,43 +1872,11 @@ def merge_and_prepare(events, shifts):
     merged.jumping_on = np.where(pd.isna(merged.jumping_on), '\xa0', merged.jumping_on)
     merged.jumping_off = np.where(pd.isna(merged.jumping_off), '\xa0', merged.jumping_off)
 
-    awaydf = pd.DataFrame()
-
-    for i in range(0, len(away_roster)):
-        vec = pd.DataFrame(
-                np.cumsum(
-                    (np.where(merged.jumping_on.str.split(', ').apply(lambda x: away_roster.teamnum.iloc[i] in x)==True, 1, 0)) - (
-                    np.where((merged.jumping_off.str.split(', ').apply(lambda x: away_roster.teamnum.iloc[i] in x)==True) & (merged.event=='CHANGE'), 1, 0))
-                                     ))
-        awaydf = pd.concat([awaydf, vec], axis = 1)
+    awaydf = _on_ice_counts(merged, away_roster)
+    homedf = _on_ice_counts(merged, home_roster)
 
-    awaydf.columns = away_roster.Name
-
-    global homedf
-
-    homedf = pd.DataFrame()
-
-    for i in range(0, len(home_roster)):
-        vec = pd.DataFrame(
-                np.cumsum(
-                    (np.where(merged.jumping_on.str.split(', ').apply(lambda x: home_roster.teamnum.iloc[i] in x)==True, 1, 0)) - (
-                    np.where((merged.jumping_off.str.split(', ').apply(lambda x: home_roster.teamnum.iloc[i] in x)==True) & (merged.event=='CHANGE'), 1, 0))
-                                     ))
-        homedf = pd.concat([homedf, vec], axis = 1)
-
-    homedf.columns = home_roster.Name
-
-    global home_on
-    global away_on
-
-    home_on = pd.DataFrame((homedf==1).apply(lambda y: homedf.columns[y.tolist()].tolist(), axis=1))
-    home_on[0] = (home_on[0].apply(','.join)).apply(lambda x: ','.join(natsorted(x.split(','))))
-
-    away_on = pd.DataFrame((awaydf==1).apply(lambda y: awaydf.columns[y.tolist()].tolist(), axis=1))
-    away_on[0] = (away_on[0].apply(','.join)).apply(lambda x: ','.join(natsorted(x.split(','))))
-
-    away_on = away_on[0].str.split(',', expand=True).rename(columns = {0:'away_on_1', 1:'away_on_2', 2:'away_on_3', 3:'away_on_4', 4:'away_on_5', 5:'away_on_6', 6:'away_on_7', 7:'away_on_8', 8:'away_on_9'})
-    home_on = home_on[0].str.split(',', expand=True).rename(columns = {0:'home_on_1', 1:'home_on_2', 2:'home_on_3', 3:'home_on_4', 4:'home_on_5', 5:'home_on_6', 6:'home_on_7', 7:'home_on_8', 8:'home_on_9'})
+    away_on = _on_ice_players(awaydf, 'away')
+    home_on = _on_ice_players(homedf, 'home')
 
     if 'away_on_1' not in away_on:
         away_on['away_on_1'] = '\xa0'
@@ -2108,6 +1915,9 @@ def merge_and_prepare(events, shifts):
     if 'home_on_9' not in home_on:
         home_on['home_on_9'] = '\xa0'
 
+    if context is not None:
+        context.update(roster = roster, homedf = homedf, awaydf = awaydf, home_on = home_on, away_on = away_on)
+
     game = pd.concat([merged, home_on, away_on], axis = 1)
 
     game = game.assign(
@@ -2264,7 +2074,7 @@ def merge_and_prepare(events, shifts):
         'home_on_6', 'home_on_7', 'home_on_8', 'home_on_9', 'away_on_1', 'away_on_2', 'away_on_3',
         'away_on_4', 'away_on_5', 'away_on_6', 'away_on_7', 'away_on_8', 'away_on_9', 'home_goalie',
         'away_goalie', 'home_team', 'away_team', 'home_skaters', 'away_skaters',
-        'home_score', 'away_score', 'game_score_state', 'game_strength_state', 'coordinate_source']
+        'home_score', 'away_score', 'game_score_state', 'game_strength_state', 'coordinate_source', 'coordinate_match']
         
     else:
         
@@ -2286,68 +2096,194 @@ def merge_and_prepare(events, shifts):
 
     return(game)
 
-def fix_missing(single, event_coords, events):
-    
-    # FIRST FIX: EVENTS THAT HAVE MATCHING PERIOD, SECONDS, AND EVENT TYPE, AND ONLY OCCURRED ONCE, BUT NO EVENT PLAYER. #
-    global event_coords_temp
-    global single_problems
-    global merged_problems
-    problems = events[(events.event.isin(ewc)) & (pd.isna(events.coords_x))]
-    single_problems = problems.groupby(['event', 'period', 'game_seconds'])[
-        'event_index'].count().reset_index().rename(
-        columns = {'event_index':'problematic_events'})
-    # Keep events where only one event of that class happened at that moment.
-    single_problems = single_problems[single_problems.problematic_events==1]
-    single_problems = problems.merge(single_problems).drop(
-        columns = ['problematic_events', 'coords_x', 'coords_y', 'coordinate_source']) # x/y come back later!
-    event_coords_temp = event_coords.loc[:, ['period', 'game_seconds', 'event', 'version', 'coords_x', 'coordinate_source']].groupby(
-    ['game_seconds', 'period', 'event', 'version'])['coords_x'].count().reset_index().rename(
-        columns = {'coords_x':'problematic_events'})
-    event_coords_temp = event_coords_temp[event_coords_temp.problematic_events==1].drop(columns = 'problematic_events')
-    event_coords_temp = event_coords_temp.merge(event_coords.loc[:, ['game_seconds', 'period', 'event', 'version', 'coords_x', 'coords_y', 'coordinate_source']])
-    if 'espn_id' in event_coords_temp.columns:
-        event_coords_temp = event_coords_temp.drop(columns = 'espn_id')
-    merged_problems = single_problems.merge(event_coords_temp)
-    #print("You fixed: " + str(len(merged_problems)) + " events!")
-    events = events[~(events.event_index.isin(list(merged_problems.event_index)))]
-    events = pd.concat([events, merged_problems.loc[:, list(events.columns)]]).sort_values(by = ['event_index', 'period', 'game_seconds'])
-    #if len(merged_problems)>0:
-        #events = events[~events.event_index.isin(merged_problems.event_index)]
-        #events = pd.concat([events, merged_problems.loc[:, list(events.columns)]]).sort_values(by = ['event_index', 'period', 'game_seconds'])
-    look = events
-    
-    # SECOND FIX: EVENTS THAT HAVE MATCHING PERIOD, EVENT TYPE, AND PLAYER ONE, AND ONLY OCCURRED ONCE, BUT NO GAME SECONDS.
-    
-    problems = events[(events.event.isin(ewc)) & (pd.isna(events.coords_x))]
-    single_problems = problems.groupby(['event', 'period', 'event_player_1'])[
-        'event_index'].count().reset_index().rename(
-        columns = {'event_index':'problematic_events'})
-    # Keep events where only one event of that class happened at that moment.
-    single_problems = single_problems[single_problems.problematic_events==1]
-    single_problems = problems.merge(single_problems).drop(
-        columns = ['problematic_events', 'coords_x', 'coords_y', 'coordinate_source']) # x/y come back later!
-    event_coords_temp = event_coords.loc[:, ['period', 'event_player_1', 'event', 
-                                        'version', 'coords_x', 'coordinate_source']].groupby(
-    ['event_player_1', 'period', 'event', 'version'])['coords_x'].count().reset_index().rename(
-        columns = {'coords_x':'problematic_events'})
-    event_coords_temp = event_coords_temp[event_coords_temp.problematic_events==1].drop(columns = 'problematic_events')
-    event_coords_temp = event_coords_temp.merge(event_coords.loc[:, ['event_player_1', 'period', 'event', 'version', 'coords_x', 'coords_y', 'coordinate_source']])
-    merged_problems = single_problems.merge(event_coords_temp)
-    #print("You fixed: " + str(len(merged_problems)) + " events!")
-    events = events[~events.event_index.isin(merged_problems.event_index)]
-    events = pd.concat([events, merged_problems]).sort_values(by = ['event_index', 'period', 'game_seconds'])
-    
-    return(events)
-
-def full_scrape_1by1(game_id_list, shift_to_espn = False):
-    
-    global single
-    global event_coords
-    global full
-    global fixed_events
-    global events
-    
-    full = pd.DataFrame()
+# Keys tried, in order, when looking up an HTML event's coordinates. The first is the full key shared by the HTML report, the API and ESPN; 
+# the other two leave out the player or the time, for events the sources don't quite agree on. In those, an HTML event only counts if 
+# no other event still missing coordinates has the same period, event and seconds (or player), whatever its version.
+coordinate_tiers = [
+    ('full', ['period', 'game_seconds', 'event', 'event_player_1', 'version']),
+    ('time', ['period', 'game_seconds', 'event', 'version']),
+    ('player', ['period', 'event_player_1', 'event', 'version'])
+]
+
+def _key_index(frame, keys, candidates, unique_on = None):
+    """
+    Index the candidate rows of a frame on a set of key columns, returning the index and the position in the frame of each of its entries.
+    With unique_on, candidates that are missing one of those columns or share all of them with another candidate are left out. 
+    Otherwise the first row with a key wins.
+    """
+    positions = np.flatnonzero(candidates)
+    key_frame = frame.loc[:, keys].iloc[positions]
+    index = pd.MultiIndex.from_frame(key_frame)
+    if unique_on is None:
+        keep = ~index.duplicated()
+    else:
+        unique_frame = frame.loc[:, unique_on].iloc[positions]
+        keep = (~unique_frame.duplicated(keep = False).values) & (~unique_frame.isna().any(axis = 1).values)
+    return index[keep], positions[keep]
+
+def match_coordinates(single, event_coords):
+    """
+    Attach the coordinates scraped from the API and/or ESPN to the events of an HTML report.
+    
+    Every event is looked up on the full key first. Events of a type that should have coordinates but still don't are then looked up on 
+    period, seconds and event, and after that on period, player and event. Those two only count when the key picks out one event on each side.
+    Each lookup goes through an index built once per tier, and the tier that found each event's coordinates is kept in coordinate_match 
+    ('full', 'time', 'player' or 'none').
+    """
+    single = single.reset_index(drop = True)
+    values = [column for column in event_coords.columns if column not in single.columns]
+    coords_found = ~pd.isna(event_coords.coords_x).values
+    should_have = single.event.isin(ewc).values
+    rows = np.full(len(single), -1)
+    tier = np.full(len(single), 'none', dtype = object)
+    
+    for name, keys in coordinate_tiers:
+        if name == 'full':
+            coord_index, coord_rows = _key_index(event_coords, keys, np.ones(len(event_coords), dtype = bool))
+            event_index, event_rows = pd.MultiIndex.from_frame(single.loc[:, keys]), np.arange(len(single))
+        else:
+            has_coords = np.zeros(len(single), dtype = bool)
+            has_coords[rows >= 0] = coords_found[rows[rows >= 0]]
+            missing = should_have & ~has_coords
+            if not missing.any():
+                break
+            coord_index, coord_rows = _key_index(event_coords, keys, coords_found, unique_on = keys)
+            event_index, event_rows = _key_index(single, keys, missing, unique_on = keys[:-1])
+        found = coord_index.get_indexer(event_index)
+        rows[event_rows[found >= 0]] = coord_rows[found[found >= 0]]
+        tier[event_rows[found >= 0]] = name
+    
+    coords = event_coords.loc[:, values].reset_index(drop = True).reindex(rows).set_index(single.index)
+    return pd.concat([single, coords], axis = 1).assign(coordinate_match = tier)
+
+def _unfinished_games(game_id_list):
+    """
+    The games of a list whose reports may still change, and so must not be written to the HTTP cache. Games from seasons that are over 
+    are final. For the current season, any game the schedule of the last few days doesn't show as Final is left out of the cache, and if 
+    that schedule can't be read, the whole season is. Nothing is looked up when there is no cache to protect, or when reading offline.
+    """
+    if tdhhttp.settings['cache_dir'] is None or tdhhttp.settings['offline']:
+        return set()
+    today = pd.Timestamp.now(tz = 'EST').normalize()
+    current = [int(game_id) for game_id in game_id_list if today < pd.Timestamp(str(int(str(game_id)[:4]) + 1) + '-10-01', tz = 'EST')]
+    if len(current) == 0:
+        return set()
+    try:
+        schedule = scrape_schedule(str((today - pd.Timedelta(days = 3)).date()), str((today + pd.Timedelta(days = 1)).date()))
+    except (ConnectionError, Timeout, HTTPError, KeyError, ValueError) as e:
+        print('Could not tell which games are over, so games from this season will not be cached. Here is the error: ' + str(e))
+        return set(current)
+    return set(current) & set(schedule.ID[schedule.state!='Final'].astype(int))
+
+def _game_report_urls(game_id, shift_to_espn = False):
+    """
+    Every report the scrape pulls for a game before it knows whether ESPN is needed: play-by-play, roster, both shift reports and the API feed.
+    """
+    season = str(int(str(game_id)[:4])) + str(int(str(game_id)[:4]) + 1)
+    small_id = str(game_id)[5:]
+    urls = ['http://www.nhl.com/scores/htmlreports/' + season + '/' + report + '0' + small_id + '.HTM' for report in ['PL', 'RO', 'TH', 'TV']]
+    if shift_to_espn == False:
+        urls.append('https://statsapi.web.nhl.com/api/v1/game/' + str(game_id) + '/feed/live')
+    return urls
+
+def _clean_full_scrape(full):
+    """
+    Recount skaters for games scraped without shift data and fill empty on-ice slots in a frame of finalized games.
+    """
+
+    full = full.assign(home_skaters = np.where(~full.home_skaters.isin([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
+                                                         (full.home_skaters.apply(lambda x: len(re.findall('[A-Z]', str(x)))) - 
+                                                         full.home_skaters.apply(lambda x: len(re.findall('[G]', str(x))))),
+                                                         full.home_skaters))
+
+    full = full.assign(away_skaters = np.where(~full.away_skaters.isin([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
+                                                 (full.away_skaters.apply(lambda x: len(re.findall('[A-Z]', str(x)))) - 
+                                                 full.away_skaters.apply(lambda x: len(re.findall('[G]', str(x))))),
+                                                 full.away_skaters))
+
+    if 'away_on_1' in full.columns:
+
+        full = full.assign(
+        away_on_1 = np.where((pd.isna(full.away_on_1)) | (full.away_on_1 is None) | (full.away_on_1=='') | (full.away_on_1=='\xa0'), '\xa0', full.away_on_1),
+        away_on_2 = np.where((pd.isna(full.away_on_2)) | (full.away_on_2 is None) | (full.away_on_2=='') | (full.away_on_2=='\xa0'), '\xa0', full.away_on_2),
+        away_on_3 = np.where((pd.isna(full.away_on_3)) | (full.away_on_3 is None) | (full.away_on_3=='') | (full.away_on_3=='\xa0'), '\xa0', full.away_on_3),
+        away_on_4 = np.where((pd.isna(full.away_on_4)) | (full.away_on_4 is None) | (full.away_on_4=='') | (full.away_on_4=='\xa0'), '\xa0', full.away_on_4),
+        away_on_5 = np.where((pd.isna(full.away_on_5)) | (full.away_on_5 is None) | (full.away_on_5=='') | (full.away_on_5=='\xa0'), '\xa0', full.away_on_5),
+        away_on_6 = np.where((pd.isna(full.away_on_6)) | (full.away_on_6 is None) | (full.away_on_6=='') | (full.away_on_6=='\xa0'), '\xa0', full.away_on_6),
+        away_on_7 = np.where((pd.isna(full.away_on_7)) | (full.away_on_7 is None) | (full.away_on_7=='') | (full.away_on_7=='\xa0'), '\xa0', full.away_on_7),
+        away_on_8 = np.where((pd.isna(full.away_on_8)) | (full.away_on_8 is None) | (full.away_on_8=='') | (full.away_on_8=='\xa0'), '\xa0', full.away_on_8),
+        away_on_9 = np.where((pd.isna(full.away_on_9)) | (full.away_on_9 is None) | (full.away_on_9=='') | (full.away_on_9=='\xa0'), '\xa0', full.away_on_9),
+        home_on_1 = np.where((pd.isna(full.home_on_1)) | (full.home_on_1 is None) | (full.home_on_1=='') | (full.home_on_1=='\xa0'), '\xa0', full.home_on_1),
+        home_on_2 = np.where((pd.isna(full.home_on_2)) | (full.home_on_2 is None) | (full.home_on_2=='') | (full.home_on_2=='\xa0'), '\xa0', full.home_on_2),
+        home_on_3 = np.where((pd.isna(full.home_on_3)) | (full.home_on_3 is None) | (full.home_on_3=='') | (full.home_on_3=='\xa0'), '\xa0', full.home_on_3),
+        home_on_4 = np.where((pd.isna(full.home_on_4)) | (full.home_on_4 is None) | (full.home_on_4=='') | (full.home_on_4=='\xa0'), '\xa0', full.home_on_4),
+        home_on_5 = np.where((pd.isna(full.home_on_5)) | (full.home_on_5 is None) | (full.home_on_5=='') | (full.home_on_5=='\xa0'), '\xa0', full.home_on_5),
+        home_on_6 = np.where((pd.isna(full.home_on_6)) | (full.home_on_6 is None) | (full.home_on_6=='') | (full.home_on_6=='\xa0'), '\xa0', full.home_on_6),
+        home_on_7 = np.where((pd.isna(full.home_on_7)) | (full.home_on_7 is None) | (full.home_on_7=='') | (full.home_on_7=='\xa0'), '\xa0', full.home_on_7),
+        home_on_8 = np.where((pd.isna(full.home_on_8)) | (full.home_on_8 is None) | (full.home_on_8=='') | (full.home_on_8=='\xa0'), '\xa0', full.home_on_8),
+        home_on_9 = np.where((pd.isna(full.home_on_9)) | (full.home_on_9 is None) | (full.home_on_9=='') | (full.home_on_9=='\xa0'), '\xa0', full.home_on_9),
+        home_goalie = np.where((pd.isna(full.home_goalie)) | (full.home_goalie is None) | (full.home_goalie=='') | (full.home_goalie=='\xa0'), '\xa0', full.home_goalie),
+        away_goalie = np.where((pd.isna(full.away_goalie)) | (full.away_goalie is None) | (full.away_goalie=='') | (full.away_goalie=='\xa0'), '\xa0', full.away_goalie)
+        )
+
+    return full
+
+def read_ledger(ledger):
+    """
+    Return a dataframe with the latest entry for each game recorded in a ledger folder: its status, the last stage of the scrape it reached, 
+    the class of any error, and where its frame was saved, relative to the ledger folder.
+    """
+    entries = dict()
+    path = os.path.join(ledger, 'ledger.jsonl')
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may have been cut off if the scrape was killed while writing it.
+                    continue
+                entries[entry['game_id']] = entry
+    return pd.DataFrame(list(entries.values()), columns = ['game_id', 'status', 'stage', 'error', 'output', 'recorded'])
+
+def _ledger_done(ledger):
+    """
+    Map each game the ledger has already scraped to the file its frame was saved in.
+    """
+    entries = read_ledger(ledger)
+    entries = entries[entries.status.isin(['complete', 'no_shifts'])]
+    outputs = {game_id: os.path.join(ledger, output) for game_id, output in zip(entries.game_id, entries.output)}
+    return {game_id: output for game_id, output in outputs.items() if os.path.exists(output)}
+
+def _record_game(ledger, game_id, game, status, stage, error):
+    """
+    Save a scraped game's frame in the ledger folder, then append a line to the ledger saying how its scrape went.
+    """
+    os.makedirs(os.path.join(ledger, 'games'), exist_ok = True)
+    output = None
+    if len(game) > 0:
+        output = os.path.join('games', str(game_id) + '.pkl')
+        # Written under a temporary name first so a half-written file is never mistaken for a finished game.
+        game.to_pickle(os.path.join(ledger, output + '.tmp'))
+        os.replace(os.path.join(ledger, output + '.tmp'), os.path.join(ledger, output))
+    entry = {'game_id': int(game_id), 'status': status, 'stage': stage, 'error': error, 'output': output, 'recorded': datetime.now().isoformat(timespec = 'seconds')}
+    with open(os.path.join(ledger, 'ledger.jsonl'), 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+def _iter_full_scrape(game_id_list, shift_to_espn = False, contexts = None, prefetch = 0, parser = 'bs4', unfinished = None):
+    """
+    Scrape a list of games one at a time, yielding (game_id, frame, status) as soon as each game is done.
+    
+    status is 'complete', 'no_shifts' (events only, no shift data), 'failed' (frame is empty), or 'interrupted', after which nothing else is yielded.
+    Each game also comes with the last stage of the scrape it reached and, if something went wrong, the class of the error.
+    If contexts is a dictionary, the intermediate frames built for each game are stored in it under that game's id.
+    Each game's reports are downloaded all at once, along with those of the next prefetch games, while the current game is parsed.
+    parser: Backend used to parse each play-by-play report, passed on to scrape_html_events.
+    unfinished: Ids of games that aren't over, whose reports are kept out of the HTTP cache. Looked up with _unfinished_games if not given.
+    """
+    
+    if unfinished is None:
+        unfinished = _unfinished_games(game_id_list)
     
     i = 0
     
@@ -2355,37 +2291,53 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
        
         # First thing to try: Scraping HTML events
         
+        game = pd.DataFrame()
+        status = 'failed'
+        stage = 'html_events'
+        error = None
+        
         try:
             first_time = time.time()
             game_id = game_id_list[i]
+            upcoming = game_id_list[i:i + 1 + prefetch]
+            tdhhttp.prefetch([url for upcoming_id in upcoming if int(upcoming_id) not in unfinished for url in _game_report_urls(upcoming_id, shift_to_espn)])
+            tdhhttp.prefetch([url for upcoming_id in upcoming if int(upcoming_id) in unfinished for url in _game_report_urls(upcoming_id, shift_to_espn)], cache = False)
+            final = int(game_id) not in unfinished
+            context = dict()
+            if contexts is not None:
+                contexts[game_id] = context
             print('Attempting scrape for: ' + str(game_id))
             season = str(int(str(game_id)[:4])) + str(int(str(game_id)[:4]) + 1)
             small_id = str(game_id)[5:]
-            single = scrape_html_events(season, small_id)
+            # The roster report is used both to name event players and to build the on-ice lineups, so only fetch it once.
+            roster = scrape_html_roster(season, small_id, cache = final)
+            single = scrape_html_events(season, small_id, roster = roster, parser = parser, cache = final)
             single['game_id'] = int(game_id)
+            context['single'] = single
             
             # If all goes well with the HTML scrape:
             
             try:
-                event_coords = scrape_api_events(game_id, shift_to_espn = shift_to_espn)
+                stage = 'api_coordinates'
+                event_coords = scrape_api_events(game_id, shift_to_espn = shift_to_espn, cache = final)
+                context['event_coords'] = event_coords
                 api_coords = event_coords
                 api_coords['coordinate_source'] = 'api'
                 if len(event_coords[(event_coords.event.isin(ewc)) & (pd.isna(event_coords.coords_x))]) > 0:
                     raise ExpatError('Bad takes, dude!')
                 event_coords['game_id'] = int(game_id)
-                events = single.merge(event_coords, on = ['event_player_1', 'game_seconds', 'version', 'period', 'game_id', 'event'], how = 'left')
-                try:
-                    events = fix_missing(single, event_coords, events)
-                except IndexError as e:
-                    print('Issue when fixing problematic events. Here it is: ' + str(e))
-                    continue
+                events = match_coordinates(single, event_coords)
                 try:
-                    shifts = scrape_html_shifts(season, small_id)
-                    finalized = merge_and_prepare(events, shifts)
-                    full = full.append(finalized)
+                    context['events'] = events
+                    stage = 'shifts'
+                    shifts = scrape_html_shifts(season, small_id, context = context, cache = final)
+                    stage = 'merge'
+                    finalized = merge_and_prepare(events, shifts, context = context, roster = roster)
+                    game, status = finalized, 'complete'
                     second_time = time.time()
                 except IndexError as e:
                     print('There was no shift data for this game. Error: ' + str(e))
+                    error = type(e).__name__
                     fixed_events = events
                     fixed_events = fixed_events.rename(
                     columns = {'period':'game_period', 'event':'event_type', 'away_team_abbreviated':'away_team', 
@@ -2394,7 +2346,8 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                     ).drop(
                     columns = ['original_time', 'other_team', 'strength', 'event_player_str', 'version', 'hometeamfull', 'awayteamfull']
                     ).assign(game_warning = 'NO SHIFT DATA.')
-                    full = full.append(fixed_events)
+                    context['fixed_events'] = fixed_events
+                    game, status = fixed_events, 'no_shifts'
                 print('Successfully scraped ' + str(game_id) + '. Coordinates sourced from the API.')
                 print("This game took " + str(round(second_time - first_time, 2)) + " seconds.")
                 i = i + 1
@@ -2405,29 +2358,30 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                 print('The API gave us trouble with: ' + str(game_id) + '. Let us try ESPN.')
                 
                 try:
+                    stage = 'espn_coordinates'
                     home_team = single['home_team'].iloc[0]
                     away_team = single['away_team'].iloc[0]
                     game_date = single['game_date'].iloc[0]
                     try:
                         espn_id = scrape_espn_ids_single_game(str(game_date.date()), home_team, away_team).espn_id.iloc[0]
-                        event_coords = scrape_espn_events(int(espn_id))
+                        event_coords = scrape_espn_events(int(espn_id), context = context, cache = final)
+                        context['event_coords'] = event_coords
                         event_coords['coordinate_source'] = 'espn'
-                        events = single.merge(event_coords, on = ['event_player_1', 'game_seconds', 'period', 'version', 'event'], how = 'left').drop(columns = ['espn_id'])
-                        try:
-                            events = fix_missing(single, event_coords, events)
-                        except IndexError as e:
-                            print('Issue when fixing problematic events. Here it is: ' + str(e))
-                            continue
+                        events = match_coordinates(single, event_coords).drop(columns = ['espn_id'])
                     except IndexError:
                         print('This game does not have ESPN or API coordinates. You will get it anyway, though.')
                         events = single
                     try:
-                        shifts = scrape_html_shifts(season, small_id)
-                        finalized = merge_and_prepare(events, shifts)
-                        full = full.append(finalized)
+                        context['events'] = events
+                        stage = 'shifts'
+                        shifts = scrape_html_shifts(season, small_id, context = context, cache = final)
+                        stage = 'merge'
+                        finalized = merge_and_prepare(events, shifts, context = context, roster = roster)
+                        game, status = finalized, 'complete'
                         second_time = time.time()
                     except IndexError as e:
                         print('There was no shift data for this game. Error: ' + str(e))
+                        error = type(e).__name__
                         fixed_events = events
                         fixed_events = fixed_events.rename(
                         columns = {'period':'game_period', 'event':'event_type', 'away_team_abbreviated':'away_team', 
@@ -2437,7 +2391,8 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                         columns = ['original_time', 'other_team', 'strength', 'event_player_str', 'version', 'hometeamfull', 'awayteamfull']
                         ).assign(game_warning = 'NO SHIFT DATA', season = season)
                         fixed_events['coordinate_source'] = 'espn'
-                        full = full.append(fixed_events)
+                        context['fixed_events'] = fixed_events
+                        game, status = fixed_events, 'no_shifts'
                     second_time = time.time()
                     # Fix this so it doesn't say sourced from ESPN if no coords.
                     if single.equals(events):
@@ -2453,34 +2408,36 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                 except KeyError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('KeyError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 except IndexError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('IndexError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 except TypeError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('TypeError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 except ExpatError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('ExpatError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 
             except ExpatError:
                 print('There was a rare error with the API; numerous takeaways did not have location coordinates for: ' + str(game_id) + '. Let us try ESPN.')
                 
                 try:
+                    stage = 'espn_coordinates'
                     home_team = single['home_team'].iloc[0]
                     away_team = single['away_team'].iloc[0]
                     game_date = single['game_date'].iloc[0]
                     try:
                         espn_id = scrape_espn_ids_single_game(str(game_date.date()), home_team, away_team).espn_id.iloc[0]
-                        event_coords = scrape_espn_events(int(espn_id))
+                        event_coords = scrape_espn_events(int(espn_id), context = context, cache = final)
+                        context['event_coords'] = event_coords
                         duped_coords = api_coords.assign(source = 'api').merge(event_coords.drop(columns = 'espn_id'), on = ['game_seconds', 'event', 'period', 'version', 'event_player_1'], how = 'outer', indicator = True)
                         # Coordinates are flipped in some games.
                         if len(duped_coords[duped_coords.coords_x_x * -1 == duped_coords.coords_x_y])/len(duped_coords):
@@ -2496,31 +2453,28 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                         duped_coords = duped_coords[duped_coords.event.isin(['SHOT', 'HIT', 'BLOCK', 'MISS', 'GIVE', 'TAKE', 'GOAL', 'PENL', 'FAC'])]
                         duped_coords = duped_coords[~duped_coords.duplicated()]
                         event_coords = duped_coords
-                        events = single.merge(event_coords, on = ['event_player_1', 'game_seconds', 'period', 'version', 'event'], how = 'left')#.drop(columns = ['espn_id'])
-                        try:
-                            events = fix_missing(single, event_coords, events)
-                            events['coordinate_source'] = events['source']
-                        except IndexError as e:
-                            print('Issue when fixing problematic events. Here it is: ' + str(e))
+                        context['event_coords'] = event_coords
+                        events = match_coordinates(single, event_coords)
+                        events['coordinate_source'] = events['source']
                     except IndexError as e:
                         if event_coords is not None:
                             print('Okay, ESPN had issues. We will go back to the API for this one. Issue: ' + str(e))
-                            events = single.merge(event_coords, on = ['event_player_1', 'game_seconds', 'version', 'period', 'event'], how = 'left')
-                            try:
-                                events = fix_missing(single, event_coords, events)
-                            except IndexError as e:
-                                print('Issue when fixing problematic events. Here it is: ' + str(e))
+                            events = match_coordinates(single, event_coords)
                         else:
                             print('This game does not have ESPN or API coordinates. You will get it anyway, though. Issue: ' + str(e))
                             events = single
                             events['coordinate_source'] = 'none'
                     try:
-                        shifts = scrape_html_shifts(season, small_id)
-                        finalized = merge_and_prepare(events, shifts)
-                        full = full.append(finalized)
+                        context['events'] = events
+                        stage = 'shifts'
+                        shifts = scrape_html_shifts(season, small_id, context = context, cache = final)
+                        stage = 'merge'
+                        finalized = merge_and_prepare(events, shifts, context = context, roster = roster)
+                        game, status = finalized, 'complete'
                         second_time = time.time()
                     except IndexError as e:
                         print('There was no shift data for this game. Error: ' + str(e))
+                        error = type(e).__name__
                         fixed_events = events
                         fixed_events = fixed_events.rename(
                         columns = {'period':'game_period', 'event':'event_type', 'away_team_abbreviated':'away_team', 
@@ -2529,7 +2483,8 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                         ).drop(
                         columns = ['original_time', 'other_team', 'strength', 'event_player_str', 'version', 'hometeamfull', 'awayteamfull']
                         ).assign(game_warning = 'NO SHIFT DATA', season = season)
-                        full = full.append(fixed_events)
+                        context['fixed_events'] = fixed_events
+                        game, status = fixed_events, 'no_shifts'
                     second_time = time.time()
                     # Fix this so it doesn't say sourced from ESPN if no coords.
                     print('Successfully scraped ' + str(game_id) + '. Coordinates sourced from ESPN.')
@@ -2541,23 +2496,23 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
                 except KeyError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('KeyError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 except IndexError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('IndexError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 except TypeError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('TypeError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
                 except ExpatError as e:
                     print('ESPN also had trouble scraping coordinates for: ' + str(game_id) + '. Looks like we will need to punt this one, unfortunately.')
                     print('ExpatError: ' + str(e))
+                    error = type(e).__name__
                     i = i + 1
-                    continue
             
         except ConnectionError:
             print('Got a Connection Error, time to sleep.')
@@ -2571,123 +2526,495 @@ def full_scrape_1by1(game_id_list, shift_to_espn = False):
             
         except AttributeError as e:
             print(str(game_id) + ' does not have an HTML report. Here is the error: ' + str(e))
+            error = type(e).__name__
             i = i + 1
-            continue
             
         except IndexError as e:
             print(str(game_id) + ' has an issue with the HTML Report. Here is the error: ' + str(e))
+            error = type(e).__name__
             i = i + 1
-            continue
             
         except ValueError as e:
             print(str(game_id) + ' has an issue with the HTML Report. Here is the error: ' + str(e))
+            error = type(e).__name__
             i = i + 1
-            continue
             
         except KeyboardInterrupt:
+            tdhhttp.discard([url for upcoming_id in game_id_list[i:i + 1 + prefetch] for url in _game_report_urls(upcoming_id, shift_to_espn)])
+            yield game_id_list[i], pd.DataFrame(), 'interrupted', stage, 'KeyboardInterrupt'
+            return
+        
+        # Whatever this game didn't use (shifts, say, after the HTML report failed) is dropped, so a later retry downloads it again.
+        tdhhttp.discard(_game_report_urls(game_id, shift_to_espn))
+        yield game_id, game, status, stage, error
+
+def _full_scrape_1by1(game_id_list, shift_to_espn = False, contexts = None, prefetch = 0, ledger = None, parser = 'bs4'):
+    """
+    Scrape a list of games one at a time. Returns the finalized games and whether the scrape was manually interrupted.
+    
+    If ledger is a folder, games it has already scraped are read back from disk instead of being scraped again, and every other game is recorded in it.
+    """
+    
+    # Finished games are collected here and only concatenated once, at the end.
+    games = []
+    interrupted = False
+    
+    if ledger is not None:
+        done = _ledger_done(ledger)
+        games = [pd.read_pickle(done[int(game_id)]) for game_id in game_id_list if int(game_id) in done]
+        if len(games) > 0:
+            print('The ledger already has ' + str(len(games)) + ' of these games, so they will not be scraped again.')
+        game_id_list = [game_id for game_id in game_id_list if int(game_id) not in done]
+    
+    for game_id, game, status, stage, error in _iter_full_scrape(game_id_list, shift_to_espn = shift_to_espn, contexts = contexts, prefetch = prefetch, parser = parser):
+        if status == 'interrupted':
             print('You manually interrupted the scrape. You will get to keep every game you have already completed scraping after just a bit of post-processing. Good bye.')
-            global hidden_patrick
-            hidden_patrick = 1
-            if len(full) > 0:
-                
-                full = full.assign(home_skaters = np.where(~full.home_skaters.isin([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
-                                                             (full.home_skaters.apply(lambda x: len(re.findall('[A-Z]', str(x)))) - 
-                                                             full.home_skaters.apply(lambda x: len(re.findall('[G]', str(x))))),
-                                                             full.home_skaters))
-
-                full = full.assign(away_skaters = np.where(~full.away_skaters.isin([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
-                                                             (full.away_skaters.apply(lambda x: len(re.findall('[A-Z]', str(x)))) - 
-                                                             full.away_skaters.apply(lambda x: len(re.findall('[G]', str(x))))),
-                                                             full.away_skaters))
-                
-                if 'away_on_1' in full.columns:
-                
-                    full = full.assign(
-                    away_on_1 = np.where((pd.isna(full.away_on_1)) | (full.away_on_1 is None) | (full.away_on_1=='') | (full.away_on_1=='\xa0'), '\xa0', full.away_on_1),
-                    away_on_2 = np.where((pd.isna(full.away_on_2)) | (full.away_on_2 is None) | (full.away_on_2=='') | (full.away_on_2=='\xa0'), '\xa0', full.away_on_2),
-                    away_on_3 = np.where((pd.isna(full.away_on_3)) | (full.away_on_3 is None) | (full.away_on_3=='') | (full.away_on_3=='\xa0'), '\xa0', full.away_on_3),
-                    away_on_4 = np.where((pd.isna(full.away_on_4)) | (full.away_on_4 is None) | (full.away_on_4=='') | (full.away_on_4=='\xa0'), '\xa0', full.away_on_4),
-                    away_on_5 = np.where((pd.isna(full.away_on_5)) | (full.away_on_5 is None) | (full.away_on_5=='') | (full.away_on_5=='\xa0'), '\xa0', full.away_on_5),
-                    away_on_6 = np.where((pd.isna(full.away_on_6)) | (full.away_on_6 is None) | (full.away_on_6=='') | (full.away_on_6=='\xa0'), '\xa0', full.away_on_6),
-                    away_on_7 = np.where((pd.isna(full.away_on_7)) | (full.away_on_7 is None) | (full.away_on_7=='') | (full.away_on_7=='\xa0'), '\xa0', full.away_on_7),
-                    away_on_8 = np.where((pd.isna(full.away_on_8)) | (full.away_on_8 is None) | (full.away_on_8=='') | (full.away_on_8=='\xa0'), '\xa0', full.away_on_8),
-                    away_on_9 = np.where((pd.isna(full.away_on_9)) | (full.away_on_9 is None) | (full.away_on_9=='') | (full.away_on_9=='\xa0'), '\xa0', full.away_on_9),
-                    home_on_1 = np.where((pd.isna(full.home_on_1)) | (full.home_on_1 is None) | (full.home_on_1=='') | (full.home_on_1=='\xa0'), '\xa0', full.home_on_1),
-                    home_on_2 = np.where((pd.isna(full.home_on_2)) | (full.home_on_2 is None) | (full.home_on_2=='') | (full.home_on_2=='\xa0'), '\xa0', full.home_on_2),
-                    home_on_3 = np.where((pd.isna(full.home_on_3)) | (full.home_on_3 is None) | (full.home_on_3=='') | (full.home_on_3=='\xa0'), '\xa0', full.home_on_3),
-                    home_on_4 = np.where((pd.isna(full.home_on_4)) | (full.home_on_4 is None) | (full.home_on_4=='') | (full.home_on_4=='\xa0'), '\xa0', full.home_on_4),
-                    home_on_5 = np.where((pd.isna(full.home_on_5)) | (full.home_on_5 is None) | (full.home_on_5=='') | (full.home_on_5=='\xa0'), '\xa0', full.home_on_5),
-                    home_on_6 = np.where((pd.isna(full.home_on_6)) | (full.home_on_6 is None) | (full.home_on_6=='') | (full.home_on_6=='\xa0'), '\xa0', full.home_on_6),
-                    home_on_7 = np.where((pd.isna(full.home_on_7)) | (full.home_on_7 is None) | (full.home_on_7=='') | (full.home_on_7=='\xa0'), '\xa0', full.home_on_7),
-                    home_on_8 = np.where((pd.isna(full.home_on_8)) | (full.home_on_8 is None) | (full.home_on_8=='') | (full.home_on_8=='\xa0'), '\xa0', full.home_on_8),
-                    home_on_9 = np.where((pd.isna(full.home_on_9)) | (full.home_on_9 is None) | (full.home_on_9=='') | (full.home_on_9=='\xa0'), '\xa0', full.home_on_9),
-                    home_goalie = np.where((pd.isna(full.home_goalie)) | (full.home_goalie is None) | (full.home_goalie=='') | (full.home_goalie=='\xa0'), '\xa0', full.home_goalie),
-                    away_goalie = np.where((pd.isna(full.away_goalie)) | (full.away_goalie is None) | (full.away_goalie=='') | (full.away_goalie=='\xa0'), '\xa0', full.away_goalie)
-                    )
-                
-            return full
+            interrupted = True
+            continue
+        if ledger is not None:
+            _record_game(ledger, game_id, game, status, stage, error)
+        if len(game) > 0:
+            games.append(game)
     
-    if len(full) > 0:
-                
-        full = full.assign(home_skaters = np.where(~full.home_skaters.isin([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
-                                                             (full.home_skaters.apply(lambda x: len(re.findall('[A-Z]', str(x)))) - 
-                                                             full.home_skaters.apply(lambda x: len(re.findall('[G]', str(x))))),
-                                                             full.home_skaters))
-
-        full = full.assign(away_skaters = np.where(~full.away_skaters.isin([0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
-                                                     (full.away_skaters.apply(lambda x: len(re.findall('[A-Z]', str(x)))) - 
-                                                     full.away_skaters.apply(lambda x: len(re.findall('[G]', str(x))))),
-                                                     full.away_skaters))
-
-        if 'away_on_1' in full.columns:
-
-            full = full.assign(
-            away_on_1 = np.where((pd.isna(full.away_on_1)) | (full.away_on_1 is None) | (full.away_on_1=='') | (full.away_on_1=='\xa0'), '\xa0', full.away_on_1),
-            away_on_2 = np.where((pd.isna(full.away_on_2)) | (full.away_on_2 is None) | (full.away_on_2=='') | (full.away_on_2=='\xa0'), '\xa0', full.away_on_2),
-            away_on_3 = np.where((pd.isna(full.away_on_3)) | (full.away_on_3 is None) | (full.away_on_3=='') | (full.away_on_3=='\xa0'), '\xa0', full.away_on_3),
-            away_on_4 = np.where((pd.isna(full.away_on_4)) | (full.away_on_4 is None) | (full.away_on_4=='') | (full.away_on_4=='\xa0'), '\xa0', full.away_on_4),
-            away_on_5 = np.where((pd.isna(full.away_on_5)) | (full.away_on_5 is None) | (full.away_on_5=='') | (full.away_on_5=='\xa0'), '\xa0', full.away_on_5),
-            away_on_6 = np.where((pd.isna(full.away_on_6)) | (full.away_on_6 is None) | (full.away_on_6=='') | (full.away_on_6=='\xa0'), '\xa0', full.away_on_6),
-            away_on_7 = np.where((pd.isna(full.away_on_7)) | (full.away_on_7 is None) | (full.away_on_7=='') | (full.away_on_7=='\xa0'), '\xa0', full.away_on_7),
-            away_on_8 = np.where((pd.isna(full.away_on_8)) | (full.away_on_8 is None) | (full.away_on_8=='') | (full.away_on_8=='\xa0'), '\xa0', full.away_on_8),
-            away_on_9 = np.where((pd.isna(full.away_on_9)) | (full.away_on_9 is None) | (full.away_on_9=='') | (full.away_on_9=='\xa0'), '\xa0', full.away_on_9),
-            home_on_1 = np.where((pd.isna(full.home_on_1)) | (full.home_on_1 is None) | (full.home_on_1=='') | (full.home_on_1=='\xa0'), '\xa0', full.home_on_1),
-            home_on_2 = np.where((pd.isna(full.home_on_2)) | (full.home_on_2 is None) | (full.home_on_2=='') | (full.home_on_2=='\xa0'), '\xa0', full.home_on_2),
-            home_on_3 = np.where((pd.isna(full.home_on_3)) | (full.home_on_3 is None) | (full.home_on_3=='') | (full.home_on_3=='\xa0'), '\xa0', full.home_on_3),
-            home_on_4 = np.where((pd.isna(full.home_on_4)) | (full.home_on_4 is None) | (full.home_on_4=='') | (full.home_on_4=='\xa0'), '\xa0', full.home_on_4),
-            home_on_5 = np.where((pd.isna(full.home_on_5)) | (full.home_on_5 is None) | (full.home_on_5=='') | (full.home_on_5=='\xa0'), '\xa0', full.home_on_5),
-            home_on_6 = np.where((pd.isna(full.home_on_6)) | (full.home_on_6 is None) | (full.home_on_6=='') | (full.home_on_6=='\xa0'), '\xa0', full.home_on_6),
-            home_on_7 = np.where((pd.isna(full.home_on_7)) | (full.home_on_7 is None) | (full.home_on_7=='') | (full.home_on_7=='\xa0'), '\xa0', full.home_on_7),
-            home_on_8 = np.where((pd.isna(full.home_on_8)) | (full.home_on_8 is None) | (full.home_on_8=='') | (full.home_on_8=='\xa0'), '\xa0', full.home_on_8),
-            home_on_9 = np.where((pd.isna(full.home_on_9)) | (full.home_on_9 is None) | (full.home_on_9=='') | (full.home_on_9=='\xa0'), '\xa0', full.home_on_9),
-            home_goalie = np.where((pd.isna(full.home_goalie)) | (full.home_goalie is None) | (full.home_goalie=='') | (full.home_goalie=='\xa0'), '\xa0', full.home_goalie),
-            away_goalie = np.where((pd.isna(full.away_goalie)) | (full.away_goalie is None) | (full.away_goalie=='') | (full.away_goalie=='\xa0'), '\xa0', full.away_goalie)
-            )
+    if len(games) > 0:
+        return _clean_full_scrape(pd.concat(games)), interrupted
 
+    return pd.DataFrame(), interrupted
+
+def iter_full_scrape(game_id_list, shift = False, prefetch = 0, ledger = None, compact = False, registry = None, parser = 'bs4'):
+    """
+    Scrape a list of games one at a time, yielding (game_id, df, status) as each game finishes instead of returning everything at the end.
+    
+    Only the game being scraped is held in memory, so each one can be written out or aggregated before moving on to the next.
+    status is 'complete', 'no_shifts' (events only, no shift data), 'failed' (df is empty), or 'interrupted' (the scrape was manually stopped and the generator ends).
+    ledger: Folder where every game is recorded as it finishes. Games the ledger has already scraped are skipped.
+    compact: Yield each game in the compact schema of compact_pbp, with fixed categories only so that games concatenate without losing them.
+    registry: Path of a player registry. Each game gets integer player id columns from add_player_ids.
+    parser: 'bs4' or 'lxml', the backend used to parse play-by-play reports. See scrape_html_events.
+    """
+    
+    if ledger is not None:
+        done = _ledger_done(ledger)
+        game_id_list = [game_id for game_id in game_id_list if int(game_id) not in done]
+    
+    for game_id, game, status, stage, error in _iter_full_scrape(game_id_list, shift_to_espn = shift, prefetch = prefetch, parser = parser):
+        if ledger is not None and status != 'interrupted':
+            _record_game(ledger, game_id, game, status, stage, error)
+        if len(game) > 0:
+            game = _clean_full_scrape(game)
+            if registry is not None:
+                game = add_player_ids(game, registry)
+            if compact:
+                game = compact_pbp(game, fixed = True)
+        yield game_id, game, status
+
+def full_scrape_1by1(game_id_list, shift_to_espn = False, return_context = False, prefetch = 0, ledger = None, compact = False, registry = None, parser = 'bs4'):
+    """
+    Scrape a list of games one at a time.
+    
+    return_context: Also return a dictionary mapping each game id to the intermediate frames built while scraping that game 
+    (HTML events, coordinates, shifts, roster and on-ice matrices). Useful for debugging a single game.
+    prefetch: Number of upcoming games whose reports are downloaded in the background while the current game is parsed.
+    ledger: Folder where every game is recorded as it finishes, so an interrupted scrape can pick up where it left off.
+    compact: Return the games in the compact schema of compact_pbp.
+    registry: Path of a player registry. The games get integer player id columns from add_player_ids.
+    parser: 'bs4' or 'lxml', the backend used to parse play-by-play reports. See scrape_html_events.
+    """
+    
+    contexts = dict() if return_context else None
+    
+    full, interrupted = _full_scrape_1by1(game_id_list, shift_to_espn = shift_to_espn, contexts = contexts, prefetch = prefetch, ledger = ledger, parser = parser)
+    
+    if registry is not None and len(full) > 0:
+        full = add_player_ids(full, registry)
+    
+    if compact and len(full) > 0:
+        full = compact_pbp(full)
+    
+    if return_context:
+        return full, contexts
+    
     return full
 
-def full_scrape(game_id_list, shift = False):
+def _full_scrape_game(game_id, shift_to_espn = False, return_context = False, parser = 'bs4', unfinished = None):
+    """
+    Scrape a single game. This is the unit of work handed to the worker pool in full_scrape.
+    """
+    contexts = dict() if return_context else None
+    game_id, game, status, stage, error = next(_iter_full_scrape([game_id], shift_to_espn = shift_to_espn, contexts = contexts, parser = parser, unfinished = unfinished))
+    return game, status, stage, error, contexts
+
+def _pool_result(game_id, future):
+    """
+    Wait for one game from the worker pool. A game whose worker raised comes back as failed, so the games around it are kept.
+    """
+    try:
+        return future.result()
+    except KeyboardInterrupt:
+        raise
+    except Exception as e:
+        print(str(game_id) + ' failed in its worker. Here is the error: ' + str(e))
+        return pd.DataFrame(), 'failed', 'worker', type(e).__name__, dict()
+
+def _full_scrape_pool(game_id_list, shift_to_espn = False, workers = 4, executor = 'process', contexts = None, ledger = None, parser = 'bs4'):
+    """
+    Scrape a list of games across a pool of workers. Returns the finalized games in the order of game_id_list and whether the scrape was manually interrupted.
+    
+    Each game goes through the same HTML -> API -> ESPN fallback as full_scrape_1by1.
+    executor: 'process' runs each game in its own process, 'thread' runs games on threads within this interpreter.
+    ledger: As in _full_scrape_1by1. Only this process writes to it, as results come back from the workers.
+    """
+    
+    games = []
+    
+    if ledger is not None:
+        done = _ledger_done(ledger)
+        games = [pd.read_pickle(done[int(game_id)]) for game_id in game_id_list if int(game_id) in done]
+        if len(games) > 0:
+            print('The ledger already has ' + str(len(games)) + ' of these games, so they will not be scraped again.')
+        game_id_list = [game_id for game_id in game_id_list if int(game_id) not in done]
+    
+    if executor == 'process':
+        # Hand the HTTP settings (cache folder, offline mode) to each worker, since spawned processes start with the defaults.
+        settings = tdhhttp.settings
+        pool = ProcessPoolExecutor(max_workers = workers, initializer = tdhhttp.configure, 
+                                   initargs = (settings['timeout'], settings['max_per_host'], settings['pool_maxsize'], settings['headers'], settings['cache_dir'], settings['offline']))
+    elif executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers = workers)
+    else:
+        raise ValueError("executor must be either 'process' or 'thread', not " + str(executor) + ".")
+    
+    # Which games are still going is looked up once here rather than in every worker.
+    unfinished = _unfinished_games(game_id_list)
+    futures = [(game_id, pool.submit(_full_scrape_game, game_id, shift_to_espn, contexts is not None, parser, unfinished)) for game_id in game_id_list]
+    
+    interrupted = False
+    
+    try:
+        results = [(game_id, _pool_result(game_id, future)) for game_id, future in futures]
+        pool.shutdown()
+    except KeyboardInterrupt:
+        print('You manually interrupted the scrape. You will get to keep every game you have already completed scraping after just a bit of post-processing. Good bye.')
+        interrupted = True
+        for game_id, future in futures:
+            future.cancel()
+        pool.shutdown(wait = False)
+        results = [(game_id, _pool_result(game_id, future)) for game_id, future in futures if future.done() and not future.cancelled()]
+    
+    for game_id, (game, status, stage, error, game_contexts) in results:
+        if contexts is not None:
+            contexts.update(game_contexts)
+        if status == 'interrupted':
+            interrupted = True
+            continue
+        if ledger is not None:
+            _record_game(ledger, game_id, game, status, stage, error)
+        if len(game) > 0:
+            games.append(game)
+    
+    if len(games) == 0:
+        return pd.DataFrame(), interrupted
+    
+    return _clean_full_scrape(pd.concat(games)), interrupted
+
+def full_scrape(game_id_list, shift = False, workers = 1, executor = 'process', return_context = False, prefetch = 0, ledger = None, compact = False, registry = None, parser = 'bs4'):
     
-    global hidden_patrick
-    hidden_patrick = 0
+    contexts = dict() if return_context else None
     
-    df = full_scrape_1by1(game_id_list, shift_to_espn = shift)
+    if workers > 1:
+        df, interrupted = _full_scrape_pool(game_id_list, shift_to_espn = shift, workers = workers, executor = executor, contexts = contexts, ledger = ledger, parser = parser)
+    else:
+        df, interrupted = _full_scrape_1by1(game_id_list, shift_to_espn = shift, contexts = contexts, prefetch = prefetch, ledger = ledger, parser = parser)
     
-    if (hidden_patrick==0) and (len(df)>0):
+    if (interrupted==False) and (len(df)>0):
         
         gids = list(set(df.game_id))
         missing = [x for x in game_id_list if x not in gids]
         if len(missing)>0:
             print('You missed the following games: ' + str(missing))
             print('Let us try scraping each of them one more time.')
-            retry = full_scrape_1by1(missing)
-            df = df.append(retry)
-            return df
+            if workers > 1:
+                retry, interrupted = _full_scrape_pool(missing, workers = workers, executor = executor, contexts = contexts, ledger = ledger, parser = parser)
+            else:
+                retry, interrupted = _full_scrape_1by1(missing, contexts = contexts, prefetch = prefetch, ledger = ledger, parser = parser)
+            df = pd.concat([df, retry])
+    
+    if registry is not None and len(df) > 0:
+        df = add_player_ids(df, registry)
+    
+    if compact and len(df) > 0:
+        df = compact_pbp(df)
+    
+    if return_context:
+        return df, contexts
+    
+    return df
+
+# Columns of the finalized play-by-play that hold player names. add_player_ids gives each of them an integer id column.
+pbp_player_columns = ['event_player_1', 'event_player_2', 'event_player_3', 
+                      'home_on_1', 'home_on_2', 'home_on_3', 'home_on_4', 'home_on_5', 'home_on_6', 'home_on_7', 'home_on_8', 'home_on_9',
+                      'away_on_1', 'away_on_2', 'away_on_3', 'away_on_4', 'away_on_5', 'away_on_6', 'away_on_7', 'away_on_8', 'away_on_9',
+                      'home_goalie', 'away_goalie']
+
+def load_player_registry(path):
+    """
+    Read the player registry kept at path. Each row is one appearance of a player, keyed on (name, team, season, position), 
+    with the id it was resolved to. Position is 'G' or 'S', and event players who were never on the ice have no team or position.
+    """
+    if os.path.exists(path):
+        return pd.read_csv(path, dtype = {'player_id': int, 'name': str, 'team': str, 'season': 'Int64', 'position': str})
+    return pd.DataFrame({'player_id': pd.Series(dtype = int), 'name': pd.Series(dtype = str), 'team': pd.Series(dtype = str), 
+                         'season': pd.Series(dtype = 'Int64'), 'position': pd.Series(dtype = str)})
+
+def _side_players(pbp, side):
+    """
+    The on-ice and goalie names of one side of a play-by-play frame, one row per cell, with the game, team and season of the row. 
+    Only the columns the frame has are used, so games scraped without shift data give an empty frame.
+    """
+    on_ice = [column for column in pbp.columns if column.startswith(side + '_on_')] + [column for column in [side + '_goalie'] if column in pbp.columns]
+    if side + '_team' not in pbp.columns or len(on_ice) == 0:
+        return pd.DataFrame({'game_id': [], 'name': [], 'team': [], 'season': [], 'position': []})
+    side_players = pbp.loc[:, ['game_id', 'season', side + '_team'] + on_ice].melt(id_vars = ['game_id', 'season', side + '_team'], value_name = 'name')
+    side_players = side_players.assign(position = np.where(side_players.variable==side + '_goalie', 'G', 'S')).rename(columns = {side + '_team':'team'})
+    return side_players.loc[:, ['game_id', 'name', 'team', 'season', 'position']]
+
+def _player_appearances(pbp):
+    """
+    Every (name, team, season, position) on the ice in a play-by-play frame, plus any event player who wasn't on the ice for either team of 
+    their game, with no team or position.
+    Also returns the names that were on the ice for both teams of the same game, which have to be two different players.
+    """
+    pbp = _with_season(pbp)
+    home, away = _side_players(pbp, 'home'), _side_players(pbp, 'away')
+    on_ice = pd.concat([home, away]).drop(columns = 'game_id')
+    on_ice = on_ice[(~pd.isna(on_ice.name)) & (on_ice.name!='\xa0') & (on_ice.name!='')]
+    on_ice = on_ice.assign(season = on_ice.season.astype('Int64'), name = on_ice.name.astype(str))
+    # A goalie shows up in both the on-ice and the goalie columns; keep the goalie row.
+    on_ice = on_ice.sort_values(by = ['position', 'team']).drop_duplicates(subset = ['name', 'team', 'season'])
+    event_players = [column for column in ['event_player_1', 'event_player_2', 'event_player_3'] if column in pbp.columns]
+    teams = [column for column in ['home_team', 'away_team'] if column in pbp.columns]
+    events = pbp.loc[:, ['season'] + teams + event_players].melt(id_vars = ['season'] + teams, value_name = 'name').drop(columns = 'variable')
+    events = events[(~pd.isna(events.name)) & (events.name!='\xa0') & (events.name!='')]
+    events = events.assign(season = events.season.astype('Int64'), name = events.name.astype(str))
+    # An event player only needs a row of their own if they weren't on the ice for either team of that game in that season, 
+    # as happens in games scraped without shift data.
+    seen = set(zip(on_ice.name, on_ice.team, on_ice.season))
+    seen_for_team = [[(name, team, season) in seen for name, team, season in zip(events.name, events[column], events.season)] for column in teams]
+    if len(seen_for_team) > 0:
+        events = events[~np.logical_or.reduce(seen_for_team)]
+    events = events.loc[:, ['name', 'season']].drop_duplicates()
+    appearances = pd.concat([on_ice, events])
+    both_sides = home.loc[:, ['game_id', 'name']].drop_duplicates().merge(away.loc[:, ['game_id', 'name']].drop_duplicates())
+    return appearances.reset_index(drop = True), set(both_sides.name) - {'\xa0', ''}
+
+def _nearest_registry_id(unresolved, players, keys):
+    """
+    For each unresolved appearance, the id of the registry row that shares keys with it and is nearest to it in season (lowest id on a tie).
+    """
+    candidates = unresolved.loc[:, keys + ['season']].reset_index().merge(players.loc[:, keys + ['season', 'player_id']], on = keys, suffixes = ('', '_known'))
+    candidates = candidates.assign(gap = (candidates.season - candidates.season_known).abs())
+    nearest = candidates.sort_values(by = ['gap', 'player_id'], na_position = 'last').drop_duplicates(subset = 'index')
+    return nearest.set_index('index').player_id.reindex(unresolved.index)
+
+def _resolve_player_ids(appearances, shared, players):
+    """
+    Resolve each (name, team, season, position) appearance to a player id. In order:
+    
+    1. An appearance the registry already has keeps its id.
+    2. Otherwise a name the registry has seen on the same team gets that player's id, taken from the nearest season.
+    3. Otherwise a name the registry has seen anywhere gets the id from the nearest season. Names in shared were on the ice for both teams 
+       of one game, so they are two players and never resolve on the name alone.
+    4. Everything left is a new player. New names get the next free ids, one per name, or one per name and team for shared names.
+    
+    Two players who share a name can always be told apart by giving their rows different ids in the registry: step 2 then keeps each 
+    one with their own team, and new teams and seasons follow whichever the registry says.
+    """
+    keys = ['name', 'team', 'season', 'position']
+    resolved = appearances.merge(players.drop_duplicates(subset = keys), how = 'left', on = keys)
+    is_shared = resolved.name.isin(shared)
+    for match_on, allowed in [(['name', 'team'], True), (['name'], ~is_shared)]:
+        missing = pd.isna(resolved.player_id) & allowed
+        if missing.any():
+            resolved.loc[missing, 'player_id'] = _nearest_registry_id(resolved[missing], players, match_on)
+    missing = pd.isna(resolved.player_id)
+    if missing.any():
+        new = resolved[missing]
+        next_id = players.player_id.max() + 1 if len(players) > 0 else 1
+        group = new.groupby([new.name, new.team.fillna('').where(is_shared[missing], '')], sort = False).ngroup()
+        resolved.loc[missing, 'player_id'] = next_id + group
+    return resolved.assign(player_id = resolved.player_id.astype(int))
+
+def _player_id_lookup(pbp, column, team_columns, lookup):
+    """
+    The id of every name in one player column. The name is looked up on each of the given team columns in turn and then, for 
+    event players who were never on the ice, with no team.
+    """
+    season = _with_season(pbp).season.values
+    names = pbp[column].fillna('').astype(str).values
+    found = np.full(len(pbp), -1)
+    for team in [pbp[team_column].fillna('').astype(str).values for team_column in team_columns if team_column in pbp.columns] + [np.full(len(pbp), '')]:
+        positions = lookup.index.get_indexer(pd.MultiIndex.from_arrays([names, team, season]))
+        found = np.where(found==-1, positions, found)
+    return pd.Series(lookup.values[found], index = pbp.index).where(found!=-1).astype('Int32')
+
+def add_player_ids(pbp, registry):
+    """
+    Give every player column of a play-by-play frame a matching integer id column (event_player_1_id, home_on_1_id, ...).
+    
+    registry: Path of the player registry. The registry is keyed on (name, team, season, position) and decides which player each 
+    appearance is, as laid out in _resolve_player_ids. Every new appearance is added to it before it is saved.
+    """
+    players = load_player_registry(registry)
+    appearances, shared = _player_appearances(pbp)
+    appearances = _resolve_player_ids(appearances, shared, players)
+    # Outer merge against what is already there, so only appearances the registry has not seen are added.
+    known = players.merge(appearances.loc[:, players.columns], how = 'outer', indicator = True)
+    new_appearances = known[known._merge=='right_only'].drop(columns = '_merge')
+    if len(new_appearances) > 0:
+        players = pd.concat([players, new_appearances]).sort_values(by = ['player_id', 'season'])
+        folder = os.path.dirname(os.path.abspath(registry))
+        os.makedirs(folder, exist_ok = True)
+        players.to_csv(registry + '.tmp', index = False)
+        os.replace(registry + '.tmp', registry)
+    keyed = appearances.assign(team = appearances.team.fillna(''), season = appearances.season.astype('int64'))
+    lookup = keyed.drop_duplicates(subset = ['name', 'team', 'season']).set_index(['name', 'team', 'season']).player_id
+    team_columns = {'home': ['home_team'], 'away': ['away_team'], 'event': ['event_team', 'home_team', 'away_team']}
+    return pbp.assign(**{column + '_id': _player_id_lookup(pbp, column, team_columns[column.split('_')[0]], lookup) 
+                         for column in pbp_player_columns if column in pbp.columns})
+
+# Column types of the compact play-by-play schema. Low-cardinality text becomes categorical, counts and times become small nullable integers.
+pbp_compact_dtypes = {
+    'season': 'Int32', 'game_id': 'Int32', 'event_index': 'Int16', 'game_period': 'Int16', 'game_seconds': 'Int16', 'event_length': 'Int16',
+    'coords_x': 'float32', 'coords_y': 'float32', 'num_on': 'Int16', 'num_off': 'Int16',
+    'home_skaters': 'Int16', 'away_skaters': 'Int16', 'home_score': 'Int16', 'away_score': 'Int16',
+    'event_type': 'category', 'event_detail': 'category', 'event_zone': 'category', 'event_team': 'category',
+    'event_player_1': 'category', 'event_player_2': 'category', 'event_player_3': 'category',
+    'home_on_1': 'category', 'home_on_2': 'category', 'home_on_3': 'category', 'home_on_4': 'category', 'home_on_5': 'category',
+    'home_on_6': 'category', 'home_on_7': 'category', 'home_on_8': 'category', 'home_on_9': 'category',
+    'away_on_1': 'category', 'away_on_2': 'category', 'away_on_3': 'category', 'away_on_4': 'category', 'away_on_5': 'category',
+    'away_on_6': 'category', 'away_on_7': 'category', 'away_on_8': 'category', 'away_on_9': 'category',
+    'home_goalie': 'category', 'away_goalie': 'category', 'home_team': 'category', 'away_team': 'category',
+    'game_score_state': 'category', 'game_strength_state': 'category', 'coordinate_source': 'category', 'coordinate_match': 'category', 'game_warning': 'category'
+}
+
+pbp_compact_dtypes.update({column + '_id': 'Int32' for column in pbp_player_columns})
+
+# Text columns that can only take a known set of values always get these categories, so games compacted one at a time still have 
+# matching categoricals and keep them when they are concatenated. The score state list covers scores up to 20.
+_pbp_teams = ['ANA', 'ARI', 'ATL', 'BOS', 'BUF', 'CAR', 'CBJ', 'CGY', 'CHI', 'COL', 'DAL', 'DET', 'EDM', 'FLA', 'L.A', 'LAK', 'MIN', 'MTL', 
+              'N.J', 'NJD', 'NSH', 'NYI', 'NYR', 'OTT', 'PHI', 'PHX', 'PIT', 'S.J', 'SJS', 'SEA', 'STL', 'T.B', 'TBL', 'TOR', 'UTA', 'VAN', 
+              'VGK', 'WPG', 'WSH']
+_pbp_skaters = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'E']
+pbp_fixed_categories = {
+    'event_type': pd.CategoricalDtype(['ANTHEM', 'BLOCK', 'CHANGE', 'CHL', 'DELPEN', 'EGPID', 'EGT', 'EIEND', 'EISTR', 'FAC', 'GEND', 'GIVE', 
+                                       'GOAL', 'GOFF', 'HIT', 'MISS', 'PBOX', 'PEND', 'PENL', 'PGEND', 'PGSTR', 'PSTR', 'SHOT', 'SOC', 'SPC', 
+                                       'STOP', 'TAKE']),
+    'event_zone': pd.CategoricalDtype(['Def', 'Neu', 'Off']),
+    'event_team': pd.CategoricalDtype(_pbp_teams),
+    'home_team': pd.CategoricalDtype(_pbp_teams),
+    'away_team': pd.CategoricalDtype(_pbp_teams),
+    'game_strength_state': pd.CategoricalDtype([home + 'v' + away for home in _pbp_skaters for away in _pbp_skaters]),
+    'game_score_state': pd.CategoricalDtype([str(home) + 'v' + str(away) for home in range(21) for away in range(21)]),
+    'coordinate_source': pd.CategoricalDtype(['api', 'espn', 'none']),
+    'coordinate_match': pd.CategoricalDtype(['full', 'time', 'player', 'none']),
+    'game_warning': pd.CategoricalDtype(['NO SHIFT DATA', 'NO SHIFT DATA.'])
+}
+
+def compact_pbp(pbp, fixed = False):
+    """
+    Convert play-by-play from full_scrape to the compact schema in pbp_compact_dtypes. Empty '\xa0' placeholders become real nulls.
+    
+    Columns in pbp_fixed_categories get those categories. Other categories (players, event details) are built from the frame that is passed in, 
+    so compact the whole frame after concatenating games rather than each game before.
+    fixed: Only use fixed categories and leave the other text columns as text, for games compacted one at a time. A column with a value 
+    outside its fixed categories is also left as text.
+    """
+    text = pbp.select_dtypes(include = 'object').columns
+    pbp = pbp.assign(**{column: pbp[column].replace({'\xa0': np.nan, '': np.nan}) for column in text})
+    for column, dtype in pbp_compact_dtypes.items():
+        if column not in pbp.columns:
+            continue
+        if dtype == 'category':
+            known = column in pbp_fixed_categories and pbp[column].dropna().isin(pbp_fixed_categories[column].categories).all()
+            if known:
+                pbp[column] = pbp[column].astype(pbp_fixed_categories[column])
+            elif column in pbp_fixed_categories and fixed:
+                print(column + ' has values outside its fixed categories, so it is left as text: ' + 
+                      str(sorted(set(pbp[column].dropna().astype(str)) - set(pbp_fixed_categories[column].categories))))
+            elif not fixed:
+                pbp[column] = pbp[column].astype('category')
         else:
-            return df
+            pbp[column] = pd.to_numeric(pbp[column], errors = 'coerce').astype(dtype)
+    if 'game_date' in pbp.columns:
+        pbp['game_date'] = pd.to_datetime(pbp.game_date)
+    return pbp
+
+def _with_season(pbp):
+    """
+    Fill in the season of every row from its game id (2020020014 is in 20202021). Games scraped without shift data come back with no season.
+    """
+    if 'game_id' not in pbp.columns:
+        raise ValueError('Play-by-play needs a game_id column to tell which season each game is from.')
+    season = (pd.to_numeric(pbp.game_id) // 1000000) * 10001 + 1
+    if 'season' in pbp.columns:
+        season = pd.to_numeric(pbp.season, errors = 'coerce').fillna(season)
+    return pbp.assign(season = season.astype('int64'))
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError('Reading and writing Parquet needs pyarrow. Install it with: pip install pyarrow')
+
+def _pbp_partitioning():
+    return ds.partitioning(pa.schema([('season', pa.int64()), ('game_id', pa.int64())]), flavor = 'hive')
+
+def _pbp_table(pbp):
+    """
+    Convert a play-by-play frame to an Arrow table in the compact schema, with every text column dictionary encoded.
+    """
+    table = pa.Table.from_pandas(compact_pbp(pbp), preserve_index = False)
+    # Cast every text column to the same dictionary type, so files written from different games can be read back as one dataset.
+    text = [pa.types.is_string(field.type) or pa.types.is_null(field.type) or pa.types.is_dictionary(field.type) for field in table.schema]
+    schema = pa.schema([pa.field(field.name, pa.dictionary(pa.int32(), pa.string())) if is_text else field for field, is_text in zip(table.schema, text)], 
+                       metadata = table.schema.metadata)
+    return table.cast(schema)
+
+def write_parquet(pbp, path):
+    """
+    Write play-by-play from full_scrape to a Parquet dataset at path, partitioned into one folder per season and game (season=20202021/game_id=2020020014).
+    A game that is already in the dataset is replaced, so the dataset can be added to one game or one season at a time.
+    """
+    _require_pyarrow()
+    if len(pbp) == 0:
+        return
+    ds.write_dataset(_pbp_table(_with_season(pbp)), path, format = 'parquet', partitioning = _pbp_partitioning(), 
+                     basename_template = 'part-{i}.parquet', existing_data_behavior = 'delete_matching')
+
+def read_parquet(path, seasons = None, game_ids = None, columns = None):
+    """
+    Load play-by-play written by write_parquet. Only the folders for the requested seasons and games are opened, 
+    and only the requested columns are read from them.
     
-    else:
-        return df
+    seasons, game_ids: Lists of seasons in 20202021 form and of game ids to load. By default, everything is loaded.
+    columns: List of columns to load. By default, every column is loaded.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(path, format = 'parquet', partitioning = _pbp_partitioning())
+    condition = None
+    if seasons is not None:
+        condition = ds.field('season').isin([int(season) for season in seasons])
+    if game_ids is not None:
+        games = ds.field('game_id').isin([int(game_id) for game_id in game_ids])
+        condition = games if condition is None else condition & games
+    # Games without shift data have different columns, so combine the schemas of every file being read instead of trusting the first one.
+    fragments = list(dataset.get_fragments(filter = condition))
+    if len(fragments) == 0:
+        return pd.DataFrame(columns = columns)
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in fragments] + [_pbp_partitioning().schema])
+    dataset = ds.dataset(path, schema = schema, format = 'parquet', partitioning = _pbp_partitioning())
+    # Arrow hands back plain integers wherever a file had no nulls, so put the compact types back.
+    pbp = compact_pbp(dataset.to_table(columns = columns, filter = condition).to_pandas())
+    first = [column for column in ['season', 'game_id'] if column in pbp.columns]
+    return pbp.loc[:, first + [column for column in pbp.columns if column not in first]]
 
 print("Welcome to the TopDownHockey NHL Scraper, built by Patrick Bacon.")
 print("If you enjoy the scraper and would like to support my work, or you have any comments, questions, or concerns, feel free to follow me on Twitter @TopDownHockey or reach out to me via email at patrick.s.bacon@gmail.com. Have fun!")
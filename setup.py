@@ -38,7 +38,11 @@ setup(
     'xmltodict',
     'lxml',
     'natsort'
-]
+],
+    extras_require = {
+    'parquet': ['pyarrow'],
+    'fast': ['orjson']
+}
 )
 
 
@@ -0,0 +1,74 @@
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import TopDownHockey_NHL_Scraper as tdhnhlscrape
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+@pytest.fixture
+def report():
+    with open(os.path.join(FIXTURES, 'PL020014.HTM'), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def roster():
+    return pd.DataFrame({'Name': ['NICK SUZUKI', 'SHEA WEBER', 'CAREY PRICE', 'JOHN TAVARES', 'MORGAN RIELLY', 'FREDERIK ANDERSEN'],
+                         '#': ['14', '6', '31', '91', '44', '31'],
+                         'Pos': ['C', 'D', 'G', 'C', 'D', 'G'],
+                         'team': ['away', 'away', 'away', 'home', 'home', 'home'],
+                         'status': 'player'})
+
+
+def serve(monkeypatch, content):
+    monkeypatch.setattr(tdhnhlscrape.tdhhttp, 'get', lambda url, cache = False, offline = False: SimpleNamespace(content = content))
+
+
+def test_cells_match(report):
+    cells, headers = tdhnhlscrape._pl_cells_lxml(report)
+    
+    assert (cells, headers) == tdhnhlscrape._pl_cells_bs4(report)
+    # Only the time cell of the header row is trimmed; the on-ice header cells (6 and 7) stay as text.
+    assert cells[:8] == ['#', 'Per', 'Str', 'Time:El', 'Event', 'Description', 'MTL On Ice', 'TOR On Ice']
+    # A second header row partway through is kept as is, for scrape_html_events to drop.
+    assert cells.count('#') == 2
+    # On-ice cells come through as the text of the nested tables: numbers and position letters.
+    on_ice = cells[8 * 2 + 6]
+    assert '14' in on_ice and '31' in on_ice and 'G' in on_ice
+
+
+def test_events_match(monkeypatch, report, roster):
+    serve(monkeypatch, report)
+    
+    bs4_events = tdhnhlscrape.scrape_html_events('20202021', '20014', roster = roster, parser = 'bs4')
+    lxml_events = tdhnhlscrape.scrape_html_events('20202021', '20014', roster = roster, parser = 'lxml')
+    
+    pd.testing.assert_frame_equal(bs4_events, lxml_events)
+    assert len(bs4_events) == 11
+    assert list(bs4_events.home_team.unique()) == ['TORONTO MAPLE LEAFS']
+    assert bs4_events[bs4_events.event=='SHOT'].version.tolist() == [0, 1]
+
+
+def test_report_without_header_row_falls_back(monkeypatch, report):
+    # Without '#' as its first cell, hs_strip_html parses cells 6 and 7 as on-ice players; lxml hands those reports to it.
+    # Drop the header row and the period start, so the report opens with the faceoff.
+    monkeypatch.setattr(tdhnhlscrape, 'return_name_html', lambda title: title.split(' - ')[-1], raising = False)
+    start = report.index(b'<tr class="evenColor">')
+    end = report.index(b'<tr id="PL-2"')
+    headless = report[:start] + report[end:]
+    
+    cells, headers = tdhnhlscrape._pl_cells_lxml(headless)
+    
+    assert (cells, headers) == tdhnhlscrape._pl_cells_bs4(headless)
+    assert cells[3] == '0:00'
+    assert cells[6] == [['NICK SUZUKI', '14', 'C'], ['SHEA WEBER', '6', 'D'], ['CAREY PRICE', '31', 'G']]
+    assert cells[7] == [['JOHN TAVARES', '91', 'C'], ['MORGAN RIELLY', '44', 'D'], ['FREDERIK ANDERSEN', '31', 'G']]
+
+
+@pytest.mark.parametrize('content', [b'', b'\n  \n'])
+def test_empty_report_falls_back(content):
+    assert tdhnhlscrape._pl_cells_lxml(content) == tdhnhlscrape._pl_cells_bs4(content)
@@ -0,0 +1,46 @@
+import pytest
+
+import TopDownHockey_HTTP as tdhhttp
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+    
+    def fetch(url, timeout = None, cache = False, offline = False, **kwargs):
+        calls.append((url, timeout, kwargs))
+        return len(calls)
+    
+    monkeypatch.setattr(tdhhttp, '_fetch', fetch)
+    yield calls
+    tdhhttp._prefetched.clear()
+
+
+def test_plain_get_waits_on_the_prefetch(fetches):
+    tdhhttp.prefetch(['http://example.com/a'])
+    
+    assert tdhhttp.get('http://example.com/a') == 1
+    assert len(fetches) == 1
+
+
+def test_get_with_its_own_arguments_downloads_again(fetches):
+    tdhhttp.prefetch(['http://example.com/a', 'http://example.com/b'])
+    tdhhttp._prefetched['http://example.com/a'].result()
+    tdhhttp._prefetched['http://example.com/b'].result()
+    
+    tdhhttp.get('http://example.com/a', timeout = 5)
+    tdhhttp.get('http://example.com/b', headers = {'X-Test': '1'})
+    
+    assert fetches[-2:] == [('http://example.com/a', 5, {}), ('http://example.com/b', None, {'headers': {'X-Test': '1'}})]
+    assert len(tdhhttp._prefetched) == 0
+
+
+def test_discarded_prefetch_is_not_reused(fetches):
+    tdhhttp.prefetch(['http://example.com/a'])
+    tdhhttp._prefetched['http://example.com/a'].result()
+    
+    tdhhttp.discard(['http://example.com/a', 'http://example.com/never'])
+    
+    assert len(tdhhttp._prefetched) == 0
+    tdhhttp.get('http://example.com/a')
+    assert len(fetches) == 2
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+import TopDownHockey_NHL_Scraper as tdhnhlscrape
+
+
+def html_events(rows):
+    return pd.DataFrame(rows, columns = ['period', 'game_seconds', 'event', 'event_player_1', 'version', 'description'])
+
+
+def coordinate_rows(rows):
+    return pd.DataFrame(rows, columns = ['period', 'game_seconds', 'event', 'event_player_1', 'version', 'coords_x', 'coords_y', 'coordinate_source'])
+
+
+def test_each_tier():
+    single = html_events([
+        (1, 10, 'SHOT', 'A', 0, 'full'),
+        (1, 20, 'HIT', 'B', 0, 'time'),
+        (1, 30, 'BLOCK', 'C', 0, 'player'),
+        (1, 40, 'GIVE', 'D', 0, 'none'),
+        (1, 45, 'FAC', 'E', 0, 'none, no coordinates expected'),
+    ])
+    event_coords = coordinate_rows([
+        (1, 10, 'SHOT', 'A', 0, 50.0, 5.0, 'api'),
+        (1, 20, 'HIT', 'BB', 0, -20.0, 30.0, 'espn'),
+        (1, 31, 'BLOCK', 'C', 0, 70.0, -10.0, 'espn'),
+    ])
+    
+    matched = tdhnhlscrape.match_coordinates(single, event_coords)
+    
+    assert list(matched.coordinate_match) == ['full', 'time', 'player', 'none', 'none']
+    assert list(matched.coords_x[:3]) == [50.0, -20.0, 70.0]
+    assert list(matched.coords_y[:3]) == [5.0, 30.0, -10.0]
+    assert pd.isna(matched.coords_x[3:]).all()
+    # The HTML player and seconds are kept; only the columns the HTML events lack come from the coordinate row.
+    assert list(matched.event_player_1) == ['A', 'B', 'C', 'D', 'E']
+    assert list(matched.game_seconds) == [10, 20, 30, 40, 45]
+
+
+def test_later_tiers_carry_every_column_of_their_row():
+    single = html_events([(2, 100, 'GOAL', 'J', 0, 'goal')])
+    # The full key finds a row without coordinates, so the event is looked up again and picks up the ESPN row on time.
+    event_coords = coordinate_rows([
+        (2, 100, 'GOAL', 'J', 0, np.nan, np.nan, 'api'),
+        (2, 100, 'GOAL', 'J. SMITH', 0, 80.0, 2.0, 'espn'),
+    ])
+    
+    matched = tdhnhlscrape.match_coordinates(single, event_coords)
+    
+    assert matched.coordinate_match[0] == 'time'
+    assert (matched.coords_x[0], matched.coords_y[0]) == (80.0, 2.0)
+    assert matched.coordinate_source[0] == 'espn'
+
+
+def test_missing_events_sharing_a_key_are_not_fixed():
+    # Two TAKEs at the same second by different players: the time key can't tell them apart, whatever their versions.
+    single = html_events([
+        (1, 40, 'TAKE', 'D', 0, 'take'),
+        (1, 40, 'TAKE', 'E', 0, 'take'),
+    ])
+    event_coords = coordinate_rows([(1, 40, 'TAKE', 'X', 0, 10.0, 10.0, 'api')])
+    
+    matched = tdhnhlscrape.match_coordinates(single, event_coords)
+    
+    assert list(matched.coordinate_match) == ['none', 'none']
+    assert pd.isna(matched.coords_x).all()
+
+
+def test_coordinate_rows_sharing_a_key_are_not_used():
+    single = html_events([(1, 50, 'MISS', 'F', 0, 'miss')])
+    event_coords = coordinate_rows([
+        (1, 50, 'MISS', 'G', 0, 60.0, 1.0, 'api'),
+        (1, 50, 'MISS', 'H', 0, 61.0, 2.0, 'api'),
+    ])
+    
+    matched = tdhnhlscrape.match_coordinates(single, event_coords)
+    
+    assert matched.coordinate_match[0] == 'none'
+    assert pd.isna(matched.coords_x[0])
+
+
+def test_duplicate_full_key_is_not_fanned_out():
+    single = html_events([
+        (1, 10, 'SHOT', 'A', 0, 'shot'),
+        (1, 12, 'HIT', 'B', 0, 'hit'),
+    ])
+    event_coords = coordinate_rows([
+        (1, 10, 'SHOT', 'A', 0, 50.0, 5.0, 'api'),
+        (1, 10, 'SHOT', 'A', 0, 55.0, 6.0, 'espn'),
+        (1, 12, 'HIT', 'B', 0, -5.0, 40.0, 'api'),
+    ])
+    
+    matched = tdhnhlscrape.match_coordinates(single, event_coords)
+    
+    assert len(matched) == len(single)
+    assert list(matched.coordinate_match) == ['full', 'full']
+    assert (matched.coords_x[0], matched.coordinate_source[0]) == (50.0, 'api')
+    assert matched.coords_x[1] == -5.0
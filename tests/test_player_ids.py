@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+import TopDownHockey_NHL_Scraper as tdhnhlscrape
+
+
+def shift_game():
+    return pd.DataFrame({'game_id': [2019020001] * 2, 'season': [20192020] * 2, 'home_team': 'CAR', 'away_team': 'NYI', 
+                         'event_team': ['CAR', 'NYI'], 'event_player_1': ['SEBASTIAN AHO', 'ANDERS LEE'], 'event_player_2': ['JACCOB SLAVIN', np.nan],
+                         'home_on_1': ['SEBASTIAN AHO', 'SEBASTIAN AHO'], 'home_on_2': ['JACCOB SLAVIN', 'JACCOB SLAVIN'], 
+                         'away_on_1': ['ANDERS LEE', 'ANDERS LEE'], 'home_goalie': 'PETR MRAZEK', 'away_goalie': 'SEMYON VARLAMOV'})
+
+
+def api_game():
+    # Scraped without shift data: no season, on-ice or goalie columns.
+    return pd.DataFrame({'game_id': [2020020002] * 2, 'home_team': 'CAR', 'away_team': 'NYI', 'event_team': ['CAR', 'NYI'], 
+                         'event_player_1': ['SEBASTIAN AHO', 'ANDERS LEE'], 'event_player_2': ['JACCOB SLAVIN', np.nan]})
+
+
+def test_game_without_shifts_gets_ids(tmp_path):
+    ids = tdhnhlscrape.add_player_ids(api_game(), str(tmp_path / 'players.csv'))
+    
+    assert ids.event_player_1_id.notna().all()
+    assert ids.event_player_2_id.isna().tolist() == [False, True]
+
+
+def test_event_players_seen_in_another_season(tmp_path):
+    registry = str(tmp_path / 'players.csv')
+    
+    both = tdhnhlscrape.add_player_ids(pd.concat([shift_game(), api_game()], ignore_index = True), registry)
+    alone = tdhnhlscrape.add_player_ids(api_game(), str(tmp_path / 'alone.csv'))
+    
+    api_rows = both[both.game_id==2020020002]
+    assert api_rows.event_player_1_id.notna().all()
+    assert api_rows.event_player_1_id.tolist() == both[both.game_id==2019020001].event_player_1_id.tolist()
+    assert api_rows.event_player_2_id.isna().tolist() == alone.event_player_2_id.isna().tolist()
+    players = tdhnhlscrape.load_player_registry(registry)
+    assert len(players[(players.season==20202021) & (players.name=='SEBASTIAN AHO')]) == 1
+
+
+def test_event_players_on_the_ice_get_no_extra_row(tmp_path):
+    registry = str(tmp_path / 'players.csv')
+    
+    ids = tdhnhlscrape.add_player_ids(shift_game(), registry)
+    
+    players = tdhnhlscrape.load_player_registry(registry)
+    assert players.team.notna().all()
+    assert ids.event_player_1_id.tolist() == ids.home_on_1_id.tolist()[:1] + ids.away_on_1_id.tolist()[1:]